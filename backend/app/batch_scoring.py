@@ -0,0 +1,67 @@
+try:
+    from .features import has_text, skill_weights
+except ImportError:
+    from features import has_text, skill_weights
+
+
+def skill_matrix(skill_sets, skill_columns, weighted=False):
+    """Document x skill matrix built from (row, col) coordinates.
+
+    Cells are 0/1, or with weighted the skill's weight from each row's
+    SkillWeights. Skills that are not in skill_columns are dropped, so the
+    matrix is only as wide as the vocabulary that can affect a score.
+    """
+    import numpy as np
+
+    rows, cols, values = [], [], []
+    for row, skills in enumerate(skill_sets):
+        for skill in skills:
+            col = skill_columns.get(skill)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+                values.append(skills[skill] if weighted else 1.0)
+    matrix = np.zeros((len(skill_sets), len(skill_columns)), dtype=np.float64)
+    matrix[rows, cols] = values
+    return matrix
+
+
+def score_matrix(resume_features, jd_features):
+    """Score every resume against every JD in one matrix product.
+
+    Returns an int array of shape (len(resume_features), len(jd_features))
+    holding the same values features.score_features gives pair by pair.
+    """
+    # Imported on first use so the server does not pay for numpy at startup
+    import numpy as np
+
+    jd_weights = [skill_weights(features) for features in jd_features]
+    skill_columns = {}
+    for weights in jd_weights:
+        for skill in weights:
+            skill_columns.setdefault(skill, len(skill_columns))
+
+    resumes = skill_matrix([features['skills'] for features in resume_features], skill_columns)
+    jds = skill_matrix(jd_weights, skill_columns, weighted=True)
+
+    # Weighted matched skills over each JD's total weight
+    jd_totals = jds.sum(axis=1)
+    matches = resumes @ jds.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        match_rate = matches / jd_totals
+
+    resume_years = np.array([f['experience_years'] for f in resume_features], dtype=np.float64)[:, None]
+    jd_years = np.array([f['experience_years'] for f in jd_features], dtype=np.float64)[None, :]
+    exp_score = np.where(
+        jd_years > 0,
+        np.where(resume_years >= jd_years, 20, np.where(resume_years >= jd_years * 0.7, 15, 10)),
+        15
+    )
+
+    scores = np.trunc(match_rate * 80 + exp_score)
+    scores = np.clip(scores, 0, 100)
+
+    resume_scorable = np.array([has_text(f) for f in resume_features], dtype=bool)[:, None]
+    jd_scorable = np.array([has_text(f) and bool(f['skills']) for f in jd_features], dtype=bool)[None, :]
+    scores = np.where(resume_scorable & jd_scorable, scores, 50)
+    return scores.astype(np.int64)
@@ -1,12 +1,23 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-DATABASE_URL = "sqlite:///./mindweave.db"
+DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./mindweave.db")
 
 engine = create_engine(
     DATABASE_URL, 
-    connect_args={"check_same_thread": False}
+    # Several worker processes share the file; wait for another's write lock
+    connect_args={"check_same_thread": False, "timeout": 30}
 )
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers carry on while an upload or analysis is being written
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
 SessionLocal = sessionmaker(
     bind=engine, 
     autoflush=False, 
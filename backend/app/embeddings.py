@@ -0,0 +1,134 @@
+import atexit
+import hashlib
+import os
+import threading
+import uuid
+
+import numpy as np
+
+try:
+    from .metrics import metrics
+except ImportError:
+    from metrics import metrics
+
+EMBEDDING_CACHE_DIR = os.environ.get('EMBEDDING_CACHE_DIR', 'embedding_cache')
+EMBEDDING_BATCH_SIZE = int(os.environ.get('EMBEDDING_BATCH_SIZE', 32))
+
+
+def content_key(text):
+    """Cache key for a text: SHA-256 of its UTF-8 bytes"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def normalize_rows(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class EmbeddingEngine:
+    """Batched text embeddings with a content-hash keyed on-disk cache.
+
+    Embeddings are stored L2-normalized, so cosine similarity is a dot
+    product. New vectors are buffered and written as .npy shards (with a
+    .keys file listing their content hashes) under cache_dir/model_name;
+    existing shards are memory-mapped rather than read into memory.
+    """
+
+    def __init__(self, encoder, model_name, cache_dir=EMBEDDING_CACHE_DIR,
+                 batch_size=EMBEDDING_BATCH_SIZE, shard_size=1024):
+        self.encoder = encoder
+        self.cache_dir = os.path.join(cache_dir, model_name)
+        self.batch_size = batch_size
+        self.shard_size = shard_size
+        # content key -> (array, row); arrays are memory-mapped shards or the pending buffer
+        self._rows = {}
+        self._shard_count = 0
+        self._pending_keys = []
+        self._pending = []
+        self._lock = threading.Lock()
+        self.encoded_count = 0
+        self._load()
+        atexit.register(self.flush)
+
+    def _load(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in sorted(os.listdir(self.cache_dir)):
+            if not name.endswith('.keys'):
+                continue
+            shard_path = os.path.join(self.cache_dir, name[:-len('.keys')] + '.npy')
+            if not os.path.exists(shard_path):
+                continue
+            with open(os.path.join(self.cache_dir, name)) as keys_file:
+                keys = keys_file.read().split()
+            vectors = np.load(shard_path, mmap_mode='r')
+            self._shard_count += 1
+            if len(keys) != len(vectors):
+                print(f"Skipping inconsistent embedding shard {shard_path}")
+                continue
+            for row, key in enumerate(keys):
+                self._rows[key] = (vectors, row)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def embed(self, texts):
+        """Normalized float32 matrix with one row per text.
+
+        Texts already in the cache are not encoded again; the rest are
+        de-duplicated and encoded in batches of batch_size.
+        """
+        keys = [content_key(text) for text in texts]
+        with self._lock:
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in self._rows:
+                    missing.setdefault(key, text)
+            metrics.inc('embedding_cache_hits_total', len(keys) - len(missing))
+            metrics.inc('embedding_cache_misses_total', len(missing))
+            if missing:
+                vectors = normalize_rows(self.encoder.encode(
+                    list(missing.values()), batch_size=self.batch_size,
+                    convert_to_numpy=True, show_progress_bar=False
+                ))
+                self.encoded_count += len(missing)
+                for key, vector in zip(missing, vectors):
+                    self._pending_keys.append(key)
+                    self._pending.append(vector)
+                    self._rows[key] = (self._pending, len(self._pending) - 1)
+                if len(self._pending) >= self.shard_size:
+                    self._write_shard()
+            if not keys:
+                return np.empty((0, 0), dtype=np.float32)
+            return np.stack([self._rows[key][0][self._rows[key][1]] for key in keys])
+
+    def similarities(self, query_text, texts):
+        """Cosine similarity of query_text to each of texts, as one matrix-vector product"""
+        matrix = self.embed([query_text, *texts])
+        return matrix[1:] @ matrix[0]
+
+    def flush(self):
+        with self._lock:
+            self._write_shard()
+
+    def _write_shard(self):
+        if not self._pending:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Worker processes share the cache directory, so shard names are unique
+        base = os.path.join(self.cache_dir, f"{self._shard_count:06d}-{uuid.uuid4().hex[:8]}")
+        np.save(base + '.tmp.npy', np.stack(self._pending))
+        os.replace(base + '.tmp.npy', base + '.npy')
+        # The keys file is written last; a shard without one is ignored on load
+        with open(base + '.keys.tmp', 'w') as keys_file:
+            keys_file.write('\n'.join(self._pending_keys))
+        os.replace(base + '.keys.tmp', base + '.keys')
+        self._shard_count += 1
+
+        vectors = np.load(base + '.npy', mmap_mode='r')
+        for row, key in enumerate(self._pending_keys):
+            self._rows[key] = (vectors, row)
+        self._pending_keys = []
+        self._pending = []
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+
+EXPORT_COLUMNS = [
+    'resumeId', 'filename', 'score', 'relevance', 'location', 'experience',
+    'matchedSkills', 'missingSkills', 'analyzed_at'
+]
+
+# format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'json': ('application/json', 'json'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+
+
+def flat_row(result):
+    """Result row with skill lists joined, as used by the tabular formats"""
+    row = {column: result.get(column, '') for column in EXPORT_COLUMNS}
+    row['matchedSkills'] = '; '.join(result.get('matchedSkills', []))
+    row['missingSkills'] = '; '.join(result.get('missingSkills', []))
+    return row
+
+
+def iter_csv(results, rows_per_chunk=100):
+    """Yield CSV text a chunk of rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for count, result in enumerate(results, 1):
+        writer.writerow(flat_row(result))
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_jsonl(results):
+    for result in results:
+        yield json.dumps(result) + '\n'
+
+
+def iter_json(analysis, results):
+    """Yield one JSON document: the analysis fields plus its results array"""
+    head = {key: value for key, value in analysis.items() if key != 'results'}
+    yield json.dumps(head)[:-1] + ', "results": ['
+    for count, result in enumerate(results):
+        yield (', ' if count else '') + json.dumps(result)
+    yield ']}'
+
+
+def xlsx_bytes(results):
+    """XLSX workbook of the results. Zip-based, so it is built in memory"""
+    import pandas as pd
+
+    frame = pd.DataFrame([flat_row(result) for result in results], columns=EXPORT_COLUMNS)
+    output = io.BytesIO()
+    frame.to_excel(output, index=False, sheet_name='Results')
+    output.seek(0)
+    return output
@@ -0,0 +1,401 @@
+import io
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+try:
+    from .metrics import metrics
+except ImportError:
+    from metrics import metrics
+
+# Multi-file uploads extract text in worker processes, so PDF parsing can use
+# more than one core and a file that runs past EXTRACT_TIMEOUT seconds (0
+# turns the limit off) or kills its worker fails on its own without taking
+# the server or the rest of its batch with it. The processes are kept between
+# uploads. A single file is extracted in the server process, unless
+# EXTRACT_ISOLATE=1 sends it to a worker so the timeout applies to it too.
+EXTRACT_WORKERS = int(os.environ.get('EXTRACT_WORKERS', os.cpu_count() or 1))
+EXTRACT_TIMEOUT = float(os.environ.get('EXTRACT_TIMEOUT', 60))
+EXTRACT_ISOLATE = os.environ.get('EXTRACT_ISOLATE', '').lower() in ('1', 'true', 'yes')
+# Only the start of a long document is parsed: scoring needs its skills and
+# experience, which come first, not the appendices of a 300-page PDF
+EXTRACT_MAX_PAGES = int(os.environ.get('EXTRACT_MAX_PAGES', 50))
+EXTRACT_MAX_CHARS = int(os.environ.get('EXTRACT_MAX_CHARS', 200000))
+
+
+def open_source(source):
+    """Binary file object for a path, or for the bytes of an upload still in memory"""
+    return io.BytesIO(source) if isinstance(source, bytes) else open(source, 'rb')
+
+
+def describe(source):
+    return f'<{len(source)} bytes in memory>' if isinstance(source, bytes) else source
+
+
+def iter_pdf_pages(source):
+    """Yield the text of each PDF page as it is parsed"""
+    import PyPDF2
+    with open_source(source) as file:
+        for page in PyPDF2.PdfReader(file).pages:
+            yield page.extract_text() or ''
+
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+# Run children that stand for characters other than their w:t text
+RUN_CHARACTERS = {
+    WORD_NS + 'tab': '\t', WORD_NS + 'ptab': '\t', WORD_NS + 'br': '\n', WORD_NS + 'cr': '\n',
+    WORD_NS + 'noBreakHyphen': '-',
+}
+
+
+def iter_docx_xml(source):
+    """Yield the text of each paragraph and table row straight from word/document.xml.
+
+    The XML is streamed with iterparse and each block is dropped once read,
+    so no object model is built and a capped read stops parsing early. A
+    table row comes out as one line with its cells separated by tabs. Text
+    boxes are read once, from their DrawingML content, not again from the
+    VML fallback.
+    """
+    import zipfile
+    from xml.etree.ElementTree import iterparse
+    
+    paragraphs = []  # text parts of each open paragraph; text boxes nest inside one
+    rows = []  # cells of each open table row, each a list of its paragraphs' text
+    runs = 0
+    skipped = 0  # depth inside mc:Fallback
+    depth = 0
+    body = None
+    with open_source(source) as file, zipfile.ZipFile(file) as archive, archive.open('word/document.xml') as xml:
+        for event, element in iterparse(xml, events=('start', 'end')):
+            tag = element.tag
+            if event == 'start':
+                depth += 1
+                if tag == MC_FALLBACK or skipped:
+                    skipped += 1
+                elif tag == WORD_NS + 'p':
+                    paragraphs.append([])
+                elif tag == WORD_NS + 'r':
+                    runs += 1
+                elif tag == WORD_NS + 'tr':
+                    rows.append([])
+                elif tag == WORD_NS + 'tc' and rows:
+                    rows[-1].append([])
+                elif tag == WORD_NS + 'body':
+                    body = element
+                continue
+            
+            depth -= 1
+            if skipped:
+                skipped -= 1
+            elif tag == WORD_NS + 't':
+                if paragraphs and element.text:
+                    paragraphs[-1].append(element.text)
+            elif tag == WORD_NS + 'r':
+                runs -= 1
+            elif tag in RUN_CHARACTERS:
+                if runs and paragraphs:
+                    paragraphs[-1].append(RUN_CHARACTERS[tag])
+            elif tag == WORD_NS + 'p':
+                text = ''.join(paragraphs.pop())
+                if rows and rows[-1]:
+                    rows[-1][-1].append(text)
+                else:
+                    yield text
+            elif tag == WORD_NS + 'tr':
+                text = '\t'.join(' '.join(part for part in cell if part) for cell in rows.pop())
+                if rows and rows[-1]:
+                    rows[-1][-1].append(text)
+                else:
+                    yield text
+            if depth == 2 and body is not None:
+                # A top-level block is done with; keep the tree from growing
+                body.clear()
+
+
+def iter_python_docx(source):
+    """Paragraphs, then table rows, through python-docx's object model"""
+    import docx
+    with open_source(source) as file:
+        document = docx.Document(file)
+        for paragraph in document.paragraphs:
+            yield paragraph.text
+        for table in document.tables:
+            for row in table.rows:
+                yield '\t'.join(cell.text for cell in row.cells)
+
+
+def iter_docx_paragraphs(source):
+    """Yield the text of each paragraph and table row of a DOCX.
+    
+    Streamed from the XML by iter_docx_xml; a file that cannot be read that
+    way before any text came out is handed to python-docx instead.
+    """
+    from xml.etree.ElementTree import ParseError
+    from zipfile import BadZipFile
+    
+    produced = False
+    try:
+        for text in iter_docx_xml(source):
+            produced = True
+            yield text
+    except (BadZipFile, KeyError, ParseError) as e:
+        if produced:
+            raise
+        print(f"Streaming DOCX extraction failed ({e!r}), falling back to python-docx: {describe(source)}")
+        yield from iter_python_docx(source)
+
+
+def collect_text(chunks, separator, max_chunks=None, max_chars=None):
+    """Join text chunks from a generator, stopping at either cap.
+
+    Returns (text, chunks read, whether a cap stopped the read). Chunks past
+    the caps are never pulled, so the pages behind them are never parsed;
+    that also means a document ending right at a cap is reported as cut off.
+    Empty chunks are skipped but still count as pages.
+    """
+    parts = []
+    length = 0
+    count = 0
+    truncated = False
+    for count, chunk in enumerate(chunks, 1):
+        if chunk:
+            if max_chars is not None and length + len(chunk) >= max_chars:
+                parts.append(chunk[:max_chars - length])
+                truncated = True
+                break
+            parts.append(chunk)
+            length += len(chunk) + len(separator)
+        if max_chunks is not None and count >= max_chunks:
+            truncated = True
+            break
+    chunks.close()
+    return separator.join(parts), count, truncated
+
+
+def extract_document(source, file_extension, max_pages=None, max_chars=None):
+    """(text, PDF pages parsed, truncated) for an uploaded file, up to max_pages pages and max_chars characters.
+
+    truncated tells whether a cap cut the text short. source is the file's
+    path, or its bytes when the upload is still in memory, which saves
+    reading back what was just written.
+    """
+    max_pages = max_pages or EXTRACT_MAX_PAGES
+    max_chars = max_chars or EXTRACT_MAX_CHARS
+    try:
+        if file_extension == 'pdf':
+            try:
+                return collect_text(iter_pdf_pages(source), ' ', max_pages, max_chars)
+            except ImportError:
+                return "PDF extraction not available. Install PyPDF2.", 0, False
+        elif file_extension == 'docx':
+            try:
+                text, _, truncated = collect_text(iter_docx_paragraphs(source), '\n', max_chars=max_chars)
+                return text, 0, truncated
+            except ImportError:
+                return "DOCX extraction not available. Install python-docx.", 0, False
+        elif file_extension == 'txt':
+            with io.TextIOWrapper(open_source(source), encoding='utf-8') as file:
+                text = file.read(max_chars)
+                return text, 0, bool(file.read(1))
+        else:
+            return '', 0, False
+    except Exception as e:
+        print(f"Error extracting text: {str(e)}")
+        return '', 0, False
+
+
+def extract_text_from_file(file_path, file_extension, max_pages=None, max_chars=None):
+    """Extract text content from uploaded files"""
+    return extract_document(file_path, file_extension, max_pages, max_chars)[0]
+
+
+def extract_texts(jobs, workers=None, timeout=None):
+    """Extract text for many (source, file_extension) jobs in parallel.
+
+    Returns a list aligned with jobs holding (text, truncated), or None for
+    a file whose extraction timed out or crashed its worker process. A single file
+    is extracted in this process unless EXTRACT_ISOLATE asks for its timeout
+    to be enforced; so is a batch when there is one worker and no timeout.
+    """
+    workers = workers or EXTRACT_WORKERS
+    timeout = EXTRACT_TIMEOUT if timeout is None else timeout
+    if len(jobs) <= 1:
+        in_process = not (EXTRACT_ISOLATE and timeout)
+    else:
+        in_process = workers <= 1 and not timeout
+    if in_process:
+        results = [extract_document(*job) for job in jobs]
+    else:
+        results = [None] * len(jobs)
+        unresolved = _run_in_pool(jobs, range(len(jobs)), workers, timeout, results, shared=True)
+        # A crash or timeout takes down the whole pool, so the files that were
+        # caught up in it are retried one per pool to pin the failure on its cause
+        if len(jobs) > 1:
+            for index in unresolved:
+                _run_in_pool(jobs, [index], 1, timeout, results)
+
+    # Workers cannot update this process' metrics, so pages are counted here
+    metrics.inc('pages_parsed_total', sum(result[1] for result in results if result))
+    return [(result[0], result[2]) if result else None for result in results]
+
+
+# The pool extract_texts reuses between calls, and how many workers it has
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _context():
+    """Start workers from a fresh interpreter, not by forking the server.
+
+    The server runs other threads (ingestion, the sweeper), and a fork copies
+    any lock one of them holds at that moment, never to be released.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+# Tells apart the jobs submitted to a pool
+_tokens = itertools.count()
+
+# In a worker process: where it reports the jobs it starts
+_starts = None
+
+
+def _report_starts_to(queue):
+    global _starts
+    _starts = queue
+
+
+def _run_job(token, function, job):
+    _starts.put(token)
+    return function(*job)
+
+
+class _Pool(ProcessPoolExecutor):
+    """A process pool whose workers report when they start on a job.
+
+    A future counts as running as soon as it is queued for a worker, which
+    can be a whole job earlier, so its start time comes from the worker.
+    """
+
+    def __init__(self, workers):
+        context = _context()
+        self._starts = context.SimpleQueue()
+        self._started = {}
+        self._started_lock = threading.Lock()
+        super().__init__(max_workers=workers, mp_context=context,
+                         initializer=_report_starts_to, initargs=(self._starts,))
+
+    def submit_job(self, token, job):
+        # extract_document is looked up here so workers run whatever it is now
+        return self.submit(_run_job, token, extract_document, job)
+
+    def _drain(self):
+        while not self._starts.empty():
+            self._started[self._starts.get()] = time.monotonic()
+
+    def started(self, tokens):
+        """When each of tokens was started by a worker, for those that were"""
+        with self._started_lock:
+            self._drain()
+            return {token: self._started[token] for token in tokens if token in self._started}
+
+    def forget(self, tokens):
+        with self._started_lock:
+            self._drain()
+            for token in tokens:
+                self._started.pop(token, None)
+
+
+def _new_pool(workers):
+    return _Pool(workers)
+
+
+def _shared_pool(workers):
+    """The reusable pool, replaced when its size changes or it broke"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None and (_pool_workers != workers or getattr(_pool, '_broken', False)):
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            _pool = _new_pool(workers)
+            _pool_workers = workers
+        return _pool
+
+
+def _discard_pool(pool):
+    """Stop using pool once its workers were killed; the next call starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_in_pool(jobs, indexes, workers, timeout, results, shared=False):
+    """Fill results for indexes; return the ones lost to a broken pool.
+
+    With shared, the jobs run on the reusable pool, which is kept afterwards
+    unless a timeout or crash broke it. Concurrent calls share it, so a file
+    that breaks it also fails their jobs, which they then retry one by one.
+    Otherwise a pool is made for these jobs alone. A timeout of 0 is no limit.
+    """
+    if shared:
+        pool = _shared_pool(workers)
+    else:
+        pool = _new_pool(min(workers, len(indexes)))
+    tokens = {}
+    for i in indexes:
+        token = next(_tokens)
+        tokens[pool.submit_job(token, jobs[i])] = token
+    futures = {future: i for future, i in zip(tokens, indexes)}
+    unresolved = []
+    broken = False
+    try:
+        not_done = set(futures)
+        while not_done:
+            done, not_done = wait(not_done, timeout=0.1, return_when=FIRST_COMPLETED)
+            # Also keeps the workers' reports from filling up their pipe
+            pool.forget(tokens[future] for future in done)
+            for future in done:
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    if len(indexes) == 1:
+                        print(f"Extraction worker failed on {describe(jobs[futures[future]][0])}: {e!r}")
+                    unresolved.append(futures[future])
+                    broken = True
+
+            if not timeout:
+                continue
+            now = time.monotonic()
+            started = pool.started(tokens[future] for future in not_done)
+            expired = [future for future in not_done if now - started.get(tokens[future], now) > timeout]
+            if expired:
+                for future in expired:
+                    print(f"Extraction timed out after {timeout}s: {describe(jobs[futures[future]][0])}")
+                unresolved.extend(futures[future] for future in not_done if future not in expired)
+                _terminate(pool)
+                broken = True
+                break
+    finally:
+        if not shared:
+            pool.shutdown(wait=False, cancel_futures=True)
+        elif broken:
+            _discard_pool(pool)
+        else:
+            pool.forget(tokens.values())
+    return unresolved
+
+
+def _terminate(pool):
+    # ProcessPoolExecutor cannot cancel a running call, so stop the workers
+    for process in list((getattr(pool, '_processes', None) or {}).values()):
+        process.terminate()
@@ -0,0 +1,213 @@
+import re
+
+try:
+    from .metrics import metrics
+    from .sections import segment_jd
+    from .skills import TAXONOMY_VERSION, Gazetteer, default_matcher as skill_matcher
+except ImportError:
+    from metrics import metrics
+    from sections import segment_jd
+    from skills import TAXONOMY_VERSION, Gazetteer, default_matcher as skill_matcher
+
+# City or alias as it appears in text -> canonical location. When a document
+# names several, the one listed first here wins.
+CITY_GAZETTEER = {
+    'bangalore': 'Bangalore', 'bengaluru': 'Bangalore',
+    'hyderabad': 'Hyderabad', 'pune': 'Pune', 'mumbai': 'Mumbai',
+    'delhi': 'Delhi NCR', 'noida': 'Delhi NCR', 'gurgaon': 'Delhi NCR',
+    'chennai': 'Chennai', 'kolkata': 'Kolkata', 'ahmedabad': 'Ahmedabad',
+    'jaipur': 'Jaipur', 'kochi': 'Kochi', 'indore': 'Indore'
+}
+_city_rank = {key: i for i, key in enumerate(CITY_GAZETTEER)}
+
+# Skills and cities are found by the same trie scan, so a document is
+# tokenized once for both
+document_terms = Gazetteer([*skill_matcher.taxonomy, *CITY_GAZETTEER])
+
+# Every experience phrase in one scan: "5+ years of experience", "3 yrs in",
+# "experience: 4 years" and "2019 - present" style date ranges. The words
+# after "N years" are only looked ahead at, so in "5 years experience: 7 years"
+# the second phrase still starts at "experience".
+EXPERIENCE_PATTERN = re.compile(
+    r'(\d+)\+?\s*(?:years?|yrs?)\s+(?=(?:of\s+)?(?:experience|exp)|in)'
+    r'|experience[:\s]+(\d+)\+?\s*(?:years?|yrs?)'
+    r'|(20\d{2})\s*[-–]\s*(present|current|20\d{2})'
+)
+
+# In a JD's skill match rate, skills listed under a must-have header count
+# double and those only under a nice-to-have header count half; the rest
+# count once. Powers of two keep every weighted sum exact, so the per-pair,
+# matrix and top-K scorers agree to the point.
+MUST_HAVE_WEIGHT = 2.0
+NICE_TO_HAVE_WEIGHT = 0.5
+
+
+def normalize_text(text):
+    """Lowercase and collapse whitespace once so extractors never redo it"""
+    return ' '.join(text.lower().split()) if text else ''
+
+
+def years_of_experience(text_lower):
+    """Longest experience claim in already-lowercased text, 0 if there is none"""
+    years_found = []
+    for stated, labelled, start, end in EXPERIENCE_PATTERN.findall(text_lower):
+        if start:
+            years = (2025 if end in ('present', 'current') else int(end)) - int(start)
+        else:
+            years = int(stated or labelled)
+        if 0 < years < 50:
+            years_found.append(years)
+    return max(years_found, default=0)
+
+
+def location_from_keys(keys):
+    """Canonical location for the first gazetteer city among matched keys"""
+    cities = [key for key in keys if key in CITY_GAZETTEER]
+    if not cities:
+        return 'Not specified'
+    return CITY_GAZETTEER[min(cities, key=_city_rank.__getitem__)]
+
+
+def extract_years_of_experience(text):
+    """Extract years of experience"""
+    return years_of_experience(text.lower()) if text else 0
+
+
+def extract_location(text):
+    """Extract location"""
+    if not text:
+        return 'Not specified'
+    return location_from_keys(document_terms.find_keys(text.lower()))
+
+
+def extract_skills_from_text(text):
+    """Extract technical skills"""
+    return skill_matcher.find(text)
+
+
+def section_skills(text):
+    """Skills a job description lists under its must-have and nice-to-have headers"""
+    sections = segment_jd(text.lower()) if text else {'must_have': [], 'good_to_have': []}
+    return {
+        'must_have_skills': skill_matcher.find(normalize_text(' '.join(sections['must_have']))),
+        'nice_to_have_skills': skill_matcher.find(normalize_text(' '.join(sections['good_to_have'])))
+    }
+
+
+def extract_features(text, sections=False):
+    """Build the feature record stored next to a document's text_content.
+
+    With sections (for job descriptions) it also records section_skills,
+    which skill_weights turns into the JD's skill weights.
+    """
+    with metrics.timer('features.normalize'):
+        normalized = normalize_text(text)
+    with metrics.timer('features.terms'):
+        keys = document_terms.find_keys(normalized)
+        skills = skill_matcher.names(keys)
+        location = location_from_keys(keys)
+    with metrics.timer('features.experience'):
+        experience_years = years_of_experience(normalized)
+    record = {
+        'skills': skills,
+        'experience_years': experience_years,
+        'location': location,
+        'normalized_text': normalized,
+        'taxonomy_version': TAXONOMY_VERSION
+    }
+    if sections:
+        with metrics.timer('features.sections'):
+            record.update(section_skills(text))
+    return record
+
+
+def scoring_features(features):
+    """A feature record without its normalized_text, which scoring only tests for emptiness.
+
+    This is what the document store caches and hands to the scorers; has_text
+    stands in for the text.
+    """
+    if features is None or 'normalized_text' not in features:
+        return features
+    record = {key: value for key, value in features.items() if key != 'normalized_text'}
+    record['has_text'] = bool(features['normalized_text'])
+    return record
+
+
+def has_text(features):
+    """Whether the document had any text, from a full or a scoring feature record"""
+    if 'has_text' in features:
+        return features['has_text']
+    return bool(features.get('normalized_text'))
+
+
+class SkillWeights(dict):
+    """A JD's skills mapped to their weight in the match rate, with the total precomputed"""
+
+    def __init__(self, weights):
+        super().__init__(weights)
+        self.total = sum(self.values())
+
+
+def skill_weights(jd_features):
+    """SkillWeights for a JD feature record; every skill weighs 1 when it has no section skills"""
+    must_have = set(jd_features.get('must_have_skills', ()))
+    nice_to_have = set(jd_features.get('nice_to_have_skills', ()))
+    return SkillWeights({
+        skill: MUST_HAVE_WEIGHT if skill in must_have else NICE_TO_HAVE_WEIGHT if skill in nice_to_have else 1.0
+        for skill in jd_features['skills']
+    })
+
+
+def experience_score(resume_years, jd_years):
+    if jd_years > 0:
+        if resume_years >= jd_years:
+            return 20
+        elif resume_years >= jd_years * 0.7:
+            return 15
+        return 10
+    return 15
+
+
+def relevance_label(score):
+    if score >= 70:
+        return 'High'
+    elif score >= 40:
+        return 'Medium'
+    return 'Low'
+
+
+def score_features(resume_features, jd_features, jd_weights=None):
+    """Score a resume against a JD from their feature records.
+
+    Pass jd_weights from skill_weights(jd_features) when scoring many resumes
+    against the same JD so it is only built once.
+    """
+    if not has_text(resume_features) or not has_text(jd_features):
+        return 50, 'Medium'
+
+    if jd_weights is None:
+        jd_weights = skill_weights(jd_features)
+    if not jd_weights:
+        return 50, 'Medium'
+
+    matched = sum(jd_weights[skill] for skill in resume_features['skills'] if skill in jd_weights)
+    skill_match_rate = matched / jd_weights.total
+
+    exp_score = experience_score(resume_features['experience_years'], jd_features['experience_years'])
+
+    score = int((skill_match_rate * 80) + exp_score)
+    score = min(100, max(0, score))
+    return score, relevance_label(score)
+
+
+def match_skills(resume_features, jd_features, jd_skills=None):
+    """Matched and missing skills from feature records"""
+    if jd_skills is None:
+        jd_skills = set(jd_features['skills'])
+    resume_skills = set(resume_features['skills'])
+
+    matched_skills = sorted(resume_skills & jd_skills)
+    missing_skills = sorted(jd_skills - resume_skills)
+
+    return matched_skills[:15], missing_skills[:10]
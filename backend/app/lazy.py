@@ -0,0 +1,78 @@
+import importlib
+import threading
+import time
+
+
+class LazyResource:
+    """A heavy dependency that is built on first use instead of at import.
+
+    get() runs the factory once, even when the first calls race in from
+    several threads. A factory that raises is reported and remembered as
+    None, so a missing model is not retried (and re-downloaded) per request.
+    With cache_failures=False the error is raised instead and the next get()
+    tries again, for resources the caller cannot do without.
+    """
+
+    def __init__(self, name, factory, cache_failures=True):
+        self.name = name
+        self._factory = factory
+        self._cache_failures = cache_failures
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        self._value = self._factory()
+                    except Exception as e:
+                        print(f"Error loading {self.name}: {e}")
+                        if not self._cache_failures:
+                            raise
+                        self._value = None
+                    self._loaded = True
+        return self._value
+
+
+class LazyProxy:
+    """Stands in for the object a LazyResource builds, building it on first attribute access"""
+
+    def __init__(self, resource):
+        object.__setattr__(self, '_resource', resource)
+
+    def __getattr__(self, name):
+        return getattr(self._resource.get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._resource.get(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._resource.get(), name)
+
+
+def warm_up(module_names=(), resources=()):
+    """Import modules and build resources now, so the first request does not pay for them"""
+    start = time.perf_counter()
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"Warmup skipped {module_name}: {e}")
+    for resource in resources:
+        resource.get()
+    print(f"Warmup finished in {time.perf_counter() - start:.2f}s")
+
+
+def start_warmup(module_names=(), resources=(), delay=0):
+    """Run warm_up on a daemon thread after delay seconds; returns the thread"""
+    thread = threading.Timer(delay, warm_up, args=(module_names, resources))
+    thread.daemon = True
+    thread.name = 'warmup'
+    thread.start()
+    return thread
@@ -1,12 +1,48 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, g, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 import os
+from werkzeug.exceptions import ClientDisconnected, RequestEntityTooLarge
 from werkzeug.utils import secure_filename
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
+import hashlib
+import cProfile
+import pstats
+import threading
+import time
 import uuid
-from io import BytesIO
-import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+import gzip
+
+try:
+    from .features import (
+        extract_features, extract_skills_from_text, match_skills, relevance_label, score_features,
+        section_skills, skill_weights
+    )
+    from .batch_scoring import score_matrix
+    from .extraction import extract_texts
+    from .export import EXPORT_FORMATS, iter_csv, iter_json, iter_jsonl, xlsx_bytes
+    from .lazy import LazyProxy, LazyResource, start_warmup
+    from .metrics import metrics
+    from .skills import SKILL_TAXONOMY, TAXONOMY_VERSION
+except ImportError:
+    from features import (
+        extract_features, extract_skills_from_text, match_skills, relevance_label, score_features,
+        section_skills, skill_weights
+    )
+    from batch_scoring import score_matrix
+    from extraction import extract_texts
+    from export import EXPORT_FORMATS, iter_csv, iter_json, iter_jsonl, xlsx_bytes
+    from lazy import LazyProxy, LazyResource, start_warmup
+    from metrics import metrics
+    from skills import SKILL_TAXONOMY, TAXONOMY_VERSION
+
+# Optional: brotli is preferred over gzip when installed and the client accepts it
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
 
@@ -21,7 +57,7 @@ CORS(app, resources={
             "https://innomatics-resume-analyzer.netlify.app",  # ✅ Fixed: Removed trailing slash
         ],
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization", "Accept"],
+        "allow_headers": ["Content-Type", "Authorization", "Accept", "Upload-Offset"],
         "supports_credentials": False,
         "max_age": 3600
     },
@@ -35,6 +71,16 @@ CORS(app, resources={
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Chunked uploads (/api/uploads) are not bound by MAX_FILE_SIZE, which then
+# caps each chunk instead; idle ones are dropped after UPLOAD_SESSION_TTL_HOURS
+CHUNKED_UPLOAD_MAX_SIZE = int(os.environ.get('CHUNKED_UPLOAD_MAX_SIZE', 200 * 1024 * 1024))
+UPLOAD_SESSION_TTL_HOURS = float(os.environ.get('UPLOAD_SESSION_TTL_HOURS', 24))
+# Uploads up to this size are also kept in memory and parsed from there
+UPLOAD_BUFFER_LIMIT = int(os.environ.get('UPLOAD_BUFFER_LIMIT', MAX_FILE_SIZE))
+ANALYZE_CHUNK_SIZE = 200  # resumes whose features are loaded at once while scoring
+# Larger topK values are capped to this many results
+MAX_TOP_K = int(os.environ.get('MAX_TOP_K', 1000))
 
 # Create upload directories
 os.makedirs(os.path.join(UPLOAD_FOLDER, 'jd'), exist_ok=True)
@@ -43,49 +89,91 @@ os.makedirs(os.path.join(UPLOAD_FOLDER, 'resumes'), exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 
-# In-memory data storage
-data_store = {
-    'job_descriptions': {},
-    'resumes': {},
-    'analyses': {}
-}
+# Background ingestion for uploads sent with async=true
+INGEST_WORKERS = int(os.environ.get('INGEST_WORKERS', 2))
+ingest_executor = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix='ingest')
+
+def open_store():
+    """The persistent document store, warmed from the database, with its startup jobs queued"""
+    # Imported here: SQLAlchemy alone is most of the app's import time
+    try:
+        from .store import DocumentStore
+    except ImportError:
+        from store import DocumentStore
+    document_store = DocumentStore()
+    document_store.load()
+    queue_startup_jobs(document_store)
+    return document_store
+
+# Opened on first use (or by warm_up); `store` stands in for it until then.
+# A failure is raised to the request and retried by the next one.
+document_store = LazyResource("document store", open_store, cache_failures=False)
+store = LazyProxy(document_store)
+
+# Heavy libraries are imported on first use. Once the server is up, warm_up()
+# opens the store and loads them in the background so the first request,
+# upload or export does not wait.
+# The sentence-transformers model is opt-in (WARMUP_MODEL=1): loading it pulls
+# in torch and may download weights.
+WARMUP_MODULES = ('PyPDF2', 'numpy', 'pandas', 'openpyxl')
+WARMUP_MODEL = os.environ.get('WARMUP_MODEL', '').lower() in ('1', 'true', 'yes')
+WARMUP_DELAY = float(os.environ.get('WARMUP_DELAY', 1))
+
+# Uploads older than UPLOAD_TTL_HOURS are deleted by a background sweeper that
+# runs every SWEEP_INTERVAL seconds (0, the default, keeps them forever).
+# With ORPHAN_SWEEP=1 the sweeper also removes upload files no document refers
+# to once they are ORPHAN_GRACE seconds old, so files of an upload still in
+# flight are safe. It is off by default: files put in uploads/ by hand, or
+# left by a version that kept documents in memory, have no document either.
+UPLOAD_TTL_HOURS = float(os.environ.get('UPLOAD_TTL_HOURS', 0))
+SWEEP_INTERVAL = float(os.environ.get('SWEEP_INTERVAL', 600))
+ORPHAN_SWEEP = os.environ.get('ORPHAN_SWEEP', '').lower() in ('1', 'true', 'yes')
+ORPHAN_GRACE = 3600
+# The sweeper trims the change log to its newest CHANGE_LOG_KEEP entries (0
+# keeps it all). Workers and ?since= clients further behind resync in full.
+CHANGE_LOG_KEEP = int(os.environ.get('CHANGE_LOG_KEEP', 100000))
+# A startup job abandoned by a crashed worker process is retried after this
+LEASE_SECONDS = 3600
+# JSON responses at least this many bytes are compressed (0 turns it off)
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+
+# With PROFILING_ENABLED=1, any request sent with ?profile=1 is run under
+# cProfile and its stats are written to PROFILE_DIR (see X-Profile-Report)
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+
+def warm_up():
+    resources = [document_store]
+    if WARMUP_MODEL:
+        try:
+            from .utils import embedding_engine
+        except ImportError:
+            from utils import embedding_engine
+        resources.append(embedding_engine)
+    return start_warmup(WARMUP_MODULES, resources, delay=WARMUP_DELAY)
+
+def start_sweeper(interval=SWEEP_INTERVAL):
+    """Run sweep_uploads every interval seconds on a daemon thread; returns the thread"""
+    def run():
+        while True:
+            time.sleep(interval)
+            sweep_uploads()
+    
+    thread = threading.Thread(target=run, name='sweeper', daemon=True)
+    thread.start()
+    return thread
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def extract_text_from_file(file_path, file_extension):
-    """Extract text content from uploaded files"""
+def remove_file(file_path):
+    """Remove an upload file; False if another worker process already did"""
     try:
-        if file_extension == 'pdf':
-            try:
-                import PyPDF2
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    text = ''
-                    for page in pdf_reader.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + ' '
-                    return text
-            except ImportError:
-                return "PDF extraction not available. Install PyPDF2."
-        elif file_extension == 'docx':
-            try:
-                import docx
-                doc = docx.Document(file_path)
-                text = '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-                return text
-            except ImportError:
-                return "DOCX extraction not available. Install python-docx."
-        elif file_extension == 'txt':
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
-        else:
-            return ''
-    except Exception as e:
-        print(f"Error extracting text: {str(e)}")
-        return ''
+        os.remove(file_path)
+        return True
+    except FileNotFoundError:
+        return False
 
 def is_valid_resume(text_content):
     """Lenient validation"""
@@ -99,126 +187,626 @@ def is_valid_job_description(text_content):
         return False, "File appears to be empty"
     return True, None
 
-def extract_years_of_experience(text):
-    """Extract years of experience"""
-    patterns = [
-        r'(\d+)\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience|exp)',
-        r'experience[:\s]+(\d+)\+?\s*(?:years?|yrs?)',
-        r'(\d+)\+?\s*(?:years?|yrs?)\s+in',
-    ]
-    
-    years_found = []
-    for pattern in patterns:
-        matches = re.findall(pattern, text.lower())
-        years_found.extend([int(m) for m in matches if m.isdigit() and 0 < int(m) < 50])
-    
-    date_ranges = re.findall(r'(20\d{2})\s*[-–]\s*(present|current|20\d{2})', text.lower())
-    for start, end in date_ranges:
-        try:
-            if end in ['present', 'current']:
-                years = 2025 - int(start)
-            else:
-                years = int(end) - int(start)
-            if 0 < years < 50:
-                years_found.append(years)
-        except:
-            continue
-    
-    return max(years_found) if years_found else 0
+def calculate_skill_match(resume_text, jd_text):
+    """Calculate matched and missing skills"""
+    return match_skills(extract_features(resume_text), extract_features(jd_text, sections=True))
 
-def extract_location(text):
-    """Extract location"""
-    text_lower = text.lower()
-    
-    cities = {
-        'bangalore': 'Bangalore', 'bengaluru': 'Bangalore',
-        'hyderabad': 'Hyderabad', 'pune': 'Pune', 'mumbai': 'Mumbai',
-        'delhi': 'Delhi NCR', 'noida': 'Delhi NCR', 'gurgaon': 'Delhi NCR',
-        'chennai': 'Chennai', 'kolkata': 'Kolkata', 'ahmedabad': 'Ahmedabad',
-        'jaipur': 'Jaipur', 'kochi': 'Kochi', 'indore': 'Indore'
+def calculate_relevance_score(resume_text, jd_text):
+    """Calculate relevance score"""
+    return score_features(extract_features(resume_text), extract_features(jd_text, sections=True))
+
+def get_features(doc):
+    """Feature record for a stored document, loaded on demand"""
+    return store.get_features(doc.id)
+
+def build_analysis_result(resume_id, resume, resume_features, score, relevance, jd_features, jd_skills):
+    """Result row returned by the analyze endpoints for one resume"""
+    matched_skills, missing_skills = match_skills(resume_features, jd_features, jd_skills)
+    experience_years = resume_features['experience_years']
+    return {
+        'resumeId': resume_id,
+        'filename': resume.filename,
+        'score': score,
+        'relevance': relevance,
+        'analyzed_at': datetime.now().isoformat(),
+        'location': resume_features['location'],
+        'experience': f"{experience_years} years" if experience_years > 0 else "Not specified",
+        'matchedSkills': matched_skills,
+        'missingSkills': missing_skills
     }
+
+def save_upload(file, file_path):
+    """Stream an upload to disk, hashing it on the way.
     
-    for city_key, city_name in cities.items():
-        if re.search(rf'\b{city_key}\b', text_lower):
-            return city_name
+    Returns the SHA-256 hex digest and the bytes, kept so extraction need not
+    read the file back; None instead when they pass UPLOAD_BUFFER_LIMIT.
+    """
+    digest = hashlib.sha256()
+    chunks = []
+    size = 0
+    with open(file_path, 'wb') as out:
+        for chunk in iter(lambda: file.stream.read(UPLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            out.write(chunk)
+            size += len(chunk)
+            if size > UPLOAD_BUFFER_LIMIT:
+                chunks = None
+            elif chunks is not None:
+                chunks.append(chunk)
+    return digest.hexdigest(), b''.join(chunks) if chunks is not None else None
+
+def extraction_job(file_data):
+    # Parsed from memory when the upload's bytes are still there
+    source = file_data.get('buffer') or file_data['file_path']
+    return source, file_data['filename'].rsplit('.', 1)[1].lower()
+
+def parse_document(file_data, text_content):
+    """Validate and featurize extracted text for a saved upload. Returns an error message or None"""
+    if text_content is None:
+        return 'Text extraction timed out or failed'
+    
+    with metrics.timer('upload.validate'):
+        if file_data['upload_type'] == 'jd':
+            is_valid, error_msg = is_valid_job_description(text_content)
+        else:
+            is_valid, error_msg = is_valid_resume(text_content)
+    if not is_valid:
+        return error_msg
     
-    return 'Not specified'
+    file_data['text_content'] = text_content
+    with metrics.timer('upload.features'):
+        file_data['features'] = extract_features(text_content, sections=file_data['upload_type'] == 'jd')
+    file_data['status'] = 'ready'
+    return None
 
-def extract_skills_from_text(text):
-    """Extract technical skills"""
-    text_lower = text.lower()
+def reuse_parsed(file_data, original):
+    """Point an upload at an already-parsed upload from the same request with identical bytes"""
+    file_data['file_path'] = original['file_path']
+    file_data['text_content'] = original['text_content']
+    file_data['features'] = original['features']
+    file_data['status'] = 'ready'
+
+def fail_upload(file_data, error_msg):
+    file_data['error'] = error_msg
+    file_data['status'] = 'failed'
+
+def process_uploads(batch):
+    """Parse saved uploads. Content seen before is not extracted again"""
+    originals = [
+        file_data for file_data in batch
+        if file_data['status'] == 'pending' and 'duplicate_of' not in file_data
+    ]
+    try:
+        with metrics.timer('upload.extract'):
+            extracted = extract_texts([extraction_job(file_data) for file_data in originals])
+        metrics.inc('bytes_parsed_total', sum(file_data['size'] for file_data in originals))
+        metrics.inc('bytes_parsed_from_memory_total', sum(file_data['size'] for file_data in originals
+                                                          if file_data.get('buffer')))
+    except Exception as e:
+        print(f"Extraction error: {str(e)}")
+        extracted = [None] * len(originals)
+    for file_data in batch:
+        file_data.pop('buffer', None)
     
-    all_skills = {
-        'python': 'Python', 'java': 'Java', 'javascript': 'JavaScript', 
-        'typescript': 'TypeScript', 'c++': 'C++', 'c#': 'C#',
-        'react': 'React', 'angular': 'Angular', 'vue': 'Vue.js',
-        'node.js': 'Node.js', 'nodejs': 'Node.js',
-        'django': 'Django', 'flask': 'Flask', 'spring': 'Spring',
-        'aws': 'AWS', 'azure': 'Azure', 'docker': 'Docker', 
-        'kubernetes': 'Kubernetes', 'git': 'Git',
-        'mongodb': 'MongoDB', 'postgresql': 'PostgreSQL', 'mysql': 'MySQL',
-        'html': 'HTML', 'css': 'CSS', 'sql': 'SQL',
-        'machine learning': 'Machine Learning', 'tensorflow': 'TensorFlow',
-        'agile': 'Agile', 'scrum': 'Scrum', 'devops': 'DevOps'
-    }
+    for file_data, result in zip(originals, extracted):
+        text_content, truncated = result or (None, False)
+        try:
+            error_msg = parse_document(file_data, text_content)
+        except Exception as e:
+            error_msg = str(e)
+        if error_msg:
+            fail_upload(file_data, error_msg)
+            remove_file(file_data['file_path'])
+        elif truncated:
+            # Scored on its first EXTRACT_MAX_PAGES pages / EXTRACT_MAX_CHARS characters only
+            file_data['features']['truncated'] = True
     
-    found_skills = []
-    for skill_key, skill_name in all_skills.items():
-        if re.search(rf'\b{re.escape(skill_key)}\b', text_lower):
-            if skill_name not in found_skills:
-                found_skills.append(skill_name)
+    for file_data in batch:
+        original = file_data.pop('duplicate_of', None)
+        if original is None:
+            continue
+        if original['status'] == 'ready':
+            reuse_parsed(file_data, original)
+        else:
+            fail_upload(file_data, original.get('error', 'Identical file failed to parse'))
     
-    return found_skills
+    for file_data in batch:
+        metrics.inc('documents_processed_total', status=file_data['status'])
 
-def calculate_skill_match(resume_text, jd_text):
-    """Calculate matched and missing skills"""
-    resume_skills = set(extract_skills_from_text(resume_text))
-    jd_skills = set(extract_skills_from_text(jd_text))
-    
-    matched_skills = sorted(list(resume_skills.intersection(jd_skills)))
-    missing_skills = sorted(list(jd_skills - resume_skills))
+def save_uploads(batch, validation_errors):
+    """Persist uploads; returns those saved. Files another worker stored first are reported and dropped"""
+    with metrics.timer('upload.persist'):
+        conflicts = store.save_documents(batch)
+    for file_data in conflicts:
+        validation_errors.append(f"{file_data['filename']}: This file was uploaded by another request at the same time")
+        if not store.file_in_use(file_data['file_path']):
+            remove_file(file_data['file_path'])
+    metrics.inc('upload_conflicts_total', len(conflicts))
+    rejected = {file_data['id'] for file_data in conflicts}
+    return [file_data for file_data in batch if file_data['id'] not in rejected]
+
+def stamp_revisions(batch):
+    """Carry a replaced document's revision number into its new feature record"""
+    for file_data in batch:
+        if file_data.get('revision') and file_data.get('features'):
+            file_data['features'] = {**file_data['features'], 'version': file_data['revision']}
+
+def retire_replaced(batch):
+    """Remove files left behind by replaced documents and re-score the analyses they were in"""
+    resume_deltas = {}
+    jd_ids = set()
+    for file_data in batch:
+        replaced = file_data.pop('replaces', None)
+        if replaced is None or file_data['status'] != 'ready':
+            continue
+        old_path = replaced.file_path
+        if old_path != file_data['file_path'] and not store.file_in_use(old_path):
+            remove_file(old_path)
+        if file_data['upload_type'] == 'jd':
+            jd_ids.add(file_data['id'])
+        else:
+            resume_deltas[file_data['id']] = None
+    if resume_deltas or jd_ids:
+        ingest_executor.submit(rescore_analyses, resume_deltas, jd_ids)
+
+def settle_staged(file_data):
+    """Swap a parsed replacement in for its document, or drop it and keep the document as it was"""
+    if file_data['status'] == 'ready':
+        if store.replace_staged(file_data):
+            return
+        fail_upload(file_data, 'File was deleted while its replacement was being processed')
+        if not store.file_in_use(file_data['file_path']):
+            remove_file(file_data['file_path'])
+    elif file_data['status'] == 'failed':
+        store.drop_staged(file_data, f"Replacement failed: {file_data['error']}. The previous version was kept")
+    # Still pending when parsing broke off: staged rows are parsed again on startup
+
+def ingest_uploads(batch):
+    """Background ingestion: parse queued uploads and persist the outcome"""
+    try:
+        process_uploads(batch)
+        stamp_revisions(batch)
+    finally:
+        with metrics.timer('upload.persist'):
+            store.save_documents([file_data for file_data in batch if 'staged_id' not in file_data])
+            for file_data in batch:
+                if 'staged_id' in file_data:
+                    settle_staged(file_data)
+    retire_replaced(batch)
+
+def is_ready(doc):
+    return doc.status == 'ready'
+
+def delete_documents(file_ids):
+    """Delete documents everywhere they are kept, including upload files nothing else shares"""
+    deleted, unused_paths = store.delete_documents(file_ids)
+    for file_path in unused_paths:
+        remove_file(file_path)
+    return deleted
+
+def remove_orphans(in_progress):
+    """Remove upload files older than ORPHAN_GRACE that neither a document nor a chunked upload uses"""
+    orphans = 0
+    cutoff = time.time() - ORPHAN_GRACE
+    for folder in ('jd', 'resumes'):
+        with os.scandir(os.path.join(UPLOAD_FOLDER, folder)) as entries:
+            for entry in entries:
+                if (entry.is_file() and entry.stat().st_mtime < cutoff and entry.path not in in_progress
+                        and not store.file_in_use(entry.path)):
+                    orphans += remove_file(entry.path)
+    return orphans
+
+def sweep_uploads():
+    """Delete expired uploads, abandoned chunked uploads and, with ORPHAN_SWEEP, unreferenced upload files"""
+    try:
+        store.refresh()
+        expired = []
+        if UPLOAD_TTL_HOURS > 0:
+            expired = delete_documents(store.expired_documents(datetime.now() - timedelta(hours=UPLOAD_TTL_HOURS)))
+        
+        # Chunked uploads left idle, e.g. by a client that never came back
+        abandoned = store.upload_sessions(datetime.now() - timedelta(hours=UPLOAD_SESSION_TTL_HOURS))
+        for upload_id, file_path in abandoned:
+            abort_upload({'id': upload_id, 'file_path': file_path})
+        
+        sessions = store.upload_sessions()
+        in_progress = {file_path for _, file_path in sessions}
+        open_ids = {upload_id for upload_id, _ in sessions}
+        for upload_id in list(upload_progress):
+            if upload_id not in open_ids:
+                upload_progress.pop(upload_id, None)
+        
+        orphans = remove_orphans(in_progress) if ORPHAN_SWEEP else 0
+        metrics.inc('orphan_files_removed_total', orphans)
+        metrics.inc('upload_sessions_expired_total', len(abandoned))
+        if CHANGE_LOG_KEEP > 0:
+            metrics.inc('change_log_compacted_total', store.compact_changes(CHANGE_LOG_KEEP))
+        if expired or orphans or abandoned:
+            print(f"Sweeper: deleted {len(expired)} expired document(s), {orphans} orphaned file(s), "
+                  f"{len(abandoned)} abandoned chunked upload(s)")
+    except Exception as e:
+        print(f"Sweeper error: {str(e)}")
+
+def rescore_analyses(resume_deltas=None, jd_ids=()):
+    """Re-score only the (resume, JD) pairs that changed features can move.
     
-    return matched_skills[:15], missing_skills[:10]
+    resume_deltas maps a resume id to the skills it gained or lost, or to None
+    when anything about it may have changed. A resume row is re-scored only if
+    its delta touches the JD's skills; every row of an analysis whose JD is in
+    jd_ids is re-scored. Each touched analysis gets a new version and the old
+    one stays readable. Returns the number of rows re-scored.
+    """
+    try:
+        store.refresh()
+        resume_deltas = resume_deltas or {}
+        jd_ids = set(jd_ids)
+        targets = store.analyses_with_resumes(resume_deltas) if resume_deltas else {}
+        for jd_id in jd_ids:
+            for analysis_id in list(store.jd_analyses.get(jd_id, ())):
+                targets[analysis_id] = store.analysis_rows(analysis_id)
+        
+        rescored = 0
+        for analysis_id, rows in targets.items():
+            jd = store.job_descriptions.get(store.analyses[analysis_id])
+            if not jd or not is_ready(jd):
+                continue
+            jd_features = get_features(jd)
+            jd_skills = set(jd_features['skills'])
+            jd_weights = skill_weights(jd_features)
+            if jd.id not in jd_ids:
+                rows = [(position, resume_id) for position, resume_id in rows
+                        if resume_deltas[resume_id] is None or resume_deltas[resume_id] & jd_skills]
+            
+            resumes = {resume_id: store.resumes.get(resume_id) for _, resume_id in rows}
+            features_by_id = store.get_features_many(
+                [resume_id for resume_id, resume in resumes.items() if resume and is_ready(resume)]
+            )
+            replacements = {}
+            for position, resume_id in rows:
+                # Resumes that are gone keep their old row
+                if resume_id not in features_by_id:
+                    continue
+                resume_features = features_by_id[resume_id]
+                score, relevance = score_features(resume_features, jd_features, jd_weights)
+                replacements[position] = build_analysis_result(
+                    resume_id, resumes[resume_id], resume_features, score, relevance, jd_features, jd_skills
+                )
+            if replacements:
+                store.add_analysis_version(analysis_id, replacements, jd_features.get('version', 1))
+                rescored += len(replacements)
+        metrics.inc('resumes_rescored_total', rescored)
+        return rescored
+    except Exception as e:
+        print(f"Rescoring error: {str(e)}")
+        return 0
 
-def calculate_relevance_score(resume_text, jd_text):
-    """Calculate relevance score"""
-    if not resume_text or not jd_text:
-        return 50, 'Medium'
+def refresh_taxonomy(keys):
+    """Re-extract skills of documents that mention a changed taxonomy key, then re-score what moved"""
+    try:
+        store.refresh()
+        updated = {}
+        resume_deltas = {}
+        jd_ids = set()
+        with metrics.timer('taxonomy.refresh'):
+            for file_id, features in store.documents_containing(keys).items():
+                skills = extract_skills_from_text(features['normalized_text'])
+                delta = set(skills) ^ set(features['skills'])
+                if not delta:
+                    continue
+                updated[file_id] = {**features, 'skills': skills, 'taxonomy_version': TAXONOMY_VERSION}
+                if file_id in store.job_descriptions:
+                    updated[file_id].update(section_skills(store.get_text(file_id)))
+                if file_id in store.resumes:
+                    resume_deltas[file_id] = delta
+                else:
+                    jd_ids.add(file_id)
+            store.update_features(updated)
+            rescored = rescore_analyses(resume_deltas, jd_ids)
+        store.taxonomy_applied(TAXONOMY_VERSION)
+        print(f"Skill taxonomy {TAXONOMY_VERSION}: updated {len(updated)} document(s), re-scored {rescored} result(s)")
+    except Exception as e:
+        print(f"Taxonomy refresh error: {str(e)}")
+    finally:
+        store.release(f'taxonomy:{TAXONOMY_VERSION}')
+
+def add_section_skills(jd_ids):
+    """Give JDs stored before section weighting their section skills, then re-score their analyses"""
+    try:
+        store.refresh()
+        sections = {}
+        with metrics.timer('jd_sections.upgrade'):
+            for jd_id in jd_ids:
+                if jd_id in store.job_descriptions:
+                    sections[jd_id] = section_skills(store.get_text(jd_id))
+            # Only these keys are written, so a taxonomy refresh running
+            # alongside keeps the skills it sets
+            store.set_feature_fields(sections)
+            rescored = rescore_analyses({}, sections)
+        print(f"Section skills: added to {len(sections)} job description(s), re-scored {rescored} result(s)")
+    except Exception as e:
+        print(f"Section skills error: {str(e)}")
+    finally:
+        store.release('jd_sections')
+
+def reingest_pending(batch):
+    try:
+        ingest_uploads(batch)
+    finally:
+        store.release('pending_uploads')
+
+def queue_startup_jobs(document_store):
+    """Queue the jobs a freshly opened store needs, given the store itself (not the `store` proxy)"""
+    # Uploads still pending when the last process stopped are parsed again.
+    # With several worker processes, the one holding the lease does it.
+    pending_uploads = document_store.pending_documents()
+    if pending_uploads and document_store.claim('pending_uploads', LEASE_SECONDS):
+        ingest_executor.submit(reingest_pending, pending_uploads)
+
+    # Feature records and analyses are tagged with the skill taxonomy they were
+    # built with. When SKILL_TAXONOMY has changed since the last run, only the
+    # documents that mention a changed key are refreshed, in the background.
+    changed_taxonomy_keys = document_store.sync_taxonomy(TAXONOMY_VERSION, SKILL_TAXONOMY)
+    if changed_taxonomy_keys and document_store.claim(f'taxonomy:{TAXONOMY_VERSION}', LEASE_SECONDS):
+        ingest_executor.submit(refresh_taxonomy, changed_taxonomy_keys)
+
+    # JDs stored before section weighting have no must-have/nice-to-have
+    # skills, so they would keep equal weights; they get them once, here.
+    legacy_jds = document_store.job_descriptions_without('must_have_skills')
+    if legacy_jds and document_store.claim('jd_sections', LEASE_SECONDS):
+        ingest_executor.submit(add_section_skills, legacy_jds)
+
+@app.before_request
+def refresh_store():
+    # Other worker processes may have written since this one last looked
+    store.refresh()
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    if PROFILING_ENABLED and request.args.get('profile') == '1':
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def record_request(response):
+    endpoint = request.endpoint or 'unmatched'
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        # Streaming responses are profiled up to the first byte only
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        report_path = os.path.join(PROFILE_DIR, f"{endpoint}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}")
+        profiler.dump_stats(report_path + '.pstats')
+        with open(report_path + '.txt', 'w') as report:
+            pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(40)
+        response.headers['X-Profile-Report'] = report_path + '.pstats'
+    if 'request_started' in g:
+        metrics.observe('request_seconds', time.perf_counter() - g.request_started, endpoint=endpoint)
+    metrics.inc('requests_total', endpoint=endpoint, status=response.status_code)
+    return response
+
+@app.after_request
+def compress_response(response):
+    """gzip or brotli encode large JSON bodies the client accepts"""
+    if (not COMPRESS_MIN_SIZE or response.status_code != 200 or response.direct_passthrough
+            or response.is_streamed or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    if response.content_length is not None and response.content_length < COMPRESS_MIN_SIZE:
+        return response
+    encodings = request.accept_encodings
+    encoding = 'br' if brotli and encodings['br'] else 'gzip' if encodings['gzip'] else None
+    if encoding is None:
+        return response
     
-    jd_skills = set(extract_skills_from_text(jd_text))
-    resume_skills = set(extract_skills_from_text(resume_text))
+    with metrics.timer('response.compress'):
+        body = response.get_data()
+        compressed = brotli.compress(body, quality=5) if encoding == 'br' else gzip.compress(body, compresslevel=6)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        # A strong ETag names one exact representation
+        response.set_etag(f'{etag}-{encoding}', weak)
+    metrics.inc('compressed_responses_total', encoding=encoding)
+    metrics.inc('compression_saved_bytes_total', len(body) - len(compressed))
+    return response
+
+def store_etag(version):
+    """Strong ETag for this request's response, built from the store as of version.
+
+    The path and the sorted query are hashed in, so the tag of one listing,
+    filter or ?since= never validates the response to another.
+    """
+    query = urlencode(sorted(request.args.items(multi=True)))
+    digest = hashlib.sha256(f'{request.path}?{query}'.encode('utf-8')).hexdigest()[:16]
+    return f'v{version}-{digest}'
+
+def not_modified(etag):
+    """304 response when the client's copy is the current version, else None"""
+    for tag in (etag, f'{etag}-gzip', f'{etag}-br'):
+        if request.if_none_match.contains(tag):
+            metrics.inc('responses_not_modified_total', endpoint=request.endpoint)
+            response = Response(status=304)
+            response.set_etag(tag)
+            response.headers['Cache-Control'] = 'no-cache'
+            # Same Vary as the 200 it stands for: the tag depends on the encoding
+            response.vary.add('Accept-Encoding')
+            return response
+    return None
+
+def versioned(response, etag):
+    """Tag a listing so clients revalidate it instead of re-downloading"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def parse_since():
+    """?since=<version> as an int, None when absent; ValueError when malformed"""
+    since = request.args.get('since')
+    if since is None:
+        return None
+    since = int(since)
+    if since < 0:
+        raise ValueError(since)
+    return since
+
+def parse_top_k(value, default=None):
+    """topK of a request body capped at MAX_TOP_K; ValueError unless a positive integer"""
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(value)
+    if isinstance(value, str) and not value.strip().isdigit():
+        raise ValueError(value)
+    top_k = int(value)
+    if top_k <= 0:
+        raise ValueError(value)
+    return min(top_k, MAX_TOP_K)
+
+def filename_conflict(upload_type, existing, replace_mode):
+    """Why a file named like existing cannot be uploaded as upload_type, or None"""
+    if existing and replace_mode and store.replacing(existing.id):
+        return 'A replacement of this file is still being processed'
+    if not existing or (replace_mode and existing.upload_type == upload_type):
+        return None
+    if existing.upload_type == 'jd':
+        if upload_type == 'jd':
+            return 'This file is already uploaded as a Job Description'
+        return 'Cannot upload JD file as resume. This file already exists as a Job Description'
+    if upload_type == 'resume':
+        return 'This file is already uploaded as a Resume'
+    return 'Cannot upload resume file as JD. This file already exists as a Resume'
+
+def upload_target(filename, upload_type, existing):
+    """(file id, revision, path) for an upload; a replacement keeps the id and gets the next revision"""
+    file_id = existing.id if existing else str(uuid.uuid4())
+    revision = None
+    if existing:
+        revision = (store.get_features(existing.id) or {}).get('version', 1) + 1
     
-    if not jd_skills:
-        return 50, 'Medium'
+    folder = 'jd' if upload_type == 'jd' else 'resumes'
+    stored_name = f"{file_id}_v{revision}_{filename}" if revision else f"{file_id}_{filename}"
+    return file_id, revision, os.path.join(UPLOAD_FOLDER, folder, stored_name)
+
+def new_upload(file_id, filename, file_path, upload_type, content_hash, buffer, existing=None, revision=None):
+    """file_data for an upload saved at file_path, ready for dedup_upload and ingestion"""
+    size = os.path.getsize(file_path)
+    metrics.inc('upload_bytes_total', size)
+    file_data = {
+        'id': file_id,
+        'filename': filename,
+        'file_path': file_path,
+        'upload_type': upload_type,
+        'uploaded_at': datetime.now().isoformat(),
+        'size': size,
+        'content_hash': content_hash,
+        'buffer': buffer,
+        'status': 'pending'
+    }
+    if existing:
+        file_data['replaces'] = existing
+        file_data['revision'] = revision
+    return file_data
+
+def dedup_upload(file_data, hashes_in_request):
+    """Identical bytes are kept on disk and parsed only once"""
+    content_hash = file_data['content_hash']
+    with metrics.timer('upload.dedup'):
+        stored = store.find_by_hash(content_hash)
+        if stored:
+            os.remove(file_data['file_path'])
+            file_data.pop('buffer', None)
+            file_data['file_path'] = stored.file_path
+            file_data['text_content'], file_data['features'] = store.get_content(stored.id)
+            file_data['status'] = 'ready'
+            metrics.inc('upload_dedup_hits_total')
+        elif content_hash in hashes_in_request:
+            os.remove(file_data['file_path'])
+            file_data.pop('buffer', None)
+            file_data['file_path'] = hashes_in_request[content_hash]['file_path']
+            file_data['duplicate_of'] = hashes_in_request[content_hash]
+            metrics.inc('upload_dedup_hits_total')
+        else:
+            hashes_in_request[content_hash] = file_data
+
+def needs_staging(file_data):
+    """A replacement still to be parsed; it must not take its document's place before that succeeds"""
+    return 'replaces' in file_data and file_data['status'] == 'pending'
+
+def ingest_saved(saved_files, validation_errors, async_mode):
+    """Parse and persist saved uploads, or queue them with async_mode; returns those accepted"""
+    if async_mode:
+        for file_data in saved_files:
+            # Queued uploads are parsed from disk rather than held in memory
+            file_data.pop('buffer', None)
+        staged = [file_data for file_data in saved_files if needs_staging(file_data)]
+        if staged:
+            store.stage_replacements(staged)
+        others = [file_data for file_data in saved_files if not needs_staging(file_data)]
+        saved_ids = {file_data['id'] for file_data in save_uploads(others, validation_errors)} if others else set()
+        accepted_files = [file_data for file_data in saved_files
+                          if 'staged_id' in file_data or file_data['id'] in saved_ids]
+        if accepted_files:
+            ingest_executor.submit(ingest_uploads, accepted_files)
+        return accepted_files
     
-    matching_skills = jd_skills.intersection(resume_skills)
-    skill_match_rate = len(matching_skills) / len(jd_skills)
+    # Multi-file uploads extract in parallel worker processes
+    process_uploads(saved_files)
+    accepted_files = []
+    for file_data in saved_files:
+        if file_data['status'] != 'ready':
+            validation_errors.append(f"{file_data['filename']}: {file_data['error']}")
+            continue
+        accepted_files.append(file_data)
+    stamp_revisions(accepted_files)
+    accepted_files = save_uploads(accepted_files, validation_errors)
+    retire_replaced(accepted_files)
+    return accepted_files
+
+def upload_response(accepted_files, validation_errors, async_mode):
+    uploaded_files = []
+    file_ids = []
+    for file_data in accepted_files:
+        uploaded_files.append({
+            'id': file_data['id'],
+            'filename': file_data['filename'],
+            'size': file_data['size'],
+            'status': 'pending' if async_mode else 'ready'
+        })
+        if file_data.get('features', {}).get('truncated'):
+            uploaded_files[-1]['truncated'] = True
+        file_ids.append(file_data['id'])
     
-    jd_experience = extract_years_of_experience(jd_text)
-    resume_experience = extract_years_of_experience(resume_text)
+    if len(uploaded_files) == 0 and len(validation_errors) > 0:
+        return jsonify({
+            'success': False,
+            'error': 'All files failed validation',
+            'validation_errors': validation_errors
+        }), 400
     
-    exp_score = 0
-    if jd_experience > 0:
-        if resume_experience >= jd_experience:
-            exp_score = 20
-        elif resume_experience >= jd_experience * 0.7:
-            exp_score = 15
-        else:
-            exp_score = 10
-    else:
-        exp_score = 15
+    response_data = {
+        'success': True,
+        'message': f'{len(uploaded_files)} file(s) uploaded successfully',
+        'data': {
+            'fileIds': file_ids,
+            'fileId': file_ids[0] if len(file_ids) == 1 else None,
+            'files': uploaded_files
+        }
+    }
     
-    score = int((skill_match_rate * 80) + exp_score)
-    score = min(100, max(0, score))
+    if validation_errors:
+        response_data['warnings'] = validation_errors
     
-    if score >= 70:
-        relevance = 'High'
-    elif score >= 40:
-        relevance = 'Medium'
-    else:
-        relevance = 'Low'
+    if async_mode:
+        response_data['message'] = f'{len(uploaded_files)} file(s) queued for processing'
+        return jsonify(response_data), 202
     
-    return score, relevance
+    return jsonify(response_data), 200
+
+def flag(name):
+    return request.values.get(name, 'false').lower() in ('1', 'true', 'yes')
 
 @app.route('/api/upload', methods=['POST'])
 def upload_files():
@@ -228,13 +816,17 @@ def upload_files():
         
         files = request.files.getlist('files')
         upload_type = request.form.get('type', 'resume')
+        async_mode = flag('async')
+        # replace=true re-uploads a file under the same name, keeping its id
+        replace_mode = flag('replace')
         
         if not files:
             return jsonify({'success': False, 'error': 'No files selected'}), 400
         
-        uploaded_files = []
-        file_ids = []
         validation_errors = []
+        saved_files = []
+        names_in_request = set()
+        hashes_in_request = {}
         
         for file in files:
             if file.filename == '':
@@ -245,217 +837,763 @@ def upload_files():
                 continue
             
             filename_lower = secure_filename(file.filename).lower()
-            skip_file = False
-            
-            # Check if file already exists in JD section
-            for jd_id, jd_data in data_store['job_descriptions'].items():
-                if jd_data['filename'].lower() == filename_lower:
-                    if upload_type == 'jd':
-                        validation_errors.append(f'{file.filename}: This file is already uploaded as a Job Description')
-                    else:
-                        validation_errors.append(f'{file.filename}: Cannot upload JD file as resume. This file already exists as a Job Description')
-                    skip_file = True
-                    break
-            
-            # Check if file already exists in Resume section
-            if not skip_file:
-                for resume_id, resume_data in data_store['resumes'].items():
-                    if resume_data['filename'].lower() == filename_lower:
-                        if upload_type == 'resume':
-                            validation_errors.append(f'{file.filename}: This file is already uploaded as a Resume')
-                        else:
-                            validation_errors.append(f'{file.filename}: Cannot upload resume file as JD. This file already exists as a Resume')
-                        skip_file = True
-                        break
+            if filename_lower in names_in_request:
+                validation_errors.append(f'{file.filename}: Duplicate file in this upload')
+                continue
             
-            if skip_file:
+            with metrics.timer('upload.filename_check'):
+                existing = store.find_by_filename(filename_lower)
+            conflict = filename_conflict(upload_type, existing, replace_mode)
+            if conflict:
+                validation_errors.append(f'{file.filename}: {conflict}')
                 continue
             
-            file_id = str(uuid.uuid4())
             filename = secure_filename(file.filename)
-            file_extension = filename.rsplit('.', 1)[1].lower()
-            
-            folder = 'jd' if upload_type == 'jd' else 'resumes'
-            file_path = os.path.join(UPLOAD_FOLDER, folder, f"{file_id}_{filename}")
-            file.save(file_path)
-            
-            text_content = extract_text_from_file(file_path, file_extension)
-            
-            if upload_type == 'resume':
-                is_valid, error_msg = is_valid_resume(text_content)
-                if not is_valid:
-                    os.remove(file_path)
-                    validation_errors.append(f'{filename}: {error_msg}')
-                    continue
-            elif upload_type == 'jd':
-                is_valid, error_msg = is_valid_job_description(text_content)
-                if not is_valid:
-                    os.remove(file_path)
-                    validation_errors.append(f'{filename}: {error_msg}')
-                    continue
+            file_id, revision, file_path = upload_target(filename, upload_type, existing)
+            with metrics.timer('upload.save'):
+                content_hash, buffer = save_upload(file, file_path)
             
-            file_data = {
-                'id': file_id,
-                'filename': filename,
-                'file_path': file_path,
-                'upload_type': upload_type,
-                'uploaded_at': datetime.now().isoformat(),
-                'size': os.path.getsize(file_path),
-                'text_content': text_content
-            }
-            
-            if upload_type == 'jd':
-                data_store['job_descriptions'][file_id] = file_data
-            else:
-                data_store['resumes'][file_id] = file_data
-            
-            uploaded_files.append({
-                'id': file_id,
-                'filename': filename,
-                'size': file_data['size']
-            })
-            file_ids.append(file_id)
+            file_data = new_upload(file_id, filename, file_path, upload_type, content_hash, buffer, existing, revision)
+            dedup_upload(file_data, hashes_in_request)
+            saved_files.append(file_data)
+            names_in_request.add(filename_lower)
         
-        if len(uploaded_files) == 0 and len(validation_errors) > 0:
-            return jsonify({
-                'success': False,
-                'error': 'All files failed validation',
-                'validation_errors': validation_errors
-            }), 400
+        accepted_files = ingest_saved(saved_files, validation_errors, async_mode)
+        return upload_response(accepted_files, validation_errors, async_mode)
         
-        response_data = {
-            'success': True,
-            'message': f'{len(uploaded_files)} file(s) uploaded successfully',
-            'data': {
-                'fileIds': file_ids,
-                'fileId': file_ids[0] if len(file_ids) == 1 else None,
-                'files': uploaded_files
-            }
-        }
+    except Exception as e:
+        print(f"Upload error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Chunked uploads, for files past MAX_FILE_SIZE or batches that would be:
+# POST /api/uploads opens one, each POST /api/uploads/<id>/append?offset=
+# writes the next chunk (at most MAX_FILE_SIZE) straight into the file's final
+# location, and POST /api/uploads/<id>/finalize ingests it. After a
+# disconnect, GET /api/uploads/<id> tells where to resume.
+#
+# The digest and, up to UPLOAD_BUFFER_LIMIT, the bytes of an upload are
+# built as chunks arrive so finalize neither rehashes nor re-reads the file.
+# That state lives in the worker process that took the chunks; when chunks
+# are spread over several, finalize hashes the file from disk instead.
+upload_progress = {}
+CHUNK_WRITE_TIMEOUT = 600  # a chunk still being written after this is presumed abandoned
+
+def start_progress(upload_id, size):
+    upload_progress[upload_id] = {
+        'offset': 0,
+        'digest': hashlib.sha256(),
+        'chunks': [] if size <= UPLOAD_BUFFER_LIMIT else None
+    }
+
+def session_entry(upload):
+    return {
+        'uploadId': upload['id'],
+        'fileId': upload['file_id'],
+        'filename': upload['filename'],
+        'type': upload['upload_type'],
+        'size': upload['size'],
+        'offset': upload['offset'],
+        'status': upload['status']
+    }
+
+def chunk_offset():
+    """Offset a chunk is written at, from ?offset= or the Upload-Offset header"""
+    offset = request.args.get('offset', request.headers.get('Upload-Offset'))
+    if offset is None or not offset.isdigit():
+        raise ValueError('Missing or invalid offset')
+    return int(offset)
+
+def write_chunk(file_path, offset, limit, progress):
+    """Stream the request body into file_path at offset; returns (bytes written, error).
+
+    error is None, 'overflow' when the body runs past limit (writing stops
+    at the first byte past it), or 'too_large' when it runs past
+    MAX_CONTENT_LENGTH. Bytes written before either, or before a client
+    disconnect, still count, so the upload resumes after them.
+    """
+    written = 0
+    overflow = False
+    try:
+        with open(file_path, 'r+b') as out:
+            out.seek(offset)
+            while True:
+                chunk = request.stream.read(min(UPLOAD_CHUNK_SIZE, limit - written + 1))
+                if not chunk:
+                    break
+                if written + len(chunk) > limit:
+                    chunk = chunk[:limit - written]
+                    overflow = True
+                out.write(chunk)
+                written += len(chunk)
+                if progress is not None:
+                    progress['digest'].update(chunk)
+                    if progress['chunks'] is not None:
+                        progress['chunks'].append(chunk)
+                if overflow:
+                    break
+    except ClientDisconnected:
+        print(f"Upload chunk interrupted after {written} bytes: {file_path}")
+    except RequestEntityTooLarge:
+        return written, 'too_large'
+    return written, 'overflow' if overflow else None
+
+def hash_file(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(UPLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def abort_upload(upload):
+    store.delete_upload_session(upload['id'])
+    upload_progress.pop(upload['id'], None)
+    if not store.file_in_use(upload['file_path']):
+        remove_file(upload['file_path'])
+
+@app.route('/api/uploads', methods=['POST'])
+def start_chunked_upload():
+    """Open a chunked upload: JSON {filename, type, size, sha256?, replace?}"""
+    try:
+        data = request.get_json(silent=True) or {}
+        upload_type = data.get('type', 'resume')
+        filename = secure_filename(data.get('filename') or '')
+        size = data.get('size')
+        expected_hash = (data.get('sha256') or '').lower() or None
+        
+        if upload_type not in ('jd', 'resume'):
+            return jsonify({'success': False, 'error': 'type must be jd or resume'}), 400
+        if not filename or not allowed_file(filename):
+            return jsonify({'success': False, 'error': 'Invalid file type'}), 400
+        if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+            return jsonify({'success': False, 'error': 'size must be a positive number of bytes'}), 400
+        if size > CHUNKED_UPLOAD_MAX_SIZE:
+            return jsonify({'success': False, 'error': f'File is larger than {CHUNKED_UPLOAD_MAX_SIZE} bytes'}), 413
         
-        if validation_errors:
-            response_data['warnings'] = validation_errors
+        existing = store.find_by_filename(filename)
+        conflict = filename_conflict(upload_type, existing, bool(data.get('replace')))
+        if conflict:
+            return jsonify({'success': False, 'error': f'{filename}: {conflict}'}), 409
         
-        return jsonify(response_data), 200
+        file_id, revision, file_path = upload_target(filename, upload_type, existing)
+        try:
+            open(file_path, 'xb').close()
+        except FileExistsError:
+            return jsonify({'success': False, 'error': f'{filename}: This file is already being uploaded'}), 409
         
+        upload_id = str(uuid.uuid4())
+        store.create_upload_session(id=upload_id, file_id=file_id, filename=filename, upload_type=upload_type,
+                                    file_path=file_path, size=size, revision=revision, sha256=expected_hash)
+        start_progress(upload_id, size)
+        metrics.inc('chunked_uploads_started_total')
+        return jsonify({'success': True, 'data': {**session_entry(store.get_upload_session(upload_id)),
+                                                  'maxChunkSize': MAX_FILE_SIZE}}), 201
     except Exception as e:
-        print(f"Upload error: {str(e)}")
+        print(f"Chunked upload error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_chunked_upload(upload_id):
+    """Where an interrupted upload resumes from"""
+    upload = store.get_upload_session(upload_id)
+    if not upload:
+        return jsonify({'success': False, 'error': 'Upload not found'}), 404
+    return jsonify({'success': True, 'data': session_entry(upload)}), 200
+
+def chunk_too_large(offset):
+    return jsonify({'success': False, 'error': f'Chunk is larger than {request.max_content_length} bytes',
+                    'offset': offset}), 413
+
+@app.route('/api/uploads/<upload_id>/append', methods=['POST'])
+def append_chunk(upload_id):
+    """Write the request body at ?offset=, which must be where the upload currently ends"""
+    try:
+        offset = chunk_offset()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    try:
+        upload = store.get_upload_session(upload_id)
+        if not upload:
+            return jsonify({'success': False, 'error': 'Upload not found'}), 404
+        limit = request.max_content_length
+        if limit is not None and request.content_length is not None and request.content_length > limit:
+            # Refused before the chunk is claimed, so nothing has to be released
+            return chunk_too_large(upload['offset'])
+        if not store.begin_upload_chunk(upload_id, offset, CHUNK_WRITE_TIMEOUT):
+            upload = store.get_upload_session(upload_id) or upload
+            return jsonify({'success': False, 'error': 'Offset does not match the upload, or a chunk is being written',
+                            'offset': upload['offset'], 'status': upload['status']}), 409
+        
+        progress = upload_progress.get(upload_id)
+        if progress is not None and progress['offset'] != offset:
+            # Earlier chunks went to another worker process
+            upload_progress.pop(upload_id, None)
+            progress = None
+        written = 0
+        try:
+            with metrics.timer('upload.chunk'):
+                written, error = write_chunk(upload['file_path'], offset, upload['size'] - offset, progress)
+            if progress is not None:
+                progress['offset'] = offset + written
+                if progress['chunks'] is not None and progress['offset'] > UPLOAD_BUFFER_LIMIT:
+                    progress['chunks'] = None
+        finally:
+            if not store.end_upload_chunk(upload_id, offset, written):
+                upload_progress.pop(upload_id, None)
+        metrics.inc('upload_bytes_total', written)
+        
+        if error == 'too_large':
+            return chunk_too_large(offset + written)
+        if error == 'overflow':
+            return jsonify({'success': False, 'error': 'Chunk runs past the declared size',
+                            'offset': offset + written}), 400
+        return jsonify({'success': True, 'data': {'offset': offset + written, 'size': upload['size']}}), 200
+    except Exception as e:
+        print(f"Chunk upload error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_chunked_upload(upload_id):
+    """Ingest a complete chunked upload; responds like /api/upload (async=true queues it)"""
+    upload = store.get_upload_session(upload_id)
+    if not upload:
+        return jsonify({'success': False, 'error': 'Upload not found'}), 404
+    if upload['offset'] != upload['size'] or not store.set_upload_session_status(upload_id, 'finalizing', 'open'):
+        return jsonify({'success': False, 'error': 'Upload is incomplete or already being finalized',
+                        'offset': upload['offset'], 'status': upload['status']}), 409
+    
+    try:
+        async_mode = flag('async')
+        file_path = upload['file_path']
+        progress = upload_progress.pop(upload_id, None)
+        if progress is not None and progress['offset'] == upload['size']:
+            content_hash = progress['digest'].hexdigest()
+            buffer = b''.join(progress['chunks']) if progress['chunks'] is not None else None
+        else:
+            with metrics.timer('upload.rehash'):
+                content_hash = hash_file(file_path)
+            buffer = None
+            metrics.inc('upload_rehash_total')
+        
+        error = None
+        if upload['sha256'] and upload['sha256'] != content_hash:
+            error = 'SHA-256 of the uploaded bytes does not match'
+        existing = store.find_by_filename(upload['filename'])
+        if existing and existing.id != upload['file_id']:
+            error = filename_conflict(upload['upload_type'], existing, False)
+        if error:
+            abort_upload(upload)
+            return jsonify({'success': False, 'error': f"{upload['filename']}: {error}"}), 409
+        
+        file_data = new_upload(upload['file_id'], upload['filename'], file_path, upload['upload_type'],
+                               content_hash, buffer, existing, upload['revision'] if existing else None)
+        dedup_upload(file_data, {})
+        validation_errors = []
+        accepted_files = ingest_saved([file_data], validation_errors, async_mode)
+        store.delete_upload_session(upload_id)
+        metrics.inc('chunked_uploads_finalized_total')
+        return upload_response(accepted_files, validation_errors, async_mode)
+    except Exception as e:
+        print(f"Finalize error: {str(e)}")
+        store.set_upload_session_status(upload_id, 'open', 'finalizing')
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+def abort_chunked_upload(upload_id):
+    upload = store.get_upload_session(upload_id)
+    if not upload:
+        return jsonify({'success': False, 'error': 'Upload not found'}), 404
+    if upload['status'] == 'finalizing':
+        return jsonify({'success': False, 'error': 'Upload is being finalized'}), 409
+    abort_upload(upload)
+    return jsonify({'success': True, 'message': 'Upload aborted'}), 200
+
+@app.route('/api/upload/status', methods=['GET'])
+def get_upload_status():
+    """Poll the parse state of uploads, e.g. ?ids=<id1>,<id2>"""
+    try:
+        ids = [file_id for file_id in request.args.get('ids', '').split(',') if file_id]
+        if not ids:
+            return jsonify({'success': False, 'error': 'Missing ids'}), 400
+        
+        statuses = []
+        for file_id in ids:
+            # A replacement being parsed reports on itself, the document it replaces once settled
+            doc = store.replacing(file_id) or store.get_document(file_id)
+            if not doc:
+                statuses.append({'id': file_id, 'status': 'not_found'})
+                continue
+            entry = {'id': file_id, 'filename': doc.filename, 'status': doc.status}
+            if doc.error:
+                entry['error'] = doc.error
+            statuses.append(entry)
+        
+        pending = sum(1 for entry in statuses if entry['status'] == 'pending')
+        return jsonify({'success': True, 'files': statuses, 'pending': pending, 'done': pending == 0}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def parse_analyze_request():
+    """Returns (jd, resume_ids, None) or (None, None, error_response) for the analyze endpoints"""
+    data = request.get_json(silent=True) or {}
+    job_description_id = data.get('jobDescriptionId')
+    resume_ids = data.get('resumeIds', [])
+    
+    if not job_description_id or not resume_ids:
+        return None, None, (jsonify({'success': False, 'error': 'Missing parameters'}), 400)
+    
+    jd = store.job_descriptions.get(job_description_id)
+    if not jd:
+        return None, None, (jsonify({'success': False, 'error': 'Job description not found'}), 404)
+    if not is_ready(jd):
+        return None, None, (jsonify({'success': False, 'error': f"Job description is {jd.status}"}), 409)
+    return jd, resume_ids, None
+
+def score_resumes(jd, resume_ids):
+    """Yield a result row per ready resume, loading features one chunk at a time"""
+    jd_features = get_features(jd)
+    jd_skills = set(jd_features['skills'])
+    jd_weights = skill_weights(jd_features)
+    
+    for start in range(0, len(resume_ids), ANALYZE_CHUNK_SIZE):
+        resumes = [store.resumes.get(resume_id) for resume_id in resume_ids[start:start + ANALYZE_CHUNK_SIZE]]
+        resumes = [resume for resume in resumes if resume and is_ready(resume)]
+        with metrics.timer('analyze.load_features'):
+            features_by_id = store.get_features_many([resume.id for resume in resumes])
+        # Another worker process may have deleted some since this request began
+        resumes = [resume for resume in resumes if resume.id in features_by_id]
+        
+        # Timed per chunk, leaving out the time spent by the consumer between yields
+        score_seconds = build_seconds = 0.0
+        for resume in resumes:
+            resume_features = features_by_id[resume.id]
+            started = time.perf_counter()
+            score, relevance = score_features(resume_features, jd_features, jd_weights)
+            scored = time.perf_counter()
+            result = build_analysis_result(resume.id, resume, resume_features, score, relevance, jd_features, jd_skills)
+            score_seconds += scored - started
+            build_seconds += time.perf_counter() - scored
+            yield result
+        metrics.observe('stage_seconds', score_seconds, stage='analyze.score')
+        metrics.observe('stage_seconds', build_seconds, stage='analyze.match_skills')
+        metrics.inc('resumes_scored_total', len(resumes))
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_data():
     try:
-        data = request.get_json()
-        job_description_id = data.get('jobDescriptionId')
+        jd, resume_ids, error_response = parse_analyze_request()
+        if error_response:
+            return error_response
+        
+        analysis_id = str(uuid.uuid4())
+        writer = store.analysis_writer(analysis_id, jd.id, datetime.now().isoformat())
+        results = []
+        for result in score_resumes(jd, resume_ids):
+            writer.add(result)
+            results.append(result)
+        writer.close()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Analysis completed',
+            'data': {'analysisId': analysis_id, 'results': results},
+            'results': results
+        }), 200
+        
+    except Exception as e:
+        print(f"Analysis error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """Like /api/analyze, but sends each result as soon as it is scored.
+    
+    NDJSON by default; ?format=sse or an Accept: text/event-stream header
+    switches to server-sent events. The last record is a summary carrying
+    the analysisId.
+    """
+    try:
+        jd, resume_ids, error_response = parse_analyze_request()
+        if error_response:
+            return error_response
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    use_sse = request.args.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+    analysis_id = str(uuid.uuid4())
+    
+    def encode(record_type, payload):
+        if use_sse:
+            return f"event: {record_type}\ndata: {json.dumps(payload)}\n\n"
+        return json.dumps({'type': record_type, **payload}) + '\n'
+    
+    def generate():
+        writer = store.analysis_writer(analysis_id, jd.id, datetime.now().isoformat())
+        closed = False
+        try:
+            for result in score_resumes(jd, resume_ids):
+                writer.add(result)
+                yield encode('result', {'result': result})
+            writer.close()
+            closed = True
+            yield encode('summary', {'analysisId': analysis_id, 'jobDescriptionId': jd.id, 'count': writer.count})
+        except Exception as e:
+            print(f"Analysis stream error: {str(e)}")
+            if not closed:
+                writer.abort()
+            yield encode('error', {'error': str(e)})
+        except GeneratorExit:
+            # Client went away; do not leave a half-written analysis behind
+            if not closed:
+                writer.abort()
+            raise
+    
+    mimetype = 'text/event-stream' if use_sse else 'application/x-ndjson'
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers={'Cache-Control': 'no-cache'})
+
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+        job_description_ids = data.get('jobDescriptionIds', [])
         resume_ids = data.get('resumeIds', [])
+        try:
+            top_k = parse_top_k(data.get('topK'))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'topK must be a positive integer'}), 400
         
-        if not job_description_id or not resume_ids:
+        if not isinstance(job_description_ids, list) or not isinstance(resume_ids, list):
+            return jsonify({'success': False, 'error': 'jobDescriptionIds and resumeIds must be lists'}), 400
+        if not job_description_ids or not resume_ids:
             return jsonify({'success': False, 'error': 'Missing parameters'}), 400
+        if not all(isinstance(file_id, str) for file_id in job_description_ids + resume_ids):
+            return jsonify({'success': False, 'error': 'File ids must be strings'}), 400
         
-        jd = data_store['job_descriptions'].get(job_description_id)
-        if not jd:
+        jd_ids = [
+            jd_id for jd_id in dict.fromkeys(job_description_ids)
+            if jd_id in store.job_descriptions and is_ready(store.job_descriptions[jd_id])
+        ]
+        # Another worker process may have deleted some since this request began,
+        # so only documents whose features could still be read are scored
+        jd_features_by_id = store.get_features_many(jd_ids)
+        jd_ids = [jd_id for jd_id in jd_ids if jd_id in jd_features_by_id]
+        if not jd_ids:
             return jsonify({'success': False, 'error': 'Job description not found'}), 404
+        resumes = {resume_id: store.resumes.get(resume_id) for resume_id in dict.fromkeys(resume_ids)}
+        resume_ids = [resume_id for resume_id, resume in resumes.items() if resume and is_ready(resume)]
+        resume_features_by_id = store.get_features_many(resume_ids)
+        resume_ids = [resume_id for resume_id in resume_ids if resume_id in resume_features_by_id]
         
-        results = []
-        for resume_id in resume_ids:
-            resume = data_store['resumes'].get(resume_id)
-            if not resume:
-                continue
+        resumes = [resumes[resume_id] for resume_id in resume_ids]
+        jd_features = [jd_features_by_id[jd_id] for jd_id in jd_ids]
+        resume_features = [resume_features_by_id[resume_id] for resume_id in resume_ids]
+        with metrics.timer('analyze.score_matrix'):
+            scores = score_matrix(resume_features, jd_features)
+        metrics.inc('resumes_scored_total', len(resume_ids) * len(jd_ids))
+        
+        analyses = []
+        for col, jd_id in enumerate(jd_ids):
+            jd_skills = set(jd_features[col]['skills'])
+            # Stable sort keeps request order among equal scores, like /api/analyze
+            ranked = sorted(range(len(resume_ids)), key=lambda row: -scores[row, col])
+            if top_k:
+                ranked = ranked[:top_k]
             
-            score, relevance = calculate_relevance_score(
-                resume['text_content'],
-                jd['text_content']
-            )
+            results = []
+            for row in ranked:
+                score = int(scores[row, col])
+                results.append(build_analysis_result(
+                    resume_ids[row], resumes[row], resume_features[row], score, relevance_label(score),
+                    jd_features[col], jd_skills
+                ))
             
-            location = extract_location(resume['text_content'])
-            experience_years = extract_years_of_experience(resume['text_content'])
-            matched_skills, missing_skills = calculate_skill_match(
-                resume['text_content'],
-                jd['text_content']
-            )
-            
-            result = {
-                'resumeId': resume_id,
-                'filename': resume['filename'],
-                'score': score,
-                'relevance': relevance,
-                'analyzed_at': datetime.now().isoformat(),
-                'location': location,
-                'experience': f"{experience_years} years" if experience_years > 0 else "Not specified",
-                'matchedSkills': matched_skills,
-                'missingSkills': missing_skills
-            }
-            results.append(result)
-            data_store['resumes'][resume_id]['analysis'] = result
+            analysis_id = str(uuid.uuid4())
+            store.save_analysis({
+                'id': analysis_id,
+                'jobDescriptionId': jd_id,
+                'results': results,
+                'created_at': datetime.now().isoformat()
+            })
+            analyses.append({'analysisId': analysis_id, 'jobDescriptionId': jd_id, 'results': results})
         
+        return jsonify({
+            'success': True,
+            'message': f'Scored {len(resume_ids)} resume(s) against {len(jd_ids)} job description(s)',
+            'data': {'analyses': analyses}
+        }), 200
+        
+    except Exception as e:
+        print(f"Batch analysis error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/analyze/top', methods=['POST'])
+def analyze_top():
+    """Top-K resumes in the whole library for one JD, via the skill index"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+        job_description_id = data.get('jobDescriptionId')
+        try:
+            top_k = parse_top_k(data.get('topK'), default=10)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'topK must be a positive integer'}), 400
+
+        if not job_description_id:
+            return jsonify({'success': False, 'error': 'Missing parameters'}), 400
+
+        jd = store.job_descriptions.get(job_description_id)
+        if not jd:
+            return jsonify({'success': False, 'error': 'Job description not found'}), 404
+        if not is_ready(jd):
+            return jsonify({'success': False, 'error': f"Job description is {jd.status}"}), 409
+
+        jd_features = get_features(jd)
+        jd_skills = set(jd_features['skills'])
+        with metrics.timer('analyze.top_k'):
+            ranked = store.skill_index.top_k(skill_weights(jd_features), jd_features['experience_years'], top_k)
+        resume_features_by_id = store.get_features_many([resume_id for resume_id, _ in ranked])
+
+        results = []
+        for resume_id, score in ranked:
+            resume = store.resumes.get(resume_id)
+            if resume is None or resume_id not in resume_features_by_id:
+                continue
+            results.append(build_analysis_result(
+                resume_id, resume, resume_features_by_id[resume_id], score, relevance_label(score),
+                jd_features, jd_skills
+            ))
+
         analysis_id = str(uuid.uuid4())
-        data_store['analyses'][analysis_id] = {
+        store.save_analysis({
             'id': analysis_id,
-            'jobDescriptionId': job_description_id,
+            'jobDescriptionId': jd.id,
             'results': results,
             'created_at': datetime.now().isoformat()
-        }
-        
+        })
+
         return jsonify({
             'success': True,
-            'message': 'Analysis completed',
-            'data': {'analysisId': analysis_id, 'results': results},
-            'results': results
+            'message': f'Top {len(results)} of {len(store.skill_index)} resume(s)',
+            'data': {'analysisId': analysis_id, 'results': results}
         }), 200
-        
+
     except Exception as e:
-        print(f"Analysis error: {str(e)}")
+        print(f"Top-K analysis error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/analyses', methods=['GET'])
 def get_all_analyses():
+    """Latest analysis of every resume; ?since=<version> returns only those changed after it"""
+    try:
+        since = parse_since()
+    except ValueError:
+        return jsonify({'success': False, 'error': 'since must be a store version'}), 400
+    try:
+        version = store.version
+        etag = store_etag(version)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        changed = retired = None
+        if since is not None:
+            changed = store.changed_since(since)
+            retired = store.changed_since(since, 'retired') if changed is not None else None
+        if retired is None:
+            body = {'success': True, 'version': version, 'results': store.latest_resume_analyses()}
+            if since is not None:
+                # since is older than the change log reaches: the client starts over
+                body['resync'] = True
+            response = jsonify(body)
+        else:
+            results = store.latest_resume_analyses(changed)
+            analyzed = {result['resumeId'] for result in results}
+            retired = set(retired)
+            response = jsonify({
+                'success': True,
+                'version': version,
+                'since': since,
+                'results': results,
+                # Deleted documents, and resumes a JD delete left without an
+                # analysis (unless they have been analyzed again since)
+                'deletedIds': [file_id for file_id in changed if not store.get_document(file_id)
+                               or (file_id in retired and file_id not in analyzed)]
+            })
+        return versioned(response, etag), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/analyses/<analysis_id>/versions', methods=['GET'])
+def get_analysis_versions(analysis_id):
+    """Every version of an analysis; re-scoring after a JD or taxonomy change adds one"""
     try:
-        all_results = []
-        for resume_id, resume_data in data_store['resumes'].items():
-            if 'analysis' in resume_data:
-                all_results.append(resume_data['analysis'])
-        return jsonify({'success': True, 'results': all_results}), 200
+        versions = store.get_analysis_versions(analysis_id)
+        if not versions:
+            return jsonify({'success': False, 'error': 'Analysis not found'}), 404
+        return jsonify({'success': True, 'versions': versions}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/export/<analysis_id>', methods=['GET'])
+def export_analysis(analysis_id):
+    """Download an analysis as csv, json, jsonl or xlsx, streaming rows out of the store.
+    
+    The latest version is exported unless ?version=N asks for an earlier one.
+    """
+    try:
+        export_format = request.args.get('format', 'json').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'success': False, 'error': f'Unsupported format: {export_format}'}), 400
+        
+        analysis = store.get_analysis_info(analysis_id, request.args.get('version', type=int))
+        if not analysis:
+            return jsonify({'success': False, 'error': 'Analysis not found'}), 404
+        
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        download_name = f'resume-analysis-{analysis_id}.{extension}'
+        results = store.iter_analysis_results(analysis_id, analysis['version'])
+        
+        if export_format == 'xlsx':
+            try:
+                output = xlsx_bytes(results)
+            except ImportError:
+                return jsonify({'success': False, 'error': 'XLSX export not available. Install pandas and openpyxl.'}), 501
+            return send_file(output, mimetype=mimetype, as_attachment=True, download_name=download_name)
+        
+        if export_format == 'csv':
+            body = iter_csv(results)
+        elif export_format == 'jsonl':
+            body = iter_jsonl(results)
+        else:
+            body = iter_json(analysis, results)
+        
+        return Response(
+            stream_with_context(body),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{download_name}"'}
+        )
+        
+    except Exception as e:
+        print(f"Export error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def file_entry(doc):
+    return {
+        'id': doc.id,
+        'filename': doc.filename,
+        'type': doc.upload_type,
+        'uploaded_at': doc.uploaded_at,
+        'size': doc.size,
+        'status': doc.status
+    }
+
 @app.route('/api/files', methods=['GET'])
 def get_uploaded_files():
+    """Uploaded files; ?since=<version> returns only those added, changed or deleted after it"""
+    try:
+        since = parse_since()
+    except ValueError:
+        return jsonify({'success': False, 'error': 'since must be a store version'}), 400
     try:
         file_type = request.args.get('type', 'all')
-        files_list = []
+        version = store.version
+        etag = store_etag(version)
+        cached = not_modified(etag)
+        if cached:
+            return cached
         
-        if file_type in ['jd', 'all']:
-            for jd_id, jd_data in data_store['job_descriptions'].items():
-                files_list.append({
-                    'id': jd_id,
-                    'filename': jd_data['filename'],
-                    'type': 'jd',
-                    'uploaded_at': jd_data['uploaded_at'],
-                    'size': jd_data['size']
-                })
+        changed = store.changed_since(since) if since is not None else None
+        if changed is not None:
+            docs = [store.get_document(file_id) for file_id in changed]
+            response = jsonify({
+                'success': True,
+                'version': version,
+                'since': since,
+                'files': [file_entry(doc) for doc in docs if doc and file_type in (doc.upload_type, 'all')],
+                'deletedIds': [file_id for file_id, doc in zip(changed, docs) if not doc]
+            })
+            return versioned(response, etag), 200
         
+        files_list = []
+        if file_type in ['jd', 'all']:
+            files_list.extend(file_entry(jd_data) for jd_data in store.job_descriptions.values())
         if file_type in ['resume', 'all']:
-            for resume_id, resume_data in data_store['resumes'].items():
-                files_list.append({
-                    'id': resume_id,
-                    'filename': resume_data['filename'],
-                    'type': 'resume',
-                    'uploaded_at': resume_data['uploaded_at'],
-                    'size': resume_data['size']
-                })
-        
-        return jsonify({'success': True, 'files': files_list}), 200
+            files_list.extend(file_entry(resume_data) for resume_data in store.resumes.values())
+        
+        body = {'success': True, 'version': version, 'files': files_list}
+        if since is not None:
+            # since is older than the change log reaches: the client starts over
+            body['resync'] = True
+        return versioned(jsonify(body), etag), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/files/<file_id>', methods=['DELETE'])
+def delete_file(file_id):
+    """Delete one upload with its text, features, results and, for a JD, its analyses"""
+    try:
+        doc = store.get_document(file_id)
+        file_type = request.args.get('type')
+        if not doc or (file_type in ('jd', 'resume') and doc.upload_type != file_type):
+            return jsonify({'success': False, 'error': 'File not found'}), 404
+        if doc.status == 'pending' or store.replacing(file_id):
+            return jsonify({'success': False, 'error': 'File is still being processed'}), 409
+        
+        delete_documents([file_id])
+        return jsonify({'success': True, 'message': 'File deleted', 'data': {'deletedIds': [file_id]}}), 200
+    except Exception as e:
+        print(f"Delete error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/files/delete', methods=['POST'])
+def delete_files():
+    """Bulk delete: {"fileIds": [...]}. Unknown and still-pending ids are reported, not deleted"""
+    try:
+        data = request.get_json(silent=True) or {}
+        file_ids = data.get('fileIds', [])
+        if not file_ids:
+            return jsonify({'success': False, 'error': 'Missing fileIds'}), 400
+        
+        not_found = []
+        pending = []
+        deletable = []
+        for file_id in dict.fromkeys(file_ids):
+            doc = store.get_document(file_id)
+            if not doc:
+                not_found.append(file_id)
+            elif doc.status == 'pending' or store.replacing(file_id):
+                pending.append(file_id)
+            else:
+                deletable.append(file_id)
+        
+        deleted = delete_documents(deletable)
+        return jsonify({
+            'success': True,
+            'message': f'{len(deleted)} file(s) deleted',
+            'data': {'deletedIds': deleted, 'notFound': not_found, 'pending': pending}
+        }), 200
     except Exception as e:
+        print(f"Bulk delete error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Stage timings and counters in Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'job_descriptions_count': len(data_store['job_descriptions']),
-        'resumes_count': len(data_store['resumes']),
-        'analyses_count': len(data_store['analyses'])
+        'metrics': '/api/metrics',
+        'taxonomyVersion': store.taxonomy_version,
+        # Last change-log entry this worker process has applied
+        'storeVersion': store.version,
+        'worker': os.getpid(),
+        **store.counts()
     }), 200
 
 @app.route('/', methods=['GET'])
@@ -466,8 +1604,17 @@ def index():
         'endpoints': {
             'health': '/api/health',
             'upload': '/api/upload',
+            'upload_status': '/api/upload/status',
             'analyze': '/api/analyze',
-            'files': '/api/files'
+            'analyze_batch': '/api/analyze/batch',
+            'analyze_stream': '/api/analyze/stream',
+            'analyze_top': '/api/analyze/top',
+            'analysis_versions': '/api/analyses/<analysisId>/versions',
+            'files': '/api/files',
+            'delete_file': '/api/files/<fileId> (DELETE)',
+            'delete_files': '/api/files/delete',
+            'metrics': '/api/metrics',
+            'export': '/api/export/<analysisId>?format=csv|json|jsonl|xlsx&version=N'
         }
     }), 200
 
@@ -475,4 +1622,8 @@ if __name__ == '__main__':
     print("Starting Resume Screening API...")
     print("Server: http://localhost:5000")
     print("Health: http://localhost:5000/api/health")
+    # With the reloader on, only the child process (WERKZEUG_RUN_MAIN) serves
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warm_up()
+        start_sweeper()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
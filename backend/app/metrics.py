@@ -0,0 +1,94 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+import threading
+import time
+
+# Seconds; spans a cached lookup up to a slow multi-file PDF upload
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """In-process counters and histograms, rendered in Prometheus text format.
+
+    Metrics are created on first use; labels are keyword arguments. Every
+    name gets the registry prefix, so inc('pages_parsed_total') is exported
+    as resume_api_pages_parsed_total.
+    """
+
+    def __init__(self, prefix='resume_api'):
+        self.prefix = prefix
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage):
+        """Record the duration of the block in stage_seconds{stage=...}"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('stage_seconds', time.perf_counter() - start, stage=stage)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+            histograms = [(key, (list(h.counts), h.sum, h.count, h.buckets)) for key, h in histograms]
+
+        typed = set()
+        for (name, labels), value in counters:
+            metric = f"{self.prefix}_{name}"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{_labels(labels)} {value}")
+
+        for (name, labels), (counts, total, count, buckets) in histograms:
+            metric = f"{self.prefix}_{name}"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for bound, bucket_count in zip([*buckets, '+Inf'], counts):
+                cumulative += bucket_count
+                lines.append(f"{metric}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(labels)} {total}")
+            lines.append(f"{metric}_count{_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+metrics = MetricsRegistry()
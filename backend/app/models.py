@@ -1,7 +1,11 @@
-from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey, DateTime, Index, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from .database import Base
+
+try:
+    from .database import Base
+except ImportError:
+    from database import Base
 
 class JobDescription(Base):
     __tablename__ = "job_descriptions"
@@ -29,4 +33,126 @@ class Resume(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationship with job description
-    job_description = relationship("JobDescription", back_populates="resumes")
\ No newline at end of file
+    job_description = relationship("JobDescription", back_populates="resumes")
+
+    __table_args__ = (
+        # Keyset pagination: a job's resumes by id, and ranked by score
+        Index('ix_resumes_job_id', 'job_id', 'id'),
+        Index('ix_resumes_job_score_id', 'job_id', 'relevance_score', 'id'),
+    )
+
+
+class Document(Base):
+    """An uploaded JD or resume as stored by the Flask API"""
+    __tablename__ = "documents"
+
+    id = Column(String(36), primary_key=True)
+    upload_type = Column(String(10), nullable=False, index=True)
+    filename = Column(String(255), nullable=False)
+    filename_lower = Column(String(255), index=True)
+    file_path = Column(String(512))
+    size = Column(Integer)
+    content_hash = Column(String(64), index=True)
+    status = Column(String(20), nullable=False, default="ready")
+    error = Column(Text)
+    text_content = Column(Text)
+    features = Column(JSON(none_as_null=True))
+    analysis = Column(JSON(none_as_null=True))
+    uploaded_at = Column(DateTime)
+    # Set on an async replacement still being parsed: the id of the document
+    # it takes over once it is ready. Until then it has no filename_lower.
+    staged_for = Column(String(36))
+
+    __table_args__ = (
+        # One live document per filename, even when two workers race on an upload
+        Index('uq_documents_filename_lower', 'filename_lower', unique=True, sqlite_where=status != 'failed'),
+    )
+
+
+class Analysis(Base):
+    """One version of an /api/analyze run: a JD scored against a set of resumes.
+
+    Re-scoring after a JD or taxonomy change adds a new version under the same
+    id; earlier versions and their result rows are kept.
+    """
+    __tablename__ = "analyses"
+
+    id = Column(String(36), primary_key=True)
+    version = Column(Integer, primary_key=True, default=1)
+    job_description_id = Column(String(36), index=True)
+    jd_version = Column(Integer, default=1)
+    taxonomy_version = Column(String(16))
+    result_count = Column(Integer, default=0)
+    created_at = Column(DateTime)
+
+
+class AnalysisResult(Base):
+    """One resume's result row within an analysis version, in the order it was produced"""
+    __tablename__ = "analysis_results"
+
+    analysis_id = Column(String(36), primary_key=True)
+    version = Column(Integer, primary_key=True, default=1)
+    position = Column(Integer, primary_key=True)
+    resume_id = Column(String(36), index=True)
+    result = Column(JSON)
+
+
+class TaxonomyVersion(Base):
+    """A skill taxonomy the stored features were extracted with.
+
+    applied_at stays empty until every document affected by the change from
+    the previous version has been re-extracted and re-scored.
+    """
+    __tablename__ = "taxonomy_versions"
+
+    version = Column(String(16), primary_key=True)
+    terms = Column(JSON)
+    created_at = Column(DateTime)
+    applied_at = Column(DateTime)
+
+
+class Change(Base):
+    """Append-only log of store writes.
+
+    Every worker process replays entries past its last seen seq to keep its
+    in-memory indexes in step; the highest seq is the store's version.
+    """
+    __tablename__ = "changes"
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    seq = Column(Integer, primary_key=True)
+    # 'document', 'analysis', or 'retired' for a resume a JD delete left
+    # without any analysis (it is logged as a 'document' change as well)
+    kind = Column(String(20), nullable=False)
+    ref_id = Column(String(36), nullable=False)
+
+
+class Lease(Base):
+    """A named background job held by one worker process until expires_at"""
+    __tablename__ = "leases"
+
+    name = Column(String(64), primary_key=True)
+    holder = Column(String(64))
+    expires_at = Column(DateTime)
+
+
+class UploadSession(Base):
+    """A chunked upload in progress.
+
+    Bytes [0, offset) of size have been written to file_path, which is where
+    the finished file stays. Any worker process can take the next chunk.
+    """
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(36), primary_key=True)
+    file_id = Column(String(36), nullable=False)
+    filename = Column(String(255), nullable=False)
+    upload_type = Column(String(10), nullable=False)
+    file_path = Column(String(512), nullable=False)
+    size = Column(Integer, nullable=False)
+    offset = Column(Integer, nullable=False, default=0)
+    revision = Column(Integer)  # set when the upload replaces a document
+    sha256 = Column(String(64))  # digest the client expects, checked at finalize
+    status = Column(String(20), nullable=False, default='open')  # open, writing, finalizing
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
@@ -0,0 +1,99 @@
+import base64
+import json
+
+from sqlalchemy import tuple_
+
+try:
+    from .models import JobDescription, Resume
+except ImportError:
+    from models import JobDescription, Resume
+
+MAX_PAGE_SIZE = 500
+
+# Everything resume_response shows; raw_text is never read by a listing
+RESUME_LISTING_COLUMNS = (
+    Resume.id, Resume.student_name, Resume.relevance_score, Resume.verdict,
+    Resume.missing_skills, Resume.job_id, Resume.created_at
+)
+
+
+def encode_cursor(*values):
+    """Opaque cursor for the page after the row with these sort key values"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Sort key values from encode_cursor; ValueError if the cursor is malformed"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def page_size(limit):
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _page(rows, limit, key):
+    """(rows, next cursor); one extra row is fetched to tell whether another page exists"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
+
+
+def job_description_page(db, cursor=None, limit=100):
+    """Job descriptions in id order, resuming after cursor"""
+    limit = page_size(limit)
+    query = db.query(JobDescription)
+    if cursor:
+        last_id, = decode_cursor(cursor, 1)
+        query = query.filter(JobDescription.id > last_id)
+    rows = query.order_by(JobDescription.id).limit(limit + 1).all()
+    return _page(rows, limit, lambda jd: (jd.id,))
+
+
+def resume_page(db, job_id=None, cursor=None, limit=100):
+    """Resumes in id order, optionally for one job, resuming after cursor.
+
+    Seeks through the primary key, or ix_resumes_job_id for one job, so a
+    deep page costs the same as the first.
+    """
+    limit = page_size(limit)
+    query = db.query(*RESUME_LISTING_COLUMNS)
+    if job_id is not None:
+        query = query.filter(Resume.job_id == job_id)
+    if cursor:
+        last_id, = decode_cursor(cursor, 1)
+        query = query.filter(Resume.id > last_id)
+    rows = query.order_by(Resume.id).limit(limit + 1).all()
+    return _page(rows, limit, lambda row: (row.id,))
+
+
+def ranked_resume_page(db, job_id, cursor=None, limit=100):
+    """A job's resumes by relevance_score descending, then id descending.
+
+    Keyset pagination on (job_id, relevance_score, id): the cursor is turned
+    into a row-value range that SQLite seeks straight to in
+    ix_resumes_job_score_id. Unscored resumes come last, as they do in a
+    plain ORDER BY ... DESC, and are paged by id in a second range.
+    """
+    limit = page_size(limit)
+    query = db.query(*RESUME_LISTING_COLUMNS).filter(Resume.job_id == job_id)
+    last_score, last_id = decode_cursor(cursor, 2) if cursor else (None, None)
+
+    rows = []
+    if not cursor or last_score is not None:
+        scored = query.filter(Resume.relevance_score.is_not(None))
+        if cursor:
+            scored = scored.filter(tuple_(Resume.relevance_score, Resume.id) < tuple_(last_score, last_id))
+        rows = scored.order_by(Resume.relevance_score.desc(), Resume.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        unscored = query.filter(Resume.relevance_score.is_(None))
+        if cursor and last_score is None:
+            unscored = unscored.filter(Resume.id < last_id)
+        rows += unscored.order_by(Resume.id.desc()).limit(limit + 1 - len(rows)).all()
+    return _page(rows, limit, lambda row: (row.relevance_score, row.id))
@@ -1,28 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from .. import database, models, schemas
+from .. import database, models, pagination, schemas
 
 router = APIRouter(tags=["Results"])
 
+# Listings are keyset-paginated: pass the X-Next-Cursor header of one page as
+# ?cursor= to get the next. The header is absent on the last page.
+
+def _paged(response: Response, rows, next_cursor, serialize):
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [serialize(row) for row in rows]
+
 @router.get("/results/jds")
-async def get_all_job_descriptions(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    jds = db.query(models.JobDescription).offset(skip).limit(limit).all()
-    return [schemas.jd_response(jd) for jd in jds]
+async def get_all_job_descriptions(response: Response, cursor: Optional[str] = None, limit: int = 100,
+                                   db: Session = Depends(database.get_db)):
+    try:
+        jds, next_cursor = pagination.job_description_page(db, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _paged(response, jds, next_cursor, schemas.jd_response)
 
 @router.get("/results/resumes")
-async def get_all_resumes(job_id: Optional[int] = None, skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    query = db.query(models.Resume)
-    if job_id:
-        query = query.filter(models.Resume.job_id == job_id)
-    resumes = query.offset(skip).limit(limit).all()
-    return [schemas.resume_response(resume) for resume in resumes]
+async def get_all_resumes(response: Response, job_id: Optional[int] = None, cursor: Optional[str] = None,
+                          limit: int = 100, db: Session = Depends(database.get_db)):
+    try:
+        resumes, next_cursor = pagination.resume_page(db, job_id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _paged(response, resumes, next_cursor, schemas.resume_response)
 
 @router.get("/results/job/{job_id}/resumes")
-async def get_resumes_for_job(job_id: int, db: Session = Depends(database.get_db)):
-    jd = db.query(models.JobDescription).filter(models.JobDescription.id == job_id).first()
+async def get_resumes_for_job(job_id: int, response: Response, cursor: Optional[str] = None, limit: int = 100,
+                              db: Session = Depends(database.get_db)):
+    jd = db.query(models.JobDescription.id).filter(models.JobDescription.id == job_id).first()
     if not jd:
         raise HTTPException(status_code=404, detail=f"Job description with ID {job_id} not found")
-    
-    resumes = db.query(models.Resume).filter(models.Resume.job_id == job_id).order_by(models.Resume.relevance_score.desc()).all()
-    return [schemas.resume_response(resume) for resume in resumes]
+
+    try:
+        resumes, next_cursor = pagination.ranked_resume_page(db, job_id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _paged(response, resumes, next_cursor, schemas.resume_response)
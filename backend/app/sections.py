@@ -0,0 +1,72 @@
+import re
+
+# Job description section headers by the section they open, lowercase. A
+# header counts at the start of a line (after any bullet or numbering) when
+# followed by ':', a spaced dash or the end of the line, and anywhere in a
+# line when followed by ':'. Extracted text often loses its line breaks, so
+# "Must have: Python. Good to have: AWS" still splits.
+SECTION_HEADERS = {
+    'role': ('job title', 'role', 'position', 'title'),
+    'must_have': (
+        'must have skills', 'must-have skills', 'must have', 'must-have', 'required skills',
+        'required qualifications', 'skills required', 'requirements', 'required', 'essential skills',
+        'essential', 'key skills'
+    ),
+    'good_to_have': (
+        'good to have', 'good-to-have', 'nice to have', 'nice-to-have', 'preferred skills',
+        'preferred qualifications', 'preferred', 'desirable', 'bonus', 'plus'
+    ),
+    'qualifications': ('qualifications', 'qualification', 'education', 'degree'),
+    # Headers that only end the section before them
+    'other': (
+        'key responsibilities', 'responsibilities', 'duties', "what you'll do", 'what you will do',
+        'about the role', 'about the company', 'about us', 'company overview', 'what we offer', 'benefits',
+        'perks', 'compensation', 'salary', 'location', 'how to apply', 'job description', 'job summary',
+        'overview'
+    ),
+}
+SECTION_KINDS = (*SECTION_HEADERS, 'preamble')
+
+_kind_of = {header: kind for kind, headers in SECTION_HEADERS.items() for header in headers}
+# Longest first, so "must have skills" is taken over "must have"
+_headers = '|'.join(re.escape(header) for header in sorted(_kind_of, key=len, reverse=True))
+
+# Both branches are anchored on a literal header and end at a fixed
+# separator, so matching is linear in the text. The indent and bullet before
+# a line header are matched once through a lookahead, which works like an
+# atomic group: a long run of spaces or dashes is not backtracked into.
+HEADER_PATTERN = re.compile(
+    rf'^(?=(?P<indent>[ \t]*(?:(?:[-*•#>]+|\d+[.)])[ \t]*)?))(?P=indent)'
+    rf'(?P<line>{_headers})[ \t\r]*(?::|[-–](?=\s)|$)'
+    rf'|\b(?P<inline>{_headers})[ \t]*:',
+    re.M
+)
+
+# Used for the role when no role header is present: "we are hiring a ..."
+ROLE_PHRASE = re.compile(r'(?:looking for|hiring)[:\-]?[ \t]*([^\n]+)')
+
+
+def segment_jd(text_lower):
+    """Split lowercased job description text into sections in one pass.
+
+    Returns {kind: [section text, ...]} for every kind in SECTION_KINDS, in
+    order of appearance. A section runs from the end of its header to the
+    next header, so sections never overlap; text before the first header is
+    the 'preamble'.
+    """
+    sections = {kind: [] for kind in SECTION_KINDS}
+    kind, start = 'preamble', 0
+    for match in HEADER_PATTERN.finditer(text_lower):
+        sections[kind].append(text_lower[start:match.start()])
+        kind = _kind_of[match.group('line') or match.group('inline')]
+        start = match.end()
+    sections[kind].append(text_lower[start:])
+    return {kind: [part.strip() for part in parts if part.strip()] for kind, parts in sections.items()}
+
+
+def role_title(sections, text_lower):
+    """First line under a role header, else what follows "looking for" / "hiring", else None"""
+    if sections['role']:
+        return sections['role'][0].split('\n', 1)[0].strip()
+    match = ROLE_PHRASE.search(text_lower)
+    return match.group(1).strip() if match else None
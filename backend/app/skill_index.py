@@ -0,0 +1,165 @@
+import heapq
+import threading
+
+try:
+    from .features import SkillWeights, experience_score
+except ImportError:
+    from features import SkillWeights, experience_score
+
+
+class SkillIndex:
+    """Inverted index from canonical skill name to the resumes that list it.
+
+    Each resume gets a slot number, in insertion order. A posting list is a
+    bitmap over slots, and a resume's skills are one integer with a bit per
+    skill, so the index costs a few bytes per resume and skill instead of a
+    set entry. Its years of experience stay resident too, so a candidate can
+    be scored exactly without loading its features. top_k() walks only the
+    posting lists of the JD's skills and stops collecting new candidates as
+    soon as the lists left cannot lift an unseen resume above the current
+    K-th best score (MaxScore-style pruning).
+    """
+
+    def __init__(self):
+        # skill -> bitmap of the slots listing it (bit i of byte i // 8), and its count
+        self.postings = {}
+        self.posting_sizes = {}
+        # skill -> its bit in the skill masks, and bit -> skill
+        self.skill_bits = {}
+        self._skills = []
+        # resume id -> slot; by slot: resume id (None once removed), skill mask, years
+        self.slots = {}
+        self._ids = []
+        self._masks = []
+        self._years = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, resume_id):
+        return resume_id in self.slots
+
+    def add(self, resume_id, skills, experience_years):
+        with self._lock:
+            slot = self.slots.get(resume_id)
+            if slot is None:
+                slot = self.slots[resume_id] = len(self._ids)
+                self._ids.append(resume_id)
+                self._masks.append(0)
+                self._years.append(0)
+            else:
+                self._unlink(slot)
+            mask = 0
+            for skill in skills:
+                bit = self.skill_bits.get(skill)
+                if bit is None:
+                    bit = self.skill_bits[skill] = len(self._skills)
+                    self._skills.append(skill)
+                if mask >> bit & 1:
+                    continue
+                mask |= 1 << bit
+                self._link(self._skills[bit], slot)
+            self._masks[slot] = mask
+            self._years[slot] = experience_years or 0
+
+    def remove(self, resume_id):
+        with self._lock:
+            slot = self.slots.pop(resume_id, None)
+            if slot is not None:
+                self._unlink(slot)
+                self._ids[slot] = None
+
+    def _link(self, skill, slot):
+        bitmap = self.postings.get(skill)
+        if bitmap is None:
+            bitmap = self.postings[skill] = bytearray()
+        if len(bitmap) <= slot >> 3:
+            bitmap.extend(bytes((slot >> 3) + 1 - len(bitmap)))
+        bitmap[slot >> 3] |= 1 << (slot & 7)
+        self.posting_sizes[skill] = self.posting_sizes.get(skill, 0) + 1
+
+    def _unlink(self, slot):
+        mask = self._masks[slot]
+        self._masks[slot] = 0
+        bit = 0
+        while mask:
+            if mask & 1:
+                skill = self._skills[bit]
+                self.postings[skill][slot >> 3] &= ~(1 << (slot & 7)) & 0xFF
+                self.posting_sizes[skill] -= 1
+                if not self.posting_sizes[skill]:
+                    del self.postings[skill], self.posting_sizes[skill]
+            mask >>= 1
+            bit += 1
+
+    def top_k(self, jd_weights, jd_years, k):
+        """[(resume_id, score), ...] for the k best resumes, best first.
+
+        jd_weights is features.skill_weights of the JD, or just its skills
+        to weigh each one 1. Scores equal features.score_features for every
+        resume in the index; ties keep insertion (upload) order, like a
+        stable sort would.
+        """
+        if k <= 0:
+            return []
+        if not isinstance(jd_weights, SkillWeights):
+            jd_weights = SkillWeights(dict.fromkeys(jd_weights, 1.0))
+        with self._lock:
+            return self._top_k(jd_weights, jd_years or 0, k)
+
+    def _top_k(self, jd_weights, jd_years, k):
+        if not jd_weights:
+            # score_features gives every resume 50 when the JD names no skills
+            first = [resume_id for resume_id in self._ids if resume_id is not None][:k]
+            return [(resume_id, 50) for resume_id in first]
+
+        import numpy as np
+
+        total = jd_weights.total
+        # Rarest lists first: they bring in the fewest candidates, and the
+        # common lists at the end are the ones the bound lets us skip.
+        lists = sorted(jd_weights.items(), key=lambda item: self.posting_sizes.get(item[0], 0))
+        remaining = total
+        # The JD's weights by skill bit; skills no resume lists cannot match
+        jd_bits = [(1 << self.skill_bits[skill], weight) for skill, weight in jd_weights.items()
+                   if skill in self.skill_bits]
+        seen = set()
+        # Min-heap of the k best (score, -slot) found so far
+        best = []
+
+        def offer(slot, score):
+            item = (score, -slot)
+            if len(best) < k:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+
+        for skill, weight in lists:
+            if len(best) == k and int((remaining / total) * 80 + 20) < best[0][0]:
+                # A resume not seen yet is only in the lists left, so it
+                # cannot beat the current K-th best
+                break
+            remaining -= weight
+            bitmap = self.postings.get(skill)
+            if bitmap is None:
+                continue
+            slots = np.flatnonzero(np.unpackbits(np.frombuffer(bitmap, dtype=np.uint8), bitorder='little'))
+            for slot in slots.tolist():
+                if slot in seen:
+                    continue
+                seen.add(slot)
+                mask = self._masks[slot]
+                matched = sum(weight for bit, weight in jd_bits if mask & bit)
+                score = int((matched / total) * 80 + experience_score(self._years[slot], jd_years))
+                offer(slot, min(100, score))
+
+        if len(best) < k or best[0][0] <= 20:
+            # Resumes sharing no skill with the JD score on experience alone
+            # (at most 20), so they only matter when the K-th best is that
+            # low. This is the one case that scans the whole index.
+            for slot, resume_id in enumerate(self._ids):
+                if resume_id is not None and slot not in seen:
+                    offer(slot, experience_score(self._years[slot], jd_years))
+
+        return [(self._ids[-negative_slot], score) for score, negative_slot in sorted(best, reverse=True)]
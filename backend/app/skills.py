@@ -0,0 +1,119 @@
+import hashlib
+import json
+import re
+
+# Skill taxonomy: lowercase key as it appears in text -> canonical skill name
+SKILL_TAXONOMY = {
+    'python': 'Python', 'java': 'Java', 'javascript': 'JavaScript',
+    'typescript': 'TypeScript', 'c++': 'C++', 'c#': 'C#',
+    'react': 'React', 'angular': 'Angular', 'vue': 'Vue.js',
+    'node.js': 'Node.js', 'nodejs': 'Node.js',
+    'django': 'Django', 'flask': 'Flask', 'spring': 'Spring',
+    'aws': 'AWS', 'azure': 'Azure', 'docker': 'Docker',
+    'kubernetes': 'Kubernetes', 'git': 'Git',
+    'mongodb': 'MongoDB', 'postgresql': 'PostgreSQL', 'mysql': 'MySQL',
+    'html': 'HTML', 'css': 'CSS', 'sql': 'SQL',
+    'machine learning': 'Machine Learning', 'tensorflow': 'TensorFlow',
+    'agile': 'Agile', 'scrum': 'Scrum', 'devops': 'DevOps'
+}
+
+
+
+def taxonomy_version(taxonomy):
+    """Short content fingerprint of a taxonomy; equal taxonomies share a version"""
+    terms = json.dumps(sorted((key.lower(), name) for key, name in taxonomy.items()))
+    return hashlib.sha256(terms.encode('utf-8')).hexdigest()[:12]
+
+
+def changed_keys(old_taxonomy, new_taxonomy):
+    """Keys added, removed or mapped to a different skill between two taxonomies"""
+    old_terms = {key.lower(): name for key, name in old_taxonomy.items()}
+    new_terms = {key.lower(): name for key, name in new_taxonomy.items()}
+    return {key for key in old_terms.keys() | new_terms.keys() if old_terms.get(key) != new_terms.get(key)}
+
+
+TAXONOMY_VERSION = taxonomy_version(SKILL_TAXONOMY)
+
+_TERMINAL = ''
+
+
+def _build_trie(keys):
+    trie = {}
+    for key in keys:
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[_TERMINAL] = True
+    return trie
+
+
+def _trie_to_regex(node):
+    """Turn a trie into a regex that tries longer keys before shorter ones"""
+    branches = [re.escape(char) + _trie_to_regex(child)
+                for char, child in sorted(node.items()) if char != _TERMINAL]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if _TERMINAL in node:
+        return '(?:' + body + ')?'
+    return body
+
+
+class Gazetteer:
+    """Finds every key of a vocabulary in a text with a single regex scan.
+
+    The keys are compiled once into a trie-shaped alternation, so the work
+    per character is bounded by the alphabet rather than the number of keys,
+    and the vocabulary can grow to thousands of entries at no per-call cost.
+    A key matches when it is not glued to other word characters on either
+    side, which is what the old per-key ``\\b...\\b`` loops were aiming for.
+    """
+
+    def __init__(self, keys):
+        self.keys = tuple(dict.fromkeys(key.lower() for key in keys))
+        trie = _build_trie(self.keys)
+        self._pattern = re.compile(r'(?<!\w)(?=(' + _trie_to_regex(trie) + r')(?!\w))')
+        # The scan reports the longest key at each position; shorter keys that
+        # are prefixes of it (e.g. "spring" in "spring boot") come from here.
+        self._implied = {key: self._prefix_keys(trie, key) for key in self.keys}
+
+    @staticmethod
+    def _prefix_keys(trie, key):
+        keys = []
+        node = trie
+        for i, char in enumerate(key):
+            node = node[char]
+            at_boundary = i + 1 == len(key) or not (key[i + 1].isalnum() or key[i + 1] == '_')
+            if _TERMINAL in node and at_boundary:
+                keys.append(key[:i + 1])
+        return keys
+
+    def find_keys(self, text_lower):
+        """Return the set of keys present in already-lowercased text"""
+        found = set()
+        for key in set(self._pattern.findall(text_lower)):
+            found.update(self._implied[key])
+        return found
+
+
+class SkillMatcher(Gazetteer):
+    """Gazetteer over the skill taxonomy that reports canonical skill names"""
+
+    def __init__(self, taxonomy=None):
+        self.taxonomy = {key.lower(): name for key, name in (taxonomy or SKILL_TAXONOMY).items()}
+        self._rank = {name: i for i, name in enumerate(dict.fromkeys(self.taxonomy.values()))}
+        super().__init__(self.taxonomy)
+
+    def names(self, keys):
+        """Canonical skill names for the taxonomy keys among keys, in taxonomy order"""
+        names = {self.taxonomy[key] for key in keys if key in self.taxonomy}
+        return sorted(names, key=self._rank.__getitem__)
+
+    def find(self, text):
+        """Return canonical skill names found in text, in taxonomy order"""
+        if not text:
+            return []
+        return self.names(self.find_keys(text.lower()))
+
+
+default_matcher = SkillMatcher()
@@ -0,0 +1,1138 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import json
+import os
+import threading
+import time
+import uuid
+
+from sqlalchemy import JSON, and_, delete, func, insert, inspect, literal, or_, select, text, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.schema import CreateIndex
+
+try:
+    from .database import Base, SessionLocal, engine
+    from .features import scoring_features
+    from .metrics import metrics
+    from .models import Analysis, AnalysisResult, Change, Document, Lease, TaxonomyVersion, UploadSession
+    from .skill_index import SkillIndex
+    from .skills import changed_keys
+except ImportError:
+    from database import Base, SessionLocal, engine
+    from features import scoring_features
+    from metrics import metrics
+    from models import Analysis, AnalysisResult, Change, Document, Lease, TaxonomyVersion, UploadSession
+    from skill_index import SkillIndex
+    from skills import changed_keys
+
+DOCUMENT_CACHE_SIZE = int(os.environ.get('DOCUMENT_CACHE_SIZE', 256))
+
+DOCUMENT_FIELDS = (
+    'id', 'upload_type', 'filename', 'file_path', 'size', 'content_hash',
+    'status', 'error', 'text_content', 'features', 'analysis', 'staged_for'
+)
+
+
+def _to_datetime(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+class DocumentMeta:
+    """Compact, always-resident record of a stored document.
+
+    Text and features are not kept here; DocumentStore loads them on demand.
+    """
+    __slots__ = ('id', 'upload_type', 'filename', 'file_path', 'size',
+                 'content_hash', 'status', 'error', 'uploaded_at', 'staged_for')
+
+    def __init__(self, id, upload_type, filename, file_path, size,
+                 content_hash=None, status='ready', error=None, uploaded_at=None, staged_for=None):
+        self.id = id
+        self.upload_type = upload_type
+        self.filename = filename
+        self.file_path = file_path
+        self.size = size
+        self.content_hash = content_hash
+        self.status = status
+        self.error = error
+        self.uploaded_at = uploaded_at
+        self.staged_for = staged_for
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(**{field: record.get(field) for field in cls.__slots__})
+
+    def to_record(self):
+        """Working dict in the shape used by the upload pipeline"""
+        record = {field: getattr(self, field) for field in self.__slots__}
+        return {key: value for key, value in record.items() if value is not None}
+
+
+class LRUCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def __len__(self):
+        return len(self._items)
+
+
+def _document_row(record):
+    row = Document(**{field: record.get(field) for field in DOCUMENT_FIELDS})
+    # A staged replacement does not hold the filename; the document it replaces does
+    row.filename_lower = None if record.get('staged_for') else record['filename'].lower()
+    row.uploaded_at = _to_datetime(record.get('uploaded_at'))
+    return row
+
+
+def _meta_from_row(row):
+    meta = DocumentMeta(*row)
+    meta.uploaded_at = meta.uploaded_at.isoformat() if meta.uploaded_at else None
+    return meta
+
+
+def _analysis_record(row):
+    return {
+        'id': row.id,
+        'version': row.version,
+        'jobDescriptionId': row.job_description_id,
+        'jdVersion': row.jd_version,
+        'taxonomyVersion': row.taxonomy_version,
+        'resultCount': row.result_count,
+        'created_at': row.created_at.isoformat() if row.created_at else None
+    }
+
+
+class AnalysisWriter:
+    """Writes an analysis' result rows in batches as they are produced.
+
+    Each batch is committed on its own so a long run neither holds every
+    result in memory nor keeps SQLite's write lock. The analysis itself,
+    and each resume's latest analysis, are only updated by close(); abort()
+    removes the rows written so far and leaves everything else as it was.
+    """
+
+    def __init__(self, store, analysis_id, job_description_id, created_at,
+                 update_resumes=True, batch_size=200):
+        self.store = store
+        self.analysis_id = analysis_id
+        self.job_description_id = job_description_id
+        self.created_at = created_at
+        self.update_resumes = update_resumes
+        self.batch_size = batch_size
+        self.count = 0
+        self._pending = []
+        # Ids of the resumes written so far, whose latest analysis close() sets
+        self._resume_ids = {}
+
+    def add(self, result):
+        self._pending.append(result)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        start = time.perf_counter()
+        rows = [
+            {'analysis_id': self.analysis_id, 'version': 1, 'position': self.count + i,
+             'resume_id': result['resumeId'], 'result': result}
+            for i, result in enumerate(self._pending)
+        ]
+        with self.store._lock, self.store.session_factory() as session:
+            session.execute(insert(AnalysisResult), rows)
+            session.commit()
+        if self.update_resumes:
+            self._resume_ids.update(dict.fromkeys(result['resumeId'] for result in self._pending))
+        self.count += len(self._pending)
+        self._pending = []
+        metrics.observe('stage_seconds', time.perf_counter() - start, stage='analyze.persist')
+
+    def close(self):
+        self.flush()
+        jd_features = self.store.get_features(self.job_description_id) or {}
+        with self.store._lock, self.store.session_factory() as session:
+            session.merge(Analysis(
+                id=self.analysis_id,
+                version=1,
+                job_description_id=self.job_description_id,
+                jd_version=jd_features.get('version', 1),
+                taxonomy_version=self.store.taxonomy_version,
+                result_count=self.count,
+                created_at=_to_datetime(self.created_at)
+            ))
+            resume_ids = list(self._resume_ids)
+            # Each resume's last row in this analysis, copied over inside SQLite
+            last_result = (
+                select(AnalysisResult.result)
+                .where(AnalysisResult.analysis_id == self.analysis_id, AnalysisResult.version == 1,
+                       AnalysisResult.resume_id == Document.id)
+                .order_by(AnalysisResult.position.desc()).limit(1)
+                .scalar_subquery()
+            )
+            for start in range(0, len(resume_ids), 500):
+                session.execute(
+                    update(Document).where(Document.id.in_(resume_ids[start:start + 500])).values(analysis=last_result)
+                )
+            self.store._commit(session, analysis=[self.analysis_id], document=resume_ids)
+            self.store.analyses[self.analysis_id] = self.job_description_id
+            self.store.analysis_versions[self.analysis_id] = 1
+            self.store.jd_analyses.setdefault(self.job_description_id, set()).add(self.analysis_id)
+
+    def abort(self):
+        self._pending = []
+        self._resume_ids = {}
+        with self.store._lock, self.store.session_factory() as session:
+            session.execute(delete(AnalysisResult).where(AnalysisResult.analysis_id == self.analysis_id))
+            session.commit()
+
+
+# What DocumentStore._reset sets up, and a full resync replaces
+STATE_ATTRIBUTES = (
+    'job_descriptions', 'resumes', 'analyses', 'analysis_versions', 'jd_analyses', 'filenames',
+    'content_hashes', 'file_refs', 'upload_times', 'feature_cache', 'skill_index', 'staged', 'version',
+    '_own_changes'
+)
+
+
+class DocumentStore:
+    """Uploaded documents and analyses, persisted to SQLite.
+
+    Writes go straight to the database. Only compact DocumentMeta records and
+    lookup indexes stay in memory; features are read back from the database on
+    demand and the most recently used ones are kept in an LRU. Scoring never
+    needs the text, so neither the cache nor the scoring reads carry it.
+    """
+
+    def __init__(self, session_factory=SessionLocal, cache_size=DOCUMENT_CACHE_SIZE):
+        self.session_factory = session_factory
+        self.cache_size = cache_size
+        self.taxonomy_version = None
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        """Empty every in-memory index (STATE_ATTRIBUTES), as before load()"""
+        self.job_descriptions = {}
+        self.resumes = {}
+        # Analysis id -> job description id and latest version; results are loaded on demand
+        self.analyses = {}
+        self.analysis_versions = {}
+        # Reverse index: job description id -> its analysis ids
+        self.jd_analyses = {}
+        # Lookup indexes: lowercased filename -> file id, SHA-256 of content -> ids
+        # of the ready documents with that content (oldest first)
+        self.filenames = {}
+        self.content_hashes = {}
+        # Upload path -> number of documents sharing it through content dedup
+        self.file_refs = {}
+        # File id -> upload time, oldest first, for TTL expiry
+        self.upload_times = OrderedDict()
+        # File id -> features.scoring_features of its feature record
+        self.feature_cache = LRUCache(self.cache_size)
+        # Canonical skill -> ready resumes, for top-K queries
+        self.skill_index = SkillIndex()
+        # Staged id -> DocumentMeta of async replacements still being parsed
+        # (see stage_replacements); kept out of the collections and lookups
+        self.staged = {}
+        # Highest change-log seq reflected in memory, and seqs this process
+        # wrote itself (already applied, skipped by refresh)
+        self.version = 0
+        self._own_changes = set()
+
+    def load(self):
+        """Create tables if needed and warm the metadata cache from the database"""
+        try:
+            Base.metadata.create_all(bind=engine)
+        except OperationalError:
+            # Another worker process created a table between the check and CREATE
+            Base.metadata.create_all(bind=engine)
+        # create_all skips existing tables, so add columns and indexes declared since they were made
+        with engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in existing:
+                        continue
+                    try:
+                        connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} '
+                                                f'{column.type.compile(connection.dialect)}'))
+                    except OperationalError as e:
+                        # Added by another worker process starting at the same time
+                        print(f"Could not add column {table.name}.{column.name}: {str(e)}")
+        with engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    try:
+                        connection.execute(CreateIndex(index, if_not_exists=True))
+                    except IntegrityError as e:
+                        print(f"Could not create index {index.name}: {str(e)}")
+        with self._lock, self.session_factory() as session:
+            self._load_state(session)
+
+    def _load_state(self, session):
+        """Fill the in-memory indexes from the database; they must be empty"""
+        columns = [getattr(Document, field) for field in DocumentMeta.__slots__]
+        # Read first: changes made while loading are replayed by refresh()
+        self.version = session.scalar(select(func.max(Change.seq))) or 0
+        for row in session.execute(select(*columns).order_by(Document.uploaded_at)):
+            self._index(_meta_from_row(row))
+        for analysis_id, jd_id, version in session.execute(
+                select(Analysis.id, Analysis.job_description_id, func.max(Analysis.version))
+                .group_by(Analysis.id, Analysis.job_description_id)
+                .order_by(func.min(Analysis.created_at))):
+            self.analyses[analysis_id] = jd_id
+            self.analysis_versions[analysis_id] = version
+            self.jd_analyses.setdefault(jd_id, set()).add(analysis_id)
+        # Only the skills and years leave the features column here
+        rows = session.execute(
+            select(Document.id, Document.features['skills'], Document.features['experience_years'].as_integer())
+            .where(Document.upload_type == 'resume', Document.status == 'ready')
+            .order_by(Document.uploaded_at)
+        )
+        for resume_id, skills, experience_years in rows:
+            self.skill_index.add(resume_id, skills or [], experience_years)
+
+    def _commit(self, session, **ref_ids):
+        """Log the rows written in this transaction for other processes, then commit.
+
+        Keyword arguments map a change kind (see Change.kind) to ids.
+        """
+        changes = [{'kind': kind, 'ref_id': ref_id} for kind, ids in ref_ids.items() for ref_id in ids]
+        seqs = session.scalars(insert(Change).returning(Change.seq), changes).all() if changes else []
+        session.commit()
+        self._own_changes.update(seqs)
+
+    def refresh(self):
+        """Replay writes other worker processes made since the last refresh.
+
+        Costs one primary-key lookup when nothing changed, so it runs before
+        every request. A process so far behind that compact_changes dropped
+        entries it had not seen reloads everything instead.
+        """
+        with self.session_factory() as session:
+            latest = session.scalar(select(func.max(Change.seq))) or 0
+            if latest <= self.version:
+                return
+            with self._lock:
+                changes = session.execute(
+                    select(Change.seq, Change.kind, Change.ref_id)
+                    .where(Change.seq > self.version, Change.seq <= latest)
+                ).all()
+                # Checked after the read: entries dropped before it were all
+                # at or below the floor, so if we are not behind it none are missing
+                if self.version < self._change_floor(session):
+                    # Loaded aside and swapped in, so readers never see it half-built
+                    fresh = DocumentStore(self.session_factory, self.cache_size)
+                    fresh._load_state(session)
+                    for name in STATE_ATTRIBUTES:
+                        setattr(self, name, getattr(fresh, name))
+                    metrics.inc('store_resyncs_total')
+                    return
+                document_ids = set()
+                analysis_ids = set()
+                for seq, kind, ref_id in changes:
+                    if seq in self._own_changes:
+                        self._own_changes.discard(seq)
+                        continue
+                    if kind == 'document':
+                        document_ids.add(ref_id)
+                    elif kind == 'analysis':
+                        analysis_ids.add(ref_id)
+                self._reload_documents(session, document_ids)
+                self._reload_analyses(session, analysis_ids)
+                self.version = max(self.version, latest)
+                metrics.inc('store_changes_replayed_total', len(document_ids) + len(analysis_ids))
+
+    def _reload_documents(self, session, file_ids):
+        file_ids = list(file_ids)
+        columns = [getattr(Document, field) for field in DocumentMeta.__slots__]
+        found = set()
+        for start in range(0, len(file_ids), 500):
+            rows = session.execute(
+                select(*columns, Document.features['skills'], Document.features['experience_years'].as_integer())
+                .where(Document.id.in_(file_ids[start:start + 500]))
+            )
+            for *row, skills, experience_years in rows:
+                meta = _meta_from_row(row)
+                found.add(meta.id)
+                self._index(meta)
+                self.feature_cache.discard(meta.id)
+                if meta.upload_type == 'resume':
+                    if meta.status == 'ready' and skills is not None:
+                        self.skill_index.add(meta.id, skills, experience_years)
+                    else:
+                        self.skill_index.remove(meta.id)
+        for file_id in file_ids:
+            meta = self.get_document(file_id) or self.staged.get(file_id)
+            if file_id not in found and meta:
+                self._forget(meta)
+
+    def _reload_analyses(self, session, analysis_ids):
+        analysis_ids = list(analysis_ids)
+        found = set()
+        for start in range(0, len(analysis_ids), 500):
+            rows = session.execute(
+                select(Analysis.id, Analysis.job_description_id, func.max(Analysis.version))
+                .where(Analysis.id.in_(analysis_ids[start:start + 500]))
+                .group_by(Analysis.id, Analysis.job_description_id)
+            )
+            for analysis_id, jd_id, version in rows:
+                found.add(analysis_id)
+                self.analyses[analysis_id] = jd_id
+                self.analysis_versions[analysis_id] = version
+                self.jd_analyses.setdefault(jd_id, set()).add(analysis_id)
+        for analysis_id in analysis_ids:
+            if analysis_id not in found and analysis_id in self.analyses:
+                self._forget_analysis(analysis_id)
+
+    def _forget_analysis(self, analysis_id):
+        jd_id = self.analyses.pop(analysis_id)
+        self.analysis_versions.pop(analysis_id, None)
+        analyses = self.jd_analyses.get(jd_id)
+        if analyses is not None:
+            analyses.discard(analysis_id)
+            if not analyses:
+                del self.jd_analyses[jd_id]
+
+    def _forget(self, meta):
+        """Drop a deleted document from memory. Returns True if its upload file is now unused"""
+        self._unindex(meta)
+        if meta.staged_for:
+            del self.staged[meta.id]
+            return bool(meta.file_path) and not self.file_in_use(meta.file_path)
+        del self._collection(meta.upload_type)[meta.id]
+        self.upload_times.pop(meta.id, None)
+        self.feature_cache.discard(meta.id)
+        if meta.upload_type == 'resume':
+            self.skill_index.remove(meta.id)
+        for analysis_id in list(self.jd_analyses.get(meta.id, ())):
+            self._forget_analysis(analysis_id)
+        return bool(meta.file_path) and not self.file_in_use(meta.file_path)
+
+    def _collection(self, upload_type):
+        return self.job_descriptions if upload_type == 'jd' else self.resumes
+
+    def _index(self, meta):
+        previous = self.get_document(meta.id) or self.staged.get(meta.id)
+        if previous:
+            self._unindex(previous)
+        if meta.staged_for:
+            # Only its upload file is tracked, so nothing removes it meanwhile
+            self.staged[meta.id] = meta
+            self.file_refs[meta.file_path] = self.file_refs.get(meta.file_path, 0) + 1
+            return
+        self._collection(meta.upload_type)[meta.id] = meta
+        if meta.status != 'failed':
+            self.filenames[meta.filename.lower()] = meta.id
+        if meta.status == 'ready' and meta.content_hash:
+            self.content_hashes.setdefault(meta.content_hash, {})[meta.id] = None
+        if meta.file_path:
+            self.file_refs[meta.file_path] = self.file_refs.get(meta.file_path, 0) + 1
+        uploaded_at = _to_datetime(meta.uploaded_at)
+        if uploaded_at and self.upload_times.get(meta.id) != uploaded_at:
+            # Uploads arrive in time order; a replaced document starts over
+            self.upload_times[meta.id] = uploaded_at
+            self.upload_times.move_to_end(meta.id)
+
+    def _unindex(self, meta):
+        """Drop a document's entries from the lookup indexes (the collection entry stays)"""
+        filename_key = meta.filename.lower()
+        if self.filenames.get(filename_key) == meta.id:
+            del self.filenames[filename_key]
+        holders = self.content_hashes.get(meta.content_hash)
+        if holders is not None:
+            holders.pop(meta.id, None)
+            if not holders:
+                del self.content_hashes[meta.content_hash]
+        if meta.file_path:
+            refs = self.file_refs.get(meta.file_path, 0) - 1
+            if refs > 0:
+                self.file_refs[meta.file_path] = refs
+            else:
+                self.file_refs.pop(meta.file_path, None)
+
+    def get_document(self, file_id):
+        return self.job_descriptions.get(file_id) or self.resumes.get(file_id)
+
+    def find_by_filename(self, filename):
+        return self.get_document(self.filenames.get(filename.lower()))
+
+    def find_by_hash(self, content_hash):
+        holders = self.content_hashes.get(content_hash)
+        return self.get_document(next(iter(holders))) if holders else None
+
+    def file_in_use(self, file_path):
+        """Whether any stored document still points at file_path"""
+        return self.file_refs.get(file_path, 0) > 0
+
+    def expired_documents(self, cutoff):
+        """Ids of documents uploaded before cutoff, oldest first; pending ones are left alone"""
+        expired = []
+        with self._lock:
+            for file_id, uploaded_at in self.upload_times.items():
+                if uploaded_at >= cutoff:
+                    break
+                meta = self.get_document(file_id)
+                if meta and meta.status != 'pending':
+                    expired.append(file_id)
+        return expired
+
+    def delete_documents(self, file_ids):
+        """Delete documents with their result rows, and every analysis of a deleted JD.
+
+        Documents and analyses are found through the indexes, so the work
+        grows with what is deleted rather than with the library. A resume
+        whose latest analysis was against a deleted JD falls back to its
+        newest result in an analysis that is kept, or to none. Returns the
+        deleted ids and the upload paths no document uses any more; removing
+        those files is left to the caller.
+        """
+        with self._lock:
+            metas = [meta for meta in map(self.get_document, dict.fromkeys(file_ids)) if meta]
+            if not metas:
+                return [], []
+            file_ids = [meta.id for meta in metas]
+            resume_ids = [meta.id for meta in metas if meta.upload_type == 'resume']
+            analysis_ids = [analysis_id for meta in metas if meta.upload_type == 'jd'
+                            for analysis_id in self.jd_analyses.get(meta.id, ())]
+
+            with self.session_factory() as session:
+                repointed, retired = self._repoint_latest(session, analysis_ids, set(file_ids))
+                # Chunked to stay under SQLite's bound-parameter limit
+                for start in range(0, len(analysis_ids), 500):
+                    chunk = analysis_ids[start:start + 500]
+                    session.execute(delete(AnalysisResult).where(AnalysisResult.analysis_id.in_(chunk)))
+                    session.execute(delete(Analysis).where(Analysis.id.in_(chunk)))
+                for start in range(0, len(resume_ids), 500):
+                    chunk = resume_ids[start:start + 500]
+                    counts = session.execute(
+                        select(AnalysisResult.analysis_id, AnalysisResult.version, func.count())
+                        .where(AnalysisResult.resume_id.in_(chunk))
+                        .group_by(AnalysisResult.analysis_id, AnalysisResult.version)
+                    ).all()
+                    for analysis_id, version, removed in counts:
+                        session.execute(
+                            update(Analysis).where(Analysis.id == analysis_id, Analysis.version == version)
+                            .values(result_count=Analysis.result_count - removed)
+                        )
+                    session.execute(delete(AnalysisResult).where(AnalysisResult.resume_id.in_(chunk)))
+                for start in range(0, len(file_ids), 500):
+                    session.execute(delete(Document).where(Document.id.in_(file_ids[start:start + 500])))
+                self._commit(session, document=file_ids + repointed, analysis=analysis_ids, retired=retired)
+
+            unused_paths = [meta.file_path for meta in metas if self._forget(meta)]
+            metrics.inc('documents_deleted_total', len(metas))
+            return file_ids, unused_paths
+
+    def _repoint_latest(self, session, analysis_ids, deleted_ids):
+        """Move resumes whose latest analysis is in analysis_ids onto their newest other result.
+
+        Runs before those analyses are deleted. A resume with no result left
+        in the latest version of another analysis gets none. Returns the ids
+        of the resumes that changed, leaving out those in deleted_ids, and of
+        those among them now left with no analysis.
+        """
+        stale = {}
+        for start in range(0, len(analysis_ids), 500):
+            rows = session.execute(
+                select(Document.id, Document.analysis, AnalysisResult.result)
+                .join(AnalysisResult, AnalysisResult.resume_id == Document.id)
+                .where(AnalysisResult.analysis_id.in_(analysis_ids[start:start + 500]),
+                       Document.analysis.is_not(None))
+            )
+            for resume_id, analysis, result in rows:
+                if analysis == result and resume_id not in deleted_ids:
+                    stale[resume_id] = None
+        if not stale:
+            return [], []
+
+        removed = set(analysis_ids)
+        resume_ids = list(stale)
+        for start in range(0, len(resume_ids), 500):
+            rows = session.execute(
+                select(AnalysisResult.resume_id, AnalysisResult.analysis_id, AnalysisResult.version,
+                       AnalysisResult.result)
+                .where(AnalysisResult.resume_id.in_(resume_ids[start:start + 500]))
+            )
+            for resume_id, analysis_id, version, result in rows:
+                if analysis_id in removed or self.analysis_versions.get(analysis_id) != version:
+                    continue
+                newest = stale[resume_id]
+                if newest is None or result['analyzed_at'] > newest['analyzed_at']:
+                    stale[resume_id] = result
+        for resume_id, result in stale.items():
+            session.execute(update(Document).where(Document.id == resume_id).values(analysis=result))
+        return resume_ids, [resume_id for resume_id, result in stale.items() if result is None]
+
+    def _write_documents(self, records):
+        with self.session_factory() as session:
+            for record in records:
+                session.merge(_document_row(record))
+            self._commit(session, document=[record['id'] for record in records])
+
+    def save_documents(self, records):
+        """Insert or update documents in one transaction and refresh the indexes.
+
+        records are full working dicts; their text and features are written to
+        the database and the scoring features kept hot in the LRU, only the
+        metadata stays resident.
+        Returns the records that were not saved because another worker process
+        stored a live document under the same filename first.
+        """
+        with self._lock:
+            conflicts = []
+            try:
+                self._write_documents(records)
+            except IntegrityError:
+                # Save the rest one by one, leaving out the losers of the race
+                saved = []
+                for record in records:
+                    try:
+                        self._write_documents([record])
+                        saved.append(record)
+                    except IntegrityError:
+                        conflicts.append(record)
+                records = saved
+            for record in records:
+                self._apply(record)
+            return conflicts
+
+    def _apply(self, record):
+        """Bring the in-memory indexes in line with a record just written"""
+        self._index(DocumentMeta.from_record(record))
+        if record.get('features'):
+            self.feature_cache.put(record['id'], scoring_features(record['features']))
+        else:
+            self.feature_cache.discard(record['id'])
+        if record['upload_type'] == 'resume':
+            if record.get('status') == 'ready' and record.get('features'):
+                features = record['features']
+                self.skill_index.add(record['id'], features['skills'], features['experience_years'])
+            else:
+                self.skill_index.remove(record['id'])
+
+    def stage_replacements(self, records):
+        """Save pending replacements aside, leaving the documents they replace as they are.
+
+        Each record keeps the id of the document it replaces. Its row gets a
+        fresh id, set as record['staged_id'], and stays out of the listings
+        and lookups until replace_staged() swaps it in or drop_staged()
+        discards it.
+        """
+        with self._lock:
+            staged = []
+            for record in records:
+                record['staged_id'] = str(uuid.uuid4())
+                staged.append({**record, 'id': record['staged_id'], 'staged_for': record['id']})
+            self._write_documents(staged)
+            for record in staged:
+                self._index(DocumentMeta.from_record(record))
+
+    def replacing(self, file_id):
+        """The staged replacement of a document, while it is being parsed; None otherwise"""
+        return next((meta for meta in self.staged.values() if meta.staged_for == file_id), None)
+
+    def replace_staged(self, record):
+        """Write a parsed staged replacement over the document it replaces, in one transaction.
+
+        False, and the staged row is dropped, when that document was deleted
+        in the meantime.
+        """
+        with self._lock:
+            with self.session_factory() as session:
+                session.execute(delete(Document).where(Document.id == record['staged_id']))
+                replaced = session.scalar(select(Document.id).where(Document.id == record['id'])) is not None
+                if replaced:
+                    session.merge(_document_row(record))
+                self._commit(session, document=[record['staged_id']] + ([record['id']] if replaced else []))
+            self._forget_staged(record['staged_id'])
+            if replaced:
+                self._apply(record)
+            return replaced
+
+    def drop_staged(self, record, error=None):
+        """Discard a staged replacement. error, if given, is set on the document it was to replace"""
+        with self._lock:
+            with self.session_factory() as session:
+                session.execute(delete(Document).where(Document.id == record['staged_id']))
+                noted = False
+                if error:
+                    noted = session.execute(
+                        update(Document).where(Document.id == record['id']).values(error=error)
+                    ).rowcount == 1
+                self._commit(session, document=[record['staged_id']] + ([record['id']] if noted else []))
+            self._forget_staged(record['staged_id'])
+            meta = self.get_document(record['id'])
+            if noted and meta:
+                meta.error = error
+
+    def _forget_staged(self, staged_id):
+        meta = self.staged.get(staged_id)
+        if meta:
+            self._forget(meta)
+
+    def get_features_many(self, file_ids):
+        """Scoring features (see features.scoring_features) for each id, reading cache misses in one query"""
+        found = {}
+        missing = []
+        for file_id in file_ids:
+            features = self.feature_cache.get(file_id)
+            if features is None:
+                missing.append(file_id)
+            else:
+                found[file_id] = features
+        metrics.inc('document_cache_hits_total', len(found))
+        metrics.inc('document_cache_misses_total', len(missing))
+        if missing:
+            # The text is dropped inside SQLite, so it is never read or deserialized
+            without_text = func.json_remove(Document.features, '$.normalized_text', type_=JSON)
+            text_length = func.length(Document.features['normalized_text'].as_string())
+            with self.session_factory() as session:
+                # Chunked to stay under SQLite's bound-parameter limit
+                for start in range(0, len(missing), 500):
+                    rows = session.execute(
+                        select(Document.id, without_text, text_length)
+                        .where(Document.id.in_(missing[start:start + 500]))
+                    )
+                    for file_id, features, length in rows:
+                        found[file_id] = features
+                        # Documents still pending have no features yet
+                        if features is not None:
+                            features['has_text'] = bool(length)
+                            self.feature_cache.put(file_id, features)
+        return found
+
+    def get_features(self, file_id):
+        return self.get_features_many([file_id]).get(file_id)
+
+    def get_text(self, file_id):
+        """text_content of a document, read from the database; it is never cached"""
+        with self.session_factory() as session:
+            return session.scalar(select(Document.text_content).where(Document.id == file_id))
+
+    def get_content(self, file_id):
+        """(text_content, full feature record) of a document, e.g. to copy it to a duplicate upload"""
+        with self.session_factory() as session:
+            row = session.execute(
+                select(Document.text_content, Document.features).where(Document.id == file_id)
+            ).first()
+        return tuple(row) if row else (None, None)
+
+    def analysis_writer(self, analysis_id, job_description_id, created_at, update_resumes=True):
+        return AnalysisWriter(self, analysis_id, job_description_id, created_at, update_resumes)
+
+    def save_analysis(self, analysis, update_resumes=False):
+        """Store an analysis; with update_resumes it also becomes each resume's latest analysis"""
+        writer = self.analysis_writer(
+            analysis['id'], analysis['jobDescriptionId'], analysis['created_at'], update_resumes=update_resumes
+        )
+        for result in analysis['results']:
+            writer.add(result)
+        writer.close()
+
+    def get_analysis_info(self, analysis_id, version=None):
+        """Analysis record without its results; the latest version unless one is given"""
+        if analysis_id not in self.analyses:
+            return None
+        with self.session_factory() as session:
+            row = session.get(Analysis, (analysis_id, version or self.analysis_versions[analysis_id]))
+            return _analysis_record(row) if row else None
+
+    def get_analysis(self, analysis_id, version=None):
+        record = self.get_analysis_info(analysis_id, version)
+        if record is not None:
+            record['results'] = list(self.iter_analysis_results(analysis_id, record['version']))
+        return record
+
+    def get_analysis_versions(self, analysis_id):
+        """Every version of an analysis, oldest first, without results"""
+        with self.session_factory() as session:
+            rows = session.scalars(
+                select(Analysis).where(Analysis.id == analysis_id).order_by(Analysis.version)
+            )
+            return [_analysis_record(row) for row in rows]
+
+    def iter_analysis_results(self, analysis_id, version=None, batch_size=500):
+        """Yield an analysis' result rows in order, holding one batch at a time"""
+        version = version or self.analysis_versions.get(analysis_id, 1)
+        position = -1
+        while True:
+            with self.session_factory() as session:
+                rows = session.execute(
+                    select(AnalysisResult.position, AnalysisResult.result)
+                    .where(AnalysisResult.analysis_id == analysis_id, AnalysisResult.version == version,
+                           AnalysisResult.position > position)
+                    .order_by(AnalysisResult.position)
+                    .limit(batch_size)
+                ).all()
+            if not rows:
+                return
+            for position, result in rows:
+                yield result
+
+    def analysis_rows(self, analysis_id):
+        """(position, resume id) of every row in an analysis' latest version"""
+        with self.session_factory() as session:
+            return session.execute(
+                select(AnalysisResult.position, AnalysisResult.resume_id)
+                .where(AnalysisResult.analysis_id == analysis_id,
+                       AnalysisResult.version == self.analysis_versions[analysis_id])
+            ).all()
+
+    def analyses_with_resumes(self, resume_ids):
+        """Analysis id -> [(position, resume id)] for the given resumes' rows in latest versions"""
+        resume_ids = list(resume_ids)
+        rows_by_analysis = {}
+        with self.session_factory() as session:
+            for start in range(0, len(resume_ids), 500):
+                rows = session.execute(
+                    select(AnalysisResult.analysis_id, AnalysisResult.version,
+                           AnalysisResult.position, AnalysisResult.resume_id)
+                    .where(AnalysisResult.resume_id.in_(resume_ids[start:start + 500]))
+                )
+                for analysis_id, version, position, resume_id in rows:
+                    if self.analysis_versions.get(analysis_id) == version:
+                        rows_by_analysis.setdefault(analysis_id, []).append((position, resume_id))
+        return rows_by_analysis
+
+    def add_analysis_version(self, analysis_id, replacements, jd_version=1):
+        """Copy an analysis' latest version into a new one with some rows replaced.
+
+        replacements maps row position -> new result. A resume whose latest
+        analysis was a replaced row gets the new result as its latest too.
+        Returns the new version number.
+        """
+        with self._lock:
+            for attempt in range(3):
+                try:
+                    return self._add_analysis_version(analysis_id, replacements, jd_version)
+                except IntegrityError:
+                    # Another worker process added the same version first; build on top of it
+                    if attempt == 2:
+                        raise
+
+    def _add_analysis_version(self, analysis_id, replacements, jd_version):
+        positions = list(replacements)
+        with self.session_factory() as session:
+            previous = session.scalars(
+                select(Analysis).where(Analysis.id == analysis_id).order_by(Analysis.version.desc()).limit(1)
+            ).first()
+            version = previous.version + 1
+            session.execute(insert(AnalysisResult).from_select(
+                ['analysis_id', 'version', 'position', 'resume_id', 'result'],
+                select(AnalysisResult.analysis_id, literal(version), AnalysisResult.position,
+                       AnalysisResult.resume_id, AnalysisResult.result)
+                .where(AnalysisResult.analysis_id == analysis_id, AnalysisResult.version == previous.version)
+            ))
+
+            old_results = {}
+            latest = {}
+            resume_ids = [result['resumeId'] for result in replacements.values()]
+            for start in range(0, len(positions), 500):
+                old_results.update(session.execute(
+                    select(AnalysisResult.position, AnalysisResult.result)
+                    .where(AnalysisResult.analysis_id == analysis_id, AnalysisResult.version == previous.version,
+                           AnalysisResult.position.in_(positions[start:start + 500]))
+                ).all())
+                latest.update(session.execute(
+                    select(Document.id, Document.analysis).where(Document.id.in_(resume_ids[start:start + 500]))
+                ).all())
+
+            session.execute(update(AnalysisResult), [
+                {'analysis_id': analysis_id, 'version': version, 'position': position, 'result': result}
+                for position, result in replacements.items()
+            ])
+            updated = []
+            for position, result in replacements.items():
+                old_result = old_results.get(position)
+                if old_result is not None and latest.get(result['resumeId']) == old_result:
+                    session.execute(
+                        update(Document).where(Document.id == result['resumeId']).values(analysis=result)
+                    )
+                    updated.append(result['resumeId'])
+            session.add(Analysis(
+                id=analysis_id,
+                version=version,
+                job_description_id=previous.job_description_id,
+                jd_version=jd_version,
+                taxonomy_version=self.taxonomy_version,
+                result_count=previous.result_count,
+                created_at=datetime.now()
+            ))
+            self._commit(session, analysis=[analysis_id], document=updated)
+            self.analysis_versions[analysis_id] = version
+            return version
+
+    def sync_taxonomy(self, version, terms):
+        """Record the skill taxonomy that new features are extracted with.
+
+        Returns the keys whose matches may differ from the last fully applied
+        taxonomy; empty when stored features are already current. Call
+        taxonomy_applied() once the affected documents have been refreshed.
+        """
+        with self._lock, self.session_factory() as session:
+            applied = session.scalars(
+                select(TaxonomyVersion).where(TaxonomyVersion.applied_at.is_not(None))
+                .order_by(TaxonomyVersion.applied_at.desc()).limit(1)
+            ).first()
+            if session.get(TaxonomyVersion, version) is None:
+                now = datetime.now()
+                # The first taxonomy recorded is the one existing features were built with
+                session.add(TaxonomyVersion(
+                    version=version, terms=terms, created_at=now, applied_at=None if applied else now
+                ))
+                try:
+                    session.commit()
+                except IntegrityError:
+                    # Recorded by another worker process starting at the same time
+                    session.rollback()
+            self.taxonomy_version = version
+            if applied is None or applied.version == version:
+                return set()
+            return changed_keys(applied.terms, terms)
+
+    def taxonomy_applied(self, version):
+        with self._lock, self.session_factory() as session:
+            session.execute(
+                update(TaxonomyVersion).where(TaxonomyVersion.version == version).values(applied_at=datetime.now())
+            )
+            session.commit()
+
+    def claim(self, name, seconds):
+        """Take the named lease for this process. False while another process holds it"""
+        now = datetime.now()
+        holder = str(os.getpid())
+        expires_at = now + timedelta(seconds=seconds)
+        with self.session_factory() as session:
+            taken = session.execute(
+                update(Lease).where(Lease.name == name, or_(Lease.expires_at < now, Lease.holder == holder))
+                .values(holder=holder, expires_at=expires_at)
+            ).rowcount
+            if not taken:
+                session.add(Lease(name=name, holder=holder, expires_at=expires_at))
+            try:
+                session.commit()
+            except IntegrityError:
+                return False
+            return True
+
+    def release(self, name):
+        with self.session_factory() as session:
+            session.execute(delete(Lease).where(Lease.name == name, Lease.holder == str(os.getpid())))
+            session.commit()
+
+    def create_upload_session(self, **fields):
+        now = datetime.now()
+        with self.session_factory() as session:
+            session.add(UploadSession(**fields, offset=0, status='open', created_at=now, updated_at=now))
+            session.commit()
+
+    def get_upload_session(self, upload_id):
+        with self.session_factory() as session:
+            row = session.get(UploadSession, upload_id)
+            if row is None:
+                return None
+            return {column.name: getattr(row, column.name) for column in UploadSession.__table__.columns}
+
+    def begin_upload_chunk(self, upload_id, offset, stale_after):
+        """Claim the right to write at offset. False if the session is elsewhere or another write holds it.
+
+        A write that has held the claim for stale_after seconds is presumed
+        dead, e.g. with its worker process, and can be taken over.
+        """
+        now = datetime.now()
+        with self.session_factory() as session:
+            claimed = session.execute(
+                update(UploadSession)
+                .where(UploadSession.id == upload_id, UploadSession.offset == offset,
+                       or_(UploadSession.status == 'open',
+                           and_(UploadSession.status == 'writing',
+                                UploadSession.updated_at < now - timedelta(seconds=stale_after))))
+                .values(status='writing', updated_at=now)
+            ).rowcount
+            session.commit()
+            return claimed == 1
+
+    def end_upload_chunk(self, upload_id, offset, length):
+        """Record length bytes written at offset and release the claim"""
+        with self.session_factory() as session:
+            ended = session.execute(
+                update(UploadSession)
+                .where(UploadSession.id == upload_id, UploadSession.offset == offset,
+                       UploadSession.status == 'writing')
+                .values(offset=offset + length, status='open', updated_at=datetime.now())
+            ).rowcount
+            session.commit()
+            return ended == 1
+
+    def set_upload_session_status(self, upload_id, status, expected):
+        """Move a complete session from status expected to status. False if it was not in expected"""
+        with self.session_factory() as session:
+            changed = session.execute(
+                update(UploadSession)
+                .where(UploadSession.id == upload_id, UploadSession.status == expected,
+                       UploadSession.offset == UploadSession.size)
+                .values(status=status, updated_at=datetime.now())
+            ).rowcount
+            session.commit()
+            return changed == 1
+
+    def delete_upload_session(self, upload_id):
+        with self.session_factory() as session:
+            session.execute(delete(UploadSession).where(UploadSession.id == upload_id))
+            session.commit()
+
+    def upload_sessions(self, updated_before=None):
+        """(id, file_path) of every upload session, or of those idle since updated_before"""
+        query = select(UploadSession.id, UploadSession.file_path)
+        if updated_before is not None:
+            query = query.where(UploadSession.updated_at < updated_before)
+        with self.session_factory() as session:
+            return session.execute(query).all()
+
+    def documents_containing(self, keys):
+        """Features of ready documents whose normalized text contains any of keys.
+
+        This is a substring prefilter run inside SQLite, so only candidate rows
+        are deserialized; callers confirm matches with a word-boundary scan.
+        """
+        keys = sorted(keys)
+        normalized_text = Document.features['normalized_text'].as_string()
+        found = {}
+        with self.session_factory() as session:
+            for start in range(0, len(keys), 100):
+                rows = session.execute(
+                    select(Document.id, Document.features)
+                    .where(Document.status == 'ready',
+                           or_(*[normalized_text.contains(key, autoescape=True) for key in keys[start:start + 100]]))
+                )
+                found.update(rows.all())
+        return found
+
+    def update_features(self, features_by_id):
+        """Overwrite stored feature records, e.g. after a taxonomy change, and refresh the caches"""
+        with self._lock, self.session_factory() as session:
+            for file_id, features in features_by_id.items():
+                session.execute(update(Document).where(Document.id == file_id).values(features=features))
+            self._commit(session, document=list(features_by_id))
+            for file_id, features in features_by_id.items():
+                if self.feature_cache.get(file_id) is not None:
+                    self.feature_cache.put(file_id, scoring_features(features))
+                if file_id in self.resumes:
+                    self.skill_index.add(file_id, features['skills'], features['experience_years'])
+
+    def set_feature_fields(self, fields_by_id):
+        """Set some keys of stored feature records with json_set, leaving the others as the database has them"""
+        with self._lock, self.session_factory() as session:
+            for file_id, fields in fields_by_id.items():
+                paths = []
+                for key, value in fields.items():
+                    paths += [f'$.{key}', func.json(json.dumps(value))]
+                session.execute(
+                    update(Document).where(Document.id == file_id, Document.features.is_not(None))
+                    .values(features=func.json_set(Document.features, *paths))
+                )
+            self._commit(session, document=list(fields_by_id))
+            for file_id in fields_by_id:
+                self.feature_cache.discard(file_id)
+
+    def job_descriptions_without(self, key):
+        """Ids of ready job descriptions whose feature record has no key, e.g. as stored before it was added"""
+        with self.session_factory() as session:
+            return list(session.scalars(
+                select(Document.id).where(Document.upload_type == 'jd', Document.status == 'ready',
+                                          Document.features.is_not(None),
+                                          func.json_type(Document.features, f'$.{key}').is_(None))
+            ))
+
+    def latest_resume_analyses(self, resume_ids=None):
+        """Most recent analysis result of every resume that has one, or of resume_ids only"""
+        query = (select(Document.analysis)
+                 .where(Document.upload_type == 'resume', Document.analysis.is_not(None))
+                 .order_by(Document.uploaded_at))
+        with self.session_factory() as session:
+            if resume_ids is None:
+                return [analysis for (analysis,) in session.execute(query) if analysis]
+            resume_ids = list(resume_ids)
+            analyses = []
+            for start in range(0, len(resume_ids), 500):
+                rows = session.execute(query.where(Document.id.in_(resume_ids[start:start + 500])))
+                analyses.extend(analysis for (analysis,) in rows if analysis)
+            return analyses
+
+    def changed_since(self, version, kind='document'):
+        """Ids of records of kind written or deleted after store version, oldest first.
+
+        None when the change log no longer reaches back to version (see
+        compact_changes), so the caller has to start over from a full listing.
+        """
+        with self.session_factory() as session:
+            rows = session.execute(
+                select(Change.ref_id).where(Change.seq > version, Change.kind == kind)
+                .group_by(Change.ref_id).order_by(func.min(Change.seq))
+            ).all()
+            if version < self._change_floor(session):
+                return None
+            return [ref_id for (ref_id,) in rows]
+
+    def _change_floor(self, session):
+        """Oldest store version the change log can still bring up to date"""
+        return (session.scalar(select(func.min(Change.seq))) or 1) - 1
+
+    def compact_changes(self, keep):
+        """Drop all but the newest keep (at least one) change-log entries; returns how many went"""
+        keep = max(keep, 1)
+        with self.session_factory() as session:
+            latest = session.scalar(select(func.max(Change.seq)))
+            if latest is None:
+                return 0
+            removed = session.execute(delete(Change).where(Change.seq <= latest - keep)).rowcount
+            session.commit()
+        with self._lock:
+            self._own_changes = {seq for seq in self._own_changes if seq > latest - keep}
+        return removed
+
+    def pending_documents(self):
+        """Working dicts for uploads that were never parsed, staged replacements included"""
+        records = [meta.to_record() for meta in [*self.job_descriptions.values(), *self.resumes.values()]
+                   if meta.status == 'pending']
+        for meta in list(self.staged.values()):
+            record = meta.to_record()
+            record['staged_id'] = record.pop('id')
+            record['id'] = record.pop('staged_for')
+            replaced = self.get_document(record['id'])
+            if replaced:
+                # As new_upload sets them for a replacement
+                record['replaces'] = replaced
+                record['revision'] = (self.get_features(replaced.id) or {}).get('version', 1) + 1
+            records.append(record)
+        return records
+
+    def counts(self):
+        return {
+            'job_descriptions_count': len(self.job_descriptions),
+            'resumes_count': len(self.resumes),
+            'analyses_count': len(self.analyses)
+        }
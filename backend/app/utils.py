@@ -1,31 +1,58 @@
-import pdfplumber
-import docx
 import re
-from sentence_transformers import SentenceTransformer, util
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 import os
 
-# Initialize the model globally to avoid reloading
 try:
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-except Exception as e:
-    print(f"Error loading SentenceTransformer model: {e}")
-    model = None
+    from .extraction import EXTRACT_MAX_CHARS, EXTRACT_MAX_PAGES, collect_text, iter_docx_paragraphs
+    from .lazy import LazyResource
+    from .sections import role_title, segment_jd
+except ImportError:
+    from extraction import EXTRACT_MAX_CHARS, EXTRACT_MAX_PAGES, collect_text, iter_docx_paragraphs
+    from lazy import LazyResource
+    from sections import role_title, segment_jd
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+def load_model():
+    # Imported here: sentence_transformers pulls in torch, which alone takes
+    # seconds, and constructing the model may try to download weights
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME)
+
+# Loaded on first use (or by the server's warmup) rather than at import
+model = LazyResource("SentenceTransformer model", load_model)
+
+def load_embedding_engine():
+    try:
+        from .embeddings import EmbeddingEngine
+    except ImportError:
+        from embeddings import EmbeddingEngine
+    return EmbeddingEngine(model.get(), MODEL_NAME) if model.get() is not None else None
+
+# Batched, disk-cached embeddings so a JD or resume is only ever encoded once
+embedding_engine = LazyResource("embedding engine", load_embedding_engine)
+
+def iter_pdfplumber_pages(file_path: str):
+    """Yield the text of each PDF page as pdfplumber parses it."""
+    import pdfplumber
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages:
+            yield page.extract_text() or ""
+            # pdfplumber caches parsed layout objects on every page it has seen
+            page.flush_cache()
 
 def extract_text(file_path: str) -> str:
     """Extract text from PDF or DOCX files."""
     try:
         if file_path.endswith(".pdf"):
-            with pdfplumber.open(file_path) as pdf:
-                text = " ".join([page.extract_text() or "" for page in pdf.pages])
-                return text.strip()
+            text, _, _ = collect_text(iter_pdfplumber_pages(file_path), " ", EXTRACT_MAX_PAGES, EXTRACT_MAX_CHARS)
+            return text.strip()
         elif file_path.endswith(".docx"):
-            doc = docx.Document(file_path)
-            text = " ".join([para.text for para in doc.paragraphs])
+            text, _, _ = collect_text(iter_docx_paragraphs(file_path), " ", max_chars=EXTRACT_MAX_CHARS)
             return text.strip()
         elif file_path.endswith(".txt"):
             with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read().strip()
+                return file.read(EXTRACT_MAX_CHARS).strip()
         else:
             return ""
     except Exception as e:
@@ -33,94 +60,66 @@ def extract_text(file_path: str) -> str:
         return ""
 
 def parse_jd(text: str) -> Dict[str, str]:
-    """Parse job description text to extract structured information."""
-    text = text.lower()  # Convert to lowercase for better matching
-    
-    # Extract role/title
-    role_patterns = [
-        r"(?:job title|role|position|title)[:\-]?\s*(.+?)(?:\n|$)",
-        r"(?:looking for|hiring)[:\-]?\s*(.+?)(?:\n|$)"
-    ]
-    role = "Unknown"
-    for pattern in role_patterns:
-        match = re.search(pattern, text, re.I | re.M)
-        if match:
-            role = match.group(1).strip()
-            break
-    
-    # Extract must have skills
-    must_have_patterns = [
-        r"(?:must have|required|essential)[:\-]?\s*(.+?)(?=(?:good to have|preferred|qualifications|$))",
-        r"(?:requirements)[:\-]?\s*(.+?)(?=(?:good to have|preferred|qualifications|$))"
-    ]
-    must_have = []
-    for pattern in must_have_patterns:
-        matches = re.findall(pattern, text, re.I | re.DOTALL)
-        must_have.extend(matches)
-    
-    # Extract good to have skills
-    good_to_have_patterns = [
-        r"(?:good to have|preferred|nice to have|plus)[:\-]?\s*(.+?)(?=(?:qualifications|$))",
-        r"(?:bonus)[:\-]?\s*(.+?)(?=(?:qualifications|$))"
-    ]
-    good_to_have = []
-    for pattern in good_to_have_patterns:
-        matches = re.findall(pattern, text, re.I | re.DOTALL)
-        good_to_have.extend(matches)
+    """Parse job description text to extract structured information.
     
-    # Extract qualifications
-    qualification_patterns = [
-        r"(?:qualification|degree|education)[:\-]?\s*(.+?)(?=(?:experience|$))",
-        r"(?:bachelor|master|phd|degree)[:\-]?\s*(.+?)(?=(?:experience|$))"
-    ]
-    qualifications = []
-    for pattern in qualification_patterns:
-        matches = re.findall(pattern, text, re.I | re.DOTALL)
-        qualifications.extend(matches)
+    The text is split once by its section headers (see sections.segment_jd),
+    so each section is read once and none overlaps another.
+    """
+    text = text.lower()  # Convert to lowercase for better matching
+    sections = segment_jd(text)
+    role = role_title(sections, text)
     
     return {
         "role_title": role[:255] if role else "Unknown",  # Limit length for database
-        "must_have": " ".join(must_have).strip()[:1000],  # Limit length
-        "good_to_have": " ".join(good_to_have).strip()[:1000],  # Limit length
-        "qualifications": " ".join(qualifications).strip()[:1000]  # Limit length
+        "must_have": "\n".join(sections["must_have"]),
+        "good_to_have": "\n".join(sections["good_to_have"]),
+        "qualifications": "\n".join(sections["qualifications"])
     }
 
+def relevance_verdict(score: float) -> str:
+    if score > 75:
+        return "High"
+    elif score > 50:
+        return "Medium"
+    return "Low"
+
 def compute_relevance(resume_text: str, jd_text: str) -> Tuple[float, str, str]:
     """Compute relevance score between resume and job description."""
-    if not model:
-        return 0.0, "Low", "Model not available"
+    return compute_relevance_many([resume_text], jd_text)[0]
+
+def compute_relevance_many(resume_texts: List[str], jd_text: str) -> List[Tuple[float, str, str]]:
+    """Relevance of many resumes to one job description.
+    
+    The JD and any resume not seen before are encoded in one batch; the
+    scores are a single matrix-vector product over normalized embeddings.
+    """
+    engine = embedding_engine.get()
+    if engine is None:
+        return [(0.0, "Low", "Model not available") for _ in resume_texts]
     
     try:
         # Clean and prepare texts
-        resume_text = resume_text.strip()
+        resume_texts = [resume_text.strip() for resume_text in resume_texts]
         jd_text = jd_text.strip()
         
-        if not resume_text or not jd_text:
-            return 0.0, "Low", "Insufficient text data"
-        
-        # Encode texts
-        emb_resume = model.encode(resume_text, convert_to_tensor=True)
-        emb_jd = model.encode(jd_text, convert_to_tensor=True)
-        
-        # Calculate cosine similarity
-        score = util.cos_sim(emb_resume, emb_jd).item() * 100
-        
-        # Determine verdict
-        if score > 75:
-            verdict = "High"
-        elif score > 50:
-            verdict = "Medium"
-        else:
-            verdict = "Low"
+        results = [(0.0, "Low", "Insufficient text data") for _ in resume_texts]
+        rows = [i for i, resume_text in enumerate(resume_texts) if resume_text]
+        if not jd_text or not rows:
+            return results
         
-        # Simple missing skills analysis (placeholder)
-        missing_skills = analyze_missing_skills(resume_text, jd_text)
+        # Cosine similarity of every resume to the JD
+        scores = engine.similarities(jd_text, [resume_texts[i] for i in rows]) * 100
         
-        return round(score, 2), verdict, missing_skills
+        for i, score in zip(rows, scores):
+            score = float(score)
+            # Simple missing skills analysis (placeholder)
+            missing_skills = analyze_missing_skills(resume_texts[i], jd_text)
+            results[i] = (round(score, 2), relevance_verdict(score), missing_skills)
+        return results
         
     except Exception as e:
         print(f"Error computing relevance: {e}")
-        return 0.0, "Low", f"Error: {str(e)}"
+        return [(0.0, "Low", f"Error: {str(e)}") for _ in resume_texts]
 
 def analyze_missing_skills(resume_text: str, jd_text: str) -> str:
     """Analyze missing skills in resume compared to job description."""
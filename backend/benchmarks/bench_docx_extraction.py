@@ -0,0 +1,201 @@
+"""Throughput, peak memory and accuracy of DOCX text extraction.
+
+Writes synthetic resumes of --paragraphs paragraphs plus a skills grid table
+and extracts each one with:
+
+- python-docx  the docx.Document object model (iter_python_docx)
+- stream       word/document.xml through iterparse (iter_docx_xml), the
+               path uploads take
+
+Before timing, the extractors are checked against each other and against a
+hand-written document:
+
+- streamed paragraphs match python-docx's, in order
+- skills a resume lists only in a table reach its feature record; they did
+  not when only paragraphs were read
+- tabs, line breaks, hyperlinks, nested tables and text boxes come out as
+  expected; deleted text and VML text box fallbacks do not
+- a DOCX whose main part is not word/document.xml falls back to python-docx
+
+Exits 1 if a check fails or the streamed path is slower than python-docx.
+
+    python benchmarks/bench_docx_extraction.py [--paragraphs 60,600,6000] [--repeat 10]
+"""
+import argparse
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import tracemalloc
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.extraction import iter_docx_paragraphs, iter_docx_xml, iter_python_docx  # noqa: E402
+from app.features import extract_features  # noqa: E402
+from harness import report, summarize, time_calls  # noqa: E402
+from synthetic import SKILLS, resume_lines, write_docx  # noqa: E402
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+MC = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+EDGE_CASES = f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document {W} {MC}><w:body>
+<w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>
+  <w:r><w:t>Name</w:t></w:r><w:r><w:tab/><w:t xml:space="preserve">Jane Doe</w:t></w:r></w:p>
+<w:p><w:r><w:t>Line one</w:t><w:br/><w:t>line two</w:t></w:r></w:p>
+<w:p><w:hyperlink><w:r><w:t>github.com/jane</w:t></w:r></w:hyperlink></w:p>
+<w:p><w:del><w:r><w:delText>Removed</w:delText></w:r></w:del><w:ins><w:r><w:t>Kept</w:t></w:r></w:ins></w:p>
+<w:p><w:r><mc:AlternateContent>
+  <mc:Choice><w:drawing><w:txbxContent><w:p><w:r><w:t>Text box</w:t></w:r></w:p></w:txbxContent></w:drawing></mc:Choice>
+  <mc:Fallback><w:pict><w:txbxContent><w:p><w:r><w:t>Text box</w:t></w:r></w:p></w:txbxContent></w:pict></mc:Fallback>
+</mc:AlternateContent></w:r></w:p>
+<w:tbl>
+  <w:tr><w:tc><w:p><w:r><w:t>Languages</w:t></w:r></w:p></w:tc>
+        <w:tc><w:p><w:r><w:t>Python</w:t></w:r></w:p><w:p><w:r><w:t>Go</w:t></w:r></w:p></w:tc></w:tr>
+  <w:tr><w:tc><w:p><w:r><w:t>Cloud</w:t></w:r></w:p></w:tc>
+        <w:tc><w:tbl><w:tr><w:tc><w:p><w:r><w:t>AWS</w:t></w:r></w:p></w:tc>
+                         <w:tc><w:p><w:r><w:t>Docker</w:t></w:r></w:p></w:tc></w:tr></w:tbl><w:p/></w:tc></w:tr>
+</w:tbl>
+<w:p><w:r><w:t>After the table</w:t></w:r></w:p>
+<w:sectPr/>
+</w:body></w:document>'''
+EDGE_CASES_EXPECTED = [
+    'Name\tJane Doe', 'Line one\nline two', 'github.com/jane', 'Kept', 'Text box', '',
+    'Languages\tPython Go', 'Cloud\tAWS\tDocker', 'After the table',
+]
+
+
+class Checks:
+    def __init__(self):
+        self.failures = []
+
+    def expect(self, condition, message):
+        if not condition:
+            self.failures.append(message)
+        return condition
+
+
+def with_document_xml(data, document_xml=None, rename=None):
+    """A copy of a DOCX with word/document.xml replaced, or moved to rename with its references"""
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as source, zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            content = source.read(item.filename)
+            name = item.filename
+            if name == 'word/document.xml':
+                content = document_xml.encode() if document_xml else content
+                name = rename or name
+            elif rename and name in ('[Content_Types].xml', '_rels/.rels'):
+                content = content.replace(b'word/document.xml', rename.encode())
+            elif rename and name == 'word/_rels/document.xml.rels':
+                name = f"word/_rels/{os.path.basename(rename)}.rels"
+            target.writestr(name, content)
+    return out.getvalue()
+
+
+def skills_grid(rng, rows=8):
+    skills = rng.sample(SKILLS, rows * 2)
+    return [[f'Area {i}', skills[2 * i], skills[2 * i + 1]] for i in range(rows)]
+
+
+def check_accuracy(checks, data, lines, table):
+    streamed = list(iter_docx_xml(data))
+    object_model = list(iter_python_docx(data))
+    checks.expect(streamed[:len(lines)] == lines, 'streamed paragraphs differ from the document')
+    checks.expect(streamed == object_model, 'streamed text differs from python-docx paragraphs and tables')
+    rows = ['\t'.join(row) for row in table]
+    checks.expect(streamed[len(lines):] == rows, f'table rows came out as {streamed[len(lines):][:3]}')
+
+
+def check_table_skills(checks, file_path, rng):
+    """A resume that lists its skills only in a grid: they are found now, and were not from paragraphs alone"""
+    table = skills_grid(rng)
+    write_docx(file_path, ['Jane Doe', 'Pune, India', 'Experience: 4 years building data platforms'], table)
+    expected = set(extract_features(' '.join(cell for row in table for cell in row[1:]))['skills'])
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    found = set(extract_features('\n'.join(iter_docx_paragraphs(data)))['skills'])
+    before = set(extract_features('\n'.join(python_docx_paragraphs(data)))['skills'])
+    checks.expect(expected and expected <= found, f'table skills missing from features: {sorted(expected - found)}')
+    checks.expect(not before & expected, 'table skills were already found from paragraphs alone')
+    return len(expected)
+
+
+def python_docx_paragraphs(data):
+    """What DOCX extraction read before: paragraph text only"""
+    import docx
+    return [paragraph.text for paragraph in docx.Document(io.BytesIO(data)).paragraphs]
+
+
+def measure_peak(func, source):
+    tracemalloc.start()
+    func(source)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--paragraphs', default='60,600,6000')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    checks = Checks()
+    work_dir = tempfile.mkdtemp(prefix='bench_docx_')
+    extractors = {
+        'python-docx': lambda source: '\n'.join(iter_python_docx(source)),
+        'stream': lambda source: '\n'.join(iter_docx_xml(source)),
+    }
+    try:
+        results = {}
+        peaks = {}
+        for count in [int(value) for value in args.paragraphs.split(',')]:
+            lines = resume_lines(rng, count)
+            table = skills_grid(rng)
+            file_path = os.path.join(work_dir, f'resume_{count}.docx')
+            write_docx(file_path, lines, table)
+            with open(file_path, 'rb') as file:
+                data = file.read()
+
+            check_accuracy(checks, data, lines, table)
+            print(f"{count} paragraphs: {len(data) / 1024:.0f} KiB")
+
+            for name, extract in extractors.items():
+                extract(data)  # imports and first-call setup
+                results[f'{name}.{count}'] = summarize(time_calls(extract, [(data,)], args.repeat))
+                peaks[f'{name}.{count}'] = measure_peak(extract, data)
+            ratio = results[f'stream.{count}']['p50_ms'] / results[f'python-docx.{count}']['p50_ms']
+            checks.expect(ratio < 1, f'stream is {ratio:.2f}x python-docx at {count} paragraphs')
+
+        skills = check_table_skills(checks, os.path.join(work_dir, 'skills_grid.docx'), rng)
+        print(f"skills grid resume: {skills} skills, all only in its table")
+        template_path = os.path.join(work_dir, 'template.docx')
+        write_docx(template_path, ['x'])
+        with open(template_path, 'rb') as file:
+            template = file.read()
+        edge = list(iter_docx_paragraphs(with_document_xml(template, EDGE_CASES)))
+        checks.expect(edge == EDGE_CASES_EXPECTED, f'edge cases came out as {edge}')
+        renamed = with_document_xml(template, rename='word/main.xml')
+        checks.expect(list(iter_docx_paragraphs(renamed)) == ['x'], 'renamed main part did not fall back to python-docx')
+
+        print()
+        report(results)
+        print(f"\n{'peak MiB (tracemalloc)':<36} " + ' '.join(f'{key}={value:.2f}' for key, value in peaks.items()))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if checks.failures:
+        print(f"\nFAIL: {len(checks.failures)} check(s) failed")
+        for failure in checks.failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print('\nOK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Cost of scoring one JD against N resumes with embeddings.
+
+Compares the old per-pair pattern (encode resume and JD separately for every
+candidate) with EmbeddingEngine, cold and then warm from its on-disk cache,
+then times the entry points the app calls: utils.compute_relevance once per
+resume against utils.compute_relevance_many, which must give the same results.
+Runs offline with the deterministic HashingEncoder; --delay adds a fixed
+per-call cost to mimic a model's forward-pass overhead.
+
+    python benchmarks/bench_embeddings.py [--resumes N] [--delay SECONDS]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import utils  # noqa: E402
+from app.embeddings import EmbeddingEngine, normalize_rows  # noqa: E402
+from app.lazy import LazyResource  # noqa: E402
+from app.skills import SKILL_TAXONOMY  # noqa: E402
+from synthetic import HashingEncoder  # noqa: E402
+
+WORDS = ['developed', 'scalable', 'services', 'team', 'led', 'design', 'reviews', 'built',
+         'pipelines', 'years', 'experience'] + list(SKILL_TAXONOMY)
+
+
+class CountingEncoder(HashingEncoder):
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.calls = 0
+        self.texts = 0
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        self.calls += 1
+        self.texts += len(texts)
+        time.sleep(self.delay)
+        matrix = super().encode(texts)
+        return matrix[0] if single else matrix
+
+
+def per_pair(encoder, jd, resumes):
+    scores = []
+    for resume in resumes:
+        emb_resume = normalize_rows([encoder.encode(resume)])[0]
+        emb_jd = normalize_rows([encoder.encode(jd)])[0]
+        scores.append(float(emb_resume @ emb_jd))
+    return np.array(scores, dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--resumes', type=int, default=500)
+    parser.add_argument('--delay', type=float, default=0.002)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    jd = ' '.join(rng.choice(WORDS) for _ in range(300))
+    resumes = [' '.join(rng.choice(WORDS) for _ in range(600)) for _ in range(args.resumes)]
+    cache_dir = tempfile.mkdtemp(prefix='bench_embeddings_')
+
+    print(f"{'mode':<22} {'ms':>9} {'encode calls':>13} {'texts encoded':>14}")
+
+    encoder = CountingEncoder(args.delay)
+    start = time.perf_counter()
+    expected = per_pair(encoder, jd, resumes)
+    print(f"{'per pair':<22} {(time.perf_counter() - start) * 1000:>9.1f} {encoder.calls:>13} {encoder.texts:>14}")
+
+    for label in ('engine, cold cache', 'engine, warm cache'):
+        encoder = CountingEncoder(args.delay)
+        engine = EmbeddingEngine(encoder, 'hashing', cache_dir=cache_dir)
+        start = time.perf_counter()
+        scores = engine.similarities(jd, resumes)
+        elapsed = (time.perf_counter() - start) * 1000
+        engine.flush()
+        assert np.allclose(scores, expected, atol=1e-5), 'engine disagrees with per-pair scores'
+        print(f"{label:<22} {elapsed:>9.1f} {encoder.calls:>13} {encoder.texts:>14}")
+
+    # Each entry point gets a fresh cache, so both start cold
+    results = {}
+    for label in ('compute_relevance', 'compute_relevance_many'):
+        encoder = CountingEncoder(args.delay)
+        engine = EmbeddingEngine(encoder, label, cache_dir=cache_dir)
+        utils.embedding_engine = LazyResource('embedding engine', lambda: engine)
+        start = time.perf_counter()
+        if label == 'compute_relevance':
+            results[label] = [utils.compute_relevance(resume, jd) for resume in resumes]
+        else:
+            results[label] = utils.compute_relevance_many(resumes, jd)
+        elapsed = (time.perf_counter() - start) * 1000
+        engine.flush()
+        print(f"{label:<22} {elapsed:>9.1f} {encoder.calls:>13} {encoder.texts:>14}")
+    assert results['compute_relevance'] == results['compute_relevance_many'], \
+        'compute_relevance_many disagrees with compute_relevance'
+    assert np.allclose([score for score, _, _ in results['compute_relevance_many']],
+                       np.round(expected * 100, 2), atol=1e-3), 'compute_relevance_many disagrees with per-pair scores'
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Text extraction throughput against process-pool worker count.
+
+Runs extraction.extract_texts over the sample PDFs in uploads/resumes.
+
+    python benchmarks/bench_extraction_workers.py [--files N] [--workers 1,2,4,8]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+from app.extraction import extract_texts  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=40)
+    parser.add_argument('--workers', default='1,2,4,8')
+    args = parser.parse_args()
+
+    pdfs = sorted(glob.glob(os.path.join(BACKEND_DIR, 'uploads', 'resumes', '*.pdf')))[:args.files]
+    jobs = [(path, 'pdf') for path in pdfs]
+    total_mb = sum(os.path.getsize(path) for path in pdfs) / 1e6
+    print(f"{len(jobs)} PDFs, {total_mb:.1f} MB, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'seconds':>8} {'files/s':>8} {'MB/s':>7} {'failed':>7}")
+
+    for workers in [int(w) for w in args.workers.split(',')]:
+        start = time.perf_counter()
+        results = extract_texts(jobs, workers=workers)
+        elapsed = time.perf_counter() - start
+        failed = sum(1 for result in results if result is None)
+        print(f"{workers:>8} {elapsed:>8.2f} {len(jobs) / elapsed:>8.1f} {total_mb / elapsed:>7.2f} {failed:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Microbenchmarks for the per-document feature extractors and the pairwise scorer.
+
+Times extract_skills_from_text, extract_years_of_experience, extract_location
+and calculate_relevance_score on synthetic resumes of roughly 2k, 20k and 200k
+characters.
+
+    python benchmarks/bench_features.py [--repeat 5] [--save-baseline] [--compare] [--tolerance 0.25]
+
+Baselines live in benchmarks/baselines/features.json.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+
+from harness import compare_baseline, report, save_baseline, summarize, time_calls  # noqa: E402
+from synthetic import jd_lines, resume_lines  # noqa: E402
+
+BASELINE_NAME = 'features'
+# Resume sizes as line counts: ~2k, ~20k and ~200k characters
+SIZES = {'small': 25, 'medium': 250, 'large': 2500}
+DOCUMENTS_PER_SIZE = 20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='bench_features_')
+    try:
+        # Importing the app creates its database and upload folders
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+        os.chdir(work_dir)
+        from app.features import extract_location, extract_skills_from_text, extract_years_of_experience
+        from app.main import calculate_relevance_score
+
+        rng = random.Random(args.seed)
+        jd = '\n'.join(jd_lines(rng))
+        results = {}
+        for size, lines in SIZES.items():
+            texts = ['\n'.join(resume_lines(rng, lines)) for _ in range(DOCUMENTS_PER_SIZE)]
+            for name, func, call_args in (
+                ('extract_skills_from_text', extract_skills_from_text, [(text,) for text in texts]),
+                ('extract_years_of_experience', extract_years_of_experience, [(text,) for text in texts]),
+                ('extract_location', extract_location, [(text,) for text in texts]),
+                ('calculate_relevance_score', calculate_relevance_score, [(text, jd) for text in texts]),
+            ):
+                func(*call_args[0])
+                results[f'{name}.{size}'] = summarize(time_calls(func, call_args, args.repeat))
+
+        report(results)
+        if args.save_baseline:
+            config = {'repeat': args.repeat, 'seed': args.seed, 'sizes': SIZES}
+            print(f"\nBaseline written to {save_baseline(BASELINE_NAME, results, config)}")
+        if args.compare and compare_baseline(BASELINE_NAME, results, args.tolerance):
+            sys.exit(1)
+    finally:
+        os.chdir(BENCH_DIR)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+"""Speed and correctness of the job description section segmenter under fuzzing.
+
+Fuzz checks, before any timing:
+
+- structured JDs: random header spellings, bullets, separators and section
+  order, laid out one header per line or run together on a single line (as
+  text extraction often leaves them). segment_jd must give back exactly the
+  text put under each header, and skill_weights must weigh must-have skills
+  2 and nice-to-have-only skills 0.5
+- noise: random text made of header fragments, colons, dashes, bullets and
+  line breaks must never raise, and every section must be a piece of the
+  input with no two pieces covering more text than there is
+- scoring: for weighted JDs, score_features, batch_scoring.score_matrix and
+  SkillIndex.top_k must agree on every resume
+
+Then times utils.parse_jd at --sizes (default 256 KiB and 1 MiB) on
+realistic and adversarial inputs, next to the regex parser it replaced.
+Exits 1 if a check fails or a 4x larger input takes more than
+--max-growth times longer.
+
+    python benchmarks/bench_jd_sections.py [--fuzz 2000] [--sizes 262144,1048576] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.batch_scoring import score_matrix  # noqa: E402
+from app.features import (  # noqa: E402
+    MUST_HAVE_WEIGHT, NICE_TO_HAVE_WEIGHT, extract_features, score_features, skill_weights
+)
+from app.sections import SECTION_HEADERS, SECTION_KINDS, segment_jd  # noqa: E402
+from app.skill_index import SkillIndex  # noqa: E402
+from app.utils import parse_jd  # noqa: E402
+from synthetic import FILLER, SKILLS, sentence  # noqa: E402
+
+BULLETS = ['', '- ', '* ', '• ', '# ', '1. ', '  ']
+LINE_SEPARATORS = [':', ' -', ' –', '', ' :']
+NOISE = ['must have', 'required', 'good to have', 'plus', 'role', 'title', 'education', 'benefits', 'looking for',
+         ':', ':', '-', ' - ', '\n', '\n', ' ', '  ', '\t', '• ', '1.', 'python', 'docker', 'the', 'team', '\r\n']
+
+
+class Checks:
+    def __init__(self):
+        self.failures = []
+
+    def expect(self, condition, message):
+        if not condition:
+            self.failures.append(message)
+        return condition
+
+
+def legacy_parse_jd(text):
+    """utils.parse_jd as it was: overlapping lazy DOTALL regexes over the whole text"""
+    text = text.lower()
+    role = 'Unknown'
+    for pattern in (r"(?:job title|role|position|title)[:\-]?\s*(.+?)(?:\n|$)",
+                    r"(?:looking for|hiring)[:\-]?\s*(.+?)(?:\n|$)"):
+        match = re.search(pattern, text, re.I | re.M)
+        if match:
+            role = match.group(1).strip()
+            break
+    found = {}
+    for name, patterns in {
+        'must_have': (r"(?:must have|required|essential)[:\-]?\s*(.+?)(?=(?:good to have|preferred|qualifications|$))",
+                      r"(?:requirements)[:\-]?\s*(.+?)(?=(?:good to have|preferred|qualifications|$))"),
+        'good_to_have': (r"(?:good to have|preferred|nice to have|plus)[:\-]?\s*(.+?)(?=(?:qualifications|$))",
+                         r"(?:bonus)[:\-]?\s*(.+?)(?=(?:qualifications|$))"),
+        'qualifications': (r"(?:qualification|degree|education)[:\-]?\s*(.+?)(?=(?:experience|$))",
+                           r"(?:bachelor|master|phd|degree)[:\-]?\s*(.+?)(?=(?:experience|$))"),
+    }.items():
+        matches = []
+        for pattern in patterns:
+            matches.extend(re.findall(pattern, text, re.I | re.DOTALL))
+        found[name] = ' '.join(matches).strip()[:1000]
+    return {'role_title': role[:255], **found}
+
+
+def section_body(rng, kind):
+    if kind == 'role':
+        return f"{rng.choice(['senior', 'staff', 'junior'])} {rng.choice(FILLER)} engineer"
+    return '\n'.join(f"{rng.choice(BULLETS[:3])}{sentence(rng, rng.randint(3, 12)).lower()}"
+                     for _ in range(rng.randint(1, 4)))
+
+
+def structured_jd(rng, one_line):
+    """(text, {kind: [body, ...]}) with a random header spelling and layout per section"""
+    kinds = [kind for kind in SECTION_HEADERS if rng.random() < 0.8 or kind in ('must_have', 'good_to_have')]
+    rng.shuffle(kinds)
+    if rng.random() < 0.3:
+        kinds.append(rng.choice(list(SECTION_HEADERS)))
+    truth = {kind: [] for kind in SECTION_KINDS}
+    blocks = []
+    if rng.random() < 0.5:
+        preamble = sentence(rng).lower()
+        truth['preamble'].append(preamble)
+        blocks.append(preamble)
+    for kind in kinds:
+        header = rng.choice(SECTION_HEADERS[kind])
+        header = header.upper() if rng.random() < 0.2 else header.capitalize() if rng.random() < 0.5 else header
+        body = section_body(rng, kind)
+        if one_line:
+            body = ' '.join(body.split('\n'))
+            blocks.append(f"{header}{rng.choice([':', ' :'])} {body}")
+        else:
+            separator = rng.choice(LINE_SEPARATORS)
+            newline = '\n' if not separator or rng.random() < 0.5 else ' '
+            blocks.append(f"{rng.choice(BULLETS)}{header}{separator}{newline}{body}")
+        truth[kind].append(body)
+    return (' ' if one_line else '\n').join(blocks), truth
+
+
+def noise(rng, size):
+    return ''.join(rng.choice(NOISE) for _ in range(size))
+
+
+def check_structured(checks, rng, count):
+    for i in range(count):
+        one_line = i % 2 == 1
+        text, truth = structured_jd(rng, one_line)
+        sections = segment_jd(text.lower())
+        for kind in SECTION_KINDS:
+            if not checks.expect(sections[kind] == truth[kind],
+                                 f"{kind} of {text!r}: got {sections[kind]!r}, expected {truth[kind]!r}"):
+                return
+
+        features = extract_features(text, sections=True)
+        weights = skill_weights(features)
+        must_have = set(extract_features(' '.join(truth['must_have']))['skills'])
+        nice_only = set(extract_features(' '.join(truth['good_to_have']))['skills']) - must_have
+        checks.expect(all(weights[skill] == MUST_HAVE_WEIGHT for skill in must_have) and
+                      all(weights[skill] == NICE_TO_HAVE_WEIGHT for skill in nice_only),
+                      f'weights of {text!r}: {dict(weights)}')
+
+
+def check_noise(checks, rng, count):
+    for _ in range(count):
+        text = noise(rng, rng.randint(0, 400)).lower()
+        try:
+            sections = segment_jd(text)
+            parse_jd(text)
+        except Exception as e:
+            checks.expect(False, f'{e!r} on {text!r}')
+            continue
+        parts = [part for kind in SECTION_KINDS for part in sections[kind]]
+        checks.expect(all(part in text for part in parts) and sum(map(len, parts)) <= len(text),
+                      f'sections are not disjoint pieces of {text!r}')
+
+
+def check_scorers(checks, rng, resumes=400, jds=40):
+    """Weighted scores agree between the per-pair, matrix and top-K scorers"""
+    resume_features = [{'skills': sorted(rng.sample(SKILLS, rng.randint(0, 12))), 'experience_years': rng.randint(0, 12),
+                        'normalized_text': 'resume'} for _ in range(resumes)]
+    jd_features = []
+    for _ in range(jds):
+        skills = rng.sample(SKILLS, rng.randint(0, 10))
+        jd_features.append({'skills': skills, 'experience_years': rng.randint(0, 8), 'normalized_text': 'jd',
+                            'must_have_skills': rng.sample(skills, rng.randint(0, len(skills))),
+                            'nice_to_have_skills': rng.sample(skills, rng.randint(0, len(skills)))})
+    index = SkillIndex()
+    for i, features in enumerate(resume_features):
+        index.add(i, features['skills'], features['experience_years'])
+
+    matrix = score_matrix(resume_features, jd_features)
+    for col, jd in enumerate(jd_features):
+        weights = skill_weights(jd)
+        scores = [score_features(features, jd, weights)[0] for features in resume_features]
+        checks.expect(list(matrix[:, col]) == scores, f'score_matrix disagrees with score_features on JD {col}')
+        expected = sorted(enumerate(scores), key=lambda item: -item[1])[:10]
+        checks.expect(index.top_k(weights, jd['experience_years'], 10) == expected,
+                      f'top_k disagrees with score_features on JD {col}')
+
+
+def realistic(rng, size, one_line=False):
+    blocks = []
+    length = 0
+    while length < size:
+        text, _ = structured_jd(rng, one_line)
+        blocks.append(text)
+        length += len(text) + 1
+    return '\n'.join(blocks)[:size]
+
+
+def inputs(rng, size):
+    return {
+        'realistic': realistic(rng, size),
+        'one_line': realistic(rng, size, one_line=True),
+        'noise': noise(rng, size // 3)[:size],
+        'header_flood': ('must have ' * (size // 10 + 1))[:size],
+        'colon_flood': ('required:' * (size // 9 + 1))[:size],
+        'indent': ' ' * size,
+        'bullet_run': '-' * size,
+        'no_headers': ('a' * 79 + '\n') * (size // 80),
+    }
+
+
+def best_of(func, text, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fuzz', type=int, default=2000)
+    parser.add_argument('--sizes', default='262144,1048576')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-growth', type=float, default=6.0, help='4x the input may take this much longer')
+    parser.add_argument('--legacy', default='realistic,one_line,header_flood',
+                        help='inputs to also time the old regex parser on')
+    parser.add_argument('--seed', type=int, default=9)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    checks = Checks()
+    start = time.perf_counter()
+    check_structured(checks, rng, args.fuzz)
+    check_noise(checks, rng, args.fuzz)
+    check_scorers(checks, rng)
+    print(f"Fuzzed {args.fuzz} structured JDs, {args.fuzz} noise inputs and the weighted scorers "
+          f"in {time.perf_counter() - start:.1f}s: {len(checks.failures)} failure(s)\n")
+
+    sizes = [int(value) for value in args.sizes.split(',')]
+    legacy = set(args.legacy.split(',')) if args.legacy else set()
+    timings = {}
+    print(f"{'input':<14} {'size':>9} {'parse_jd ms':>12} {'legacy ms':>10}")
+    for size in sizes:
+        for name, text in inputs(rng, size).items():
+            parse_jd(text[:1000])
+            timings[name, size] = best_of(parse_jd, text, args.repeat)
+            old = f"{best_of(legacy_parse_jd, text, 1):>10.1f}" if name in legacy else f"{'-':>10}"
+            print(f"{name:<14} {size:>9} {timings[name, size]:>12.1f} {old}")
+
+    for small, large in zip(sizes, sizes[1:]):
+        allowed = args.max_growth * large / small / 4
+        for name in inputs(random.Random(0), 0):
+            growth = timings[name, large] / max(timings[name, small], 0.01)
+            checks.expect(growth <= allowed, f'{name}: {large} bytes took {growth:.1f}x as long as {small} bytes')
+
+    if checks.failures:
+        print(f"\nFAIL: {len(checks.failures)} check(s) failed")
+        for failure in checks.failures[:20]:
+            print(f"  {failure}")
+        sys.exit(1)
+    print('\nOK: sections match and parse_jd time grows linearly')
+
+
+if __name__ == '__main__':
+    main()
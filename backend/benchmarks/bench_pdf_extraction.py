@@ -0,0 +1,62 @@
+"""Latency and peak memory of PDF text extraction on long documents.
+
+Writes synthetic PDFs of 10 to 300 pages and extracts each one with no caps
+(every page parsed, as before) and with the default EXTRACT_MAX_PAGES /
+EXTRACT_MAX_CHARS caps. Peak memory is the tracemalloc high-water mark.
+
+    python benchmarks/bench_pdf_extraction.py [--pages 10,100,300]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.extraction import EXTRACT_MAX_CHARS, EXTRACT_MAX_PAGES, extract_text_from_file  # noqa: E402
+from synthetic import LINES_PER_PAGE, resume_lines, write_pdf  # noqa: E402
+
+UNCAPPED = 10 ** 9
+
+
+def measure(file_path, max_pages, max_chars):
+    # Timed and traced separately: tracemalloc slows allocation-heavy parsing
+    start = time.perf_counter()
+    text = extract_text_from_file(file_path, 'pdf', max_pages=max_pages, max_chars=max_chars)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    extract_text_from_file(file_path, 'pdf', max_pages=max_pages, max_chars=max_chars)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024 / 1024, len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', default='10,100,300')
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    work_dir = tempfile.mkdtemp(prefix='bench_pdf_')
+    print(f"caps: {EXTRACT_MAX_PAGES} pages, {EXTRACT_MAX_CHARS} chars")
+    print(f"{'pages':>6} {'mode':>9} {'ms':>9} {'peak MiB':>9} {'chars':>9}")
+    try:
+        for pages in [int(value) for value in args.pages.split(',')]:
+            file_path = os.path.join(work_dir, f'resume_{pages}.pdf')
+            write_pdf(file_path, resume_lines(rng, pages * LINES_PER_PAGE))
+            # Warm up so PyPDF2's import is not charged to the first run
+            extract_text_from_file(file_path, 'pdf', max_pages=1)
+            for mode, caps in (('uncapped', (UNCAPPED, UNCAPPED)), ('capped', (None, None))):
+                elapsed_ms, peak_mib, chars = measure(file_path, *caps)
+                print(f"{pages:>6} {mode:>9} {elapsed_ms:>9.1f} {peak_mib:>9.1f} {chars:>9}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""End-to-end upload -> analyze -> export benchmark through the Flask test client.
+
+Generates synthetic resumes and JDs (PDF, DOCX and TXT in turn), then drives
+the real app in-process against a throwaway SQLite database and upload folder.
+Reports p50/p95 latency, throughput and peak RSS for each stage.
+
+    python benchmarks/bench_pipeline.py [--resumes 200] [--jds 3] [--batch 10]
+                                        [--formats pdf,docx,txt] [--seed 1]
+                                        [--save-baseline] [--compare] [--tolerance 0.25]
+
+--save-baseline writes benchmarks/baselines/pipeline.json; --compare checks a
+run against it and exits 1 on a regression beyond --tolerance.
+"""
+import argparse
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+
+from harness import RSSSampler, compare_baseline, report, save_baseline, summarize  # noqa: E402
+from synthetic import jd_lines, resume_lines, write_document  # noqa: E402
+
+BASELINE_NAME = 'pipeline'
+
+
+def generate(work_dir, args):
+    rng = random.Random(args.seed)
+    formats = args.formats.split(',')
+    docs_dir = os.path.join(work_dir, 'docs')
+    os.makedirs(docs_dir)
+    paths = {'jd': [], 'resume': []}
+    for i in range(args.jds):
+        path = os.path.join(docs_dir, f'jd_{i}.{formats[i % len(formats)]}')
+        write_document(path, jd_lines(rng))
+        paths['jd'].append(path)
+    for i in range(args.resumes):
+        path = os.path.join(docs_dir, f'resume_{i}.{formats[i % len(formats)]}')
+        write_document(path, resume_lines(rng, rng.randint(40, 120)))
+        paths['resume'].append(path)
+    return paths
+
+
+def upload(client, paths, upload_type):
+    files = []
+    for path in paths:
+        with open(path, 'rb') as source:
+            files.append((io.BytesIO(source.read()), os.path.basename(path)))
+    response = client.post('/api/upload', data={'type': upload_type, 'files': files},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['data']['fileIds']
+
+
+def timed(client_call, latencies):
+    start = time.perf_counter()
+    result = client_call()
+    latencies.append(time.perf_counter() - start)
+    return result
+
+
+def run(client, paths, args):
+    results = {}
+
+    def stage(name, body, items=None):
+        latencies = []
+        with RSSSampler() as sampler:
+            value = body(latencies)
+        results[name] = {**summarize(latencies, items), 'peak_rss_mib': sampler.peak_mib}
+        return value
+
+    jd_ids = stage('upload.jd', lambda latencies: [
+        jd_id for path in paths['jd'] for jd_id in timed(lambda: upload(client, [path], 'jd'), latencies)
+    ])
+
+    batches = [paths['resume'][i:i + args.batch] for i in range(0, len(paths['resume']), args.batch)]
+    resume_ids = stage('upload.resume', lambda latencies: [
+        resume_id for batch in batches for resume_id in timed(lambda: upload(client, batch, 'resume'), latencies)
+    ], items=len(paths['resume']))
+
+    def analyze(latencies):
+        analysis_ids = []
+        for jd_id in jd_ids:
+            response = timed(lambda: client.post('/api/analyze', json={
+                'jobDescriptionId': jd_id, 'resumeIds': resume_ids}), latencies)
+            assert response.status_code == 200, response.get_json()
+            analysis_ids.append(response.get_json()['data']['analysisId'])
+        return analysis_ids
+
+    analysis_ids = stage('analyze', analyze, items=len(jd_ids) * len(resume_ids))
+
+    def analyze_stream(latencies):
+        for jd_id in jd_ids:
+            response = timed(lambda: client.post('/api/analyze/stream', json={
+                'jobDescriptionId': jd_id, 'resumeIds': resume_ids}).get_data(), latencies)
+            assert response.rstrip().endswith(b'}')
+
+    stage('analyze.stream', analyze_stream, items=len(jd_ids) * len(resume_ids))
+
+    def analyze_batch(latencies):
+        response = timed(lambda: client.post('/api/analyze/batch', json={
+            'jobDescriptionIds': jd_ids, 'resumeIds': resume_ids}), latencies)
+        assert response.status_code == 200, response.get_json()
+
+    stage('analyze.batch', analyze_batch, items=len(jd_ids) * len(resume_ids))
+
+    def analyze_top(latencies):
+        for jd_id in jd_ids:
+            response = timed(lambda: client.post('/api/analyze/top', json={
+                'jobDescriptionId': jd_id, 'topK': 10}), latencies)
+            assert response.status_code == 200, response.get_json()
+
+    stage('analyze.top', analyze_top)
+
+    for export_format in ('csv', 'json', 'jsonl', 'xlsx'):
+        def export(latencies):
+            for analysis_id in analysis_ids:
+                response = timed(lambda: client.get(f'/api/export/{analysis_id}?format={export_format}'), latencies)
+                assert response.status_code == 200, response.status_code
+                response.get_data()
+
+        stage(f'export.{export_format}', export, items=len(analysis_ids) * len(resume_ids))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--resumes', type=int, default=200)
+    parser.add_argument('--jds', type=int, default=3)
+    parser.add_argument('--batch', type=int, default=10, help='files per upload request')
+    parser.add_argument('--formats', default='pdf,docx,txt')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+    config = {key: getattr(args, key) for key in ('resumes', 'jds', 'batch', 'formats', 'seed')}
+
+    work_dir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    try:
+        paths = generate(work_dir, args)
+        # The app keeps uploads and its database relative to the working directory
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+        os.chdir(work_dir)
+        from app.main import app
+
+        results = run(app.test_client(), paths, args)
+        print(f"{args.resumes} resumes x {args.jds} JDs ({args.formats}), {args.batch} files per upload\n")
+        report(results)
+
+        if args.save_baseline:
+            print(f"\nBaseline written to {save_baseline(BASELINE_NAME, results, config)}")
+        if args.compare and compare_baseline(BASELINE_NAME, results, args.tolerance):
+            sys.exit(1)
+    finally:
+        os.chdir(BENCH_DIR)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""Page latency of the results listings at page 1 and deep pages over a large resumes table.
+
+Fills a throwaway SQLite database with --rows resumes for one job (1% unscored),
+then times, at page 1 and page --deep-page:
+
+- offset.*  the old .offset(skip).limit(n) queries loading whole Resume rows,
+            first without and then with the composite indexes
+- keyset.*  the app.pagination queries behind routes/results.py
+
+Before timing, the ranked listing is walked page by page from its first
+cursor to its last to check that every row comes back exactly once and in
+order. The run fails if a keyset page at --deep-page is more than --max-ratio
+times slower than page 1.
+
+    python benchmarks/bench_results_pagination.py [--rows 1000000] [--limit 100] [--deep-page 10000]
+                                                  [--repeat 20] [--offset-repeat 3] [--save-baseline] [--compare]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+
+from sqlalchemy import tuple_  # noqa: E402
+
+from harness import compare_baseline, report, save_baseline, summarize, time_calls  # noqa: E402
+
+BASELINE_NAME = 'results_pagination'
+JOB_ID = 1
+
+
+def fill(engine, rows, raw_text_chars, seed):
+    rng = random.Random(seed)
+    filler = ('Python developer with Docker and AWS experience. ' * (raw_text_chars // 50 + 1))[:raw_text_chars]
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO job_descriptions (id, role_title, must_have) VALUES (?, 'Backend Engineer', 'Python')", (JOB_ID,)
+        )
+        for start in range(1, rows + 1, 50000):
+            connection.exec_driver_sql(
+                "INSERT INTO resumes (id, student_name, raw_text, relevance_score, verdict, missing_skills, job_id)"
+                " VALUES (?, ?, ?, ?, 'Medium', 'Kubernetes', ?)",
+                [(i, f'Candidate {i}', filler, None if rng.random() < 0.01 else round(rng.uniform(0, 100), 1), JOB_ID)
+                 for i in range(start, min(start + 50000, rows + 1))]
+            )
+
+
+def offset_queries(Resume, limit):
+    """The listing queries as they were before keyset pagination"""
+    return {
+        'resumes': lambda db, skip: db.query(Resume).offset(skip).limit(limit).all(),
+        'job_resumes': lambda db, skip: db.query(Resume).filter(Resume.job_id == JOB_ID)
+                                          .order_by(Resume.relevance_score.desc()).offset(skip).limit(limit).all(),
+    }
+
+
+def walk(pagination, db, limit):
+    """Follow ranked_resume_page cursors to the end; returns (cursor for each page, rows seen)"""
+    cursors = [None]
+    seen = set()
+    previous = None
+    while True:
+        rows, next_cursor = pagination.ranked_resume_page(db, JOB_ID, cursors[-1], limit)
+        for row in rows:
+            key = (row.relevance_score is None, -(row.relevance_score or 0), -row.id)
+            assert previous is None or key > previous, f'out of order at resume {row.id}'
+            assert row.id not in seen, f'resume {row.id} returned twice'
+            previous = key
+            seen.add(row.id)
+        if not next_cursor:
+            return cursors, len(seen)
+        cursors.append(next_cursor)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--deep-page', type=int, default=10000)
+    parser.add_argument('--raw-text-chars', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--offset-repeat', type=int, default=3, help='the offset queries are slow at depth')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--max-ratio', type=float, default=3.0)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+    deep_skip = (args.deep_page - 1) * args.limit
+    if deep_skip >= args.rows:
+        parser.error('--deep-page is past the last page; raise --rows or lower --deep-page')
+
+    work_dir = tempfile.mkdtemp(prefix='bench_results_')
+    try:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(work_dir, 'results.db')}"
+        from app import pagination
+        from app.database import Base, SessionLocal, engine
+        from app.models import JobDescription, Resume
+
+        tables = [JobDescription.__table__, Resume.__table__]
+        Base.metadata.create_all(engine, tables=tables)
+        composite = [index for index in Resume.__table__.indexes if index.name.startswith('ix_resumes_job')]
+        for index in composite:
+            index.drop(engine)
+        start = time.perf_counter()
+        fill(engine, args.rows, args.raw_text_chars, args.seed)
+        print(f"Filled {args.rows} resumes in {time.perf_counter() - start:.1f}s")
+
+        results = {}
+        pages = {'page1': 0, f'page{args.deep_page}': deep_skip}
+        with SessionLocal() as db:
+            def run(prefix, queries):
+                for name, query in queries.items():
+                    for page, skip in pages.items():
+                        results[f'{prefix}.{name}.{page}'] = summarize(
+                            time_calls(query, [(db, skip)], args.offset_repeat))
+
+            # Without an index the ranked query sorts the whole job each time
+            run('offset.no_index', {'job_resumes': offset_queries(Resume, args.limit)['job_resumes']})
+            start = time.perf_counter()
+            for index in composite:
+                index.create(engine)
+            print(f"Built {', '.join(index.name for index in composite)} in {time.perf_counter() - start:.1f}s")
+            run('offset', offset_queries(Resume, args.limit))
+
+            start = time.perf_counter()
+            cursors, walked = walk(pagination, db, args.limit)
+            assert walked == args.rows, f'walk returned {walked} of {args.rows} resumes'
+            print(f"Walked {len(cursors)} ranked pages in {time.perf_counter() - start:.1f}s: every row once, in order\n")
+
+            def id_cursor(skip):
+                """Cursor of the id-ordered page starting at skip (every resume is in JOB_ID)"""
+                if not skip:
+                    return None
+                return pagination.encode_cursor(db.query(Resume.id).order_by(Resume.id).offset(skip - 1).limit(1).scalar())
+
+            keyset = {
+                'resumes': (lambda db, cursor: pagination.resume_page(db, None, cursor, args.limit), id_cursor),
+                'job_resumes_by_id': (lambda db, cursor: pagination.resume_page(db, JOB_ID, cursor, args.limit),
+                                      id_cursor),
+                'job_resumes': (lambda db, cursor: pagination.ranked_resume_page(db, JOB_ID, cursor, args.limit),
+                                lambda skip: cursors[skip // args.limit]),
+            }
+            for name, (query, cursor_at) in keyset.items():
+                for page, skip in pages.items():
+                    results[f'keyset.{name}.{page}'] = summarize(time_calls(query, [(db, cursor_at(skip))], args.repeat))
+
+            statement = str(db.query(*pagination.RESUME_LISTING_COLUMNS).filter(
+                Resume.job_id == JOB_ID, Resume.relevance_score.is_not(None),
+                tuple_(Resume.relevance_score, Resume.id) < tuple_(50.0, 1)
+            ).order_by(Resume.relevance_score.desc(), Resume.id.desc()).limit(args.limit + 1).statement.compile(
+                engine, compile_kwargs={'literal_binds': True}))
+            explained = db.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}').all()
+
+        report(results)
+        print('\nRanked keyset query plan:')
+        for row in explained:
+            print(f'    {row[-1]}')
+
+        failures = []
+        for name in keyset:
+            first = results[f'keyset.{name}.page1']['p50_ms']
+            deep = results[f'keyset.{name}.page{args.deep_page}']['p50_ms']
+            if deep > first * args.max_ratio:
+                failures.append(f'keyset.{name}: page {args.deep_page} p50 {deep:.2f} ms vs page 1 {first:.2f} ms')
+        if any('TEMP B-TREE' in row[-1] for row in explained):
+            failures.append('ranked keyset query sorts instead of reading ix_resumes_job_score_id in order')
+
+        if args.save_baseline:
+            config = {key: getattr(args, key) for key in ('rows', 'limit', 'deep_page', 'raw_text_chars', 'repeat', 'seed')}
+            print(f"\nBaseline written to {save_baseline(BASELINE_NAME, results, config)}")
+        if args.compare and compare_baseline(BASELINE_NAME, results, args.tolerance):
+            failures.append('regression against baseline')
+        if failures:
+            print('\nFAIL: ' + '; '.join(failures))
+            sys.exit(1)
+        print('\nOK: keyset pages are flat')
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
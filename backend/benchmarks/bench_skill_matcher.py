@@ -0,0 +1,76 @@
+"""Per-resume skill extraction cost as the taxonomy grows.
+
+Compares the old one-regex-per-skill loop with the compiled SkillMatcher on
+synthetic taxonomies of 30 to 5,000 skills.
+
+    python benchmarks/bench_skill_matcher.py
+"""
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.skills import SKILL_TAXONOMY, SkillMatcher  # noqa: E402
+
+TAXONOMY_SIZES = [30, 300, 1000, 5000]
+RESUME_WORDS = 800
+REPEAT = 20
+
+
+def synthetic_taxonomy(size, rng):
+    taxonomy = dict(SKILL_TAXONOMY)
+    while len(taxonomy) < size:
+        word = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+        if rng.random() < 0.2:
+            word += ' ' + ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8)))
+        taxonomy.setdefault(word, word.title())
+    return taxonomy
+
+
+def synthetic_resume(taxonomy, rng):
+    filler = ['experience', 'developed', 'team', 'project', 'using', 'built', 'and', 'with', '2019', '-']
+    keys = list(taxonomy)
+    words = [rng.choice(keys) if rng.random() < 0.05 else rng.choice(filler) for _ in range(RESUME_WORDS)]
+    return ' '.join(words)
+
+
+def legacy_extract(text, taxonomy):
+    text_lower = text.lower()
+    found = []
+    for key, name in taxonomy.items():
+        if re.search(rf'\b{re.escape(key)}\b', text_lower) and name not in found:
+            found.append(name)
+    return found
+
+
+def time_per_call(func, text):
+    func(text)
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func(text)
+    return (time.perf_counter() - start) / REPEAT
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'skills':>7} {'compile ms':>11} {'legacy ms':>10} {'matcher ms':>11}")
+    for size in TAXONOMY_SIZES:
+        taxonomy = synthetic_taxonomy(size, rng)
+        resume = synthetic_resume(taxonomy, rng)
+
+        start = time.perf_counter()
+        matcher = SkillMatcher(taxonomy)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        re.purge()
+        legacy_ms = time_per_call(lambda text: legacy_extract(text, taxonomy), resume) * 1000
+        matcher_ms = time_per_call(matcher.find, resume) * 1000
+        print(f"{size:>7} {compile_ms:>11.1f} {legacy_ms:>10.2f} {matcher_ms:>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Cold-start import cost of the API, checked against a budget.
+
+Imports app.main and app.utils in fresh interpreters under `python -X importtime`.
+Reports each module's cumulative import time and its heaviest direct imports,
+then fails if a module goes over budget or if a library that should only load
+on first use (torch, sentence_transformers, pdfplumber, PyPDF2, docx, numpy,
+pandas, and sqlalchemy, which the document store imports when it is opened)
+was imported. Most of what is left is Flask.
+
+    python benchmarks/bench_startup.py [--budget-ms 1500] [--runs 3]
+"""
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+LAZY_MODULES = ['torch', 'sentence_transformers', 'pdfplumber', 'PyPDF2', 'docx', 'numpy', 'pandas', 'sqlalchemy']
+TARGETS = ['app.main', 'app.utils']
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def import_profile(module_name, work_dir):
+    """(module -> cumulative microseconds, direct imports of module_name) from one fresh interpreter"""
+    env = dict(os.environ)
+    env['DATABASE_URL'] = f"sqlite:///{os.path.join(work_dir, 'startup.db')}"
+    env['PYTHONPATH'] = BACKEND_DIR
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+        cwd=work_dir, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module_name} failed:\n{result.stderr[-2000:]}")
+    cumulative = {}
+    children = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        _, total, indent, name = match.groups()
+        cumulative[name] = int(total)
+        # importtime indents each nesting level by two spaces
+        if len(indent) == 3:
+            children.append((int(total), name))
+    return cumulative, children
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget-ms', type=float, default=1500)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='bench_startup_')
+    failures = []
+    try:
+        for target in TARGETS:
+            runs = [import_profile(target, work_dir) for _ in range(args.runs)]
+            best_ms = min(cumulative[target] for cumulative, _ in runs) / 1000
+            cumulative, children = runs[-1]
+
+            print(f"{target}: {best_ms:.0f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+            for total, name in sorted(children, reverse=True)[:5]:
+                print(f"    {total / 1000:>8.1f} ms  {name}")
+
+            if best_ms > args.budget_ms:
+                failures.append(f"{target} took {best_ms:.0f} ms")
+            eager = [name for name in LAZY_MODULES if name in cumulative]
+            if eager:
+                failures.append(f"{target} imported {', '.join(eager)} at startup")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if failures:
+        print('FAIL: ' + '; '.join(failures))
+        sys.exit(1)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
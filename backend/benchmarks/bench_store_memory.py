@@ -0,0 +1,101 @@
+"""Resident bytes per stored resume in DocumentStore.
+
+Fills a throwaway SQLite database with synthetic resumes, warm-starts a fresh
+DocumentStore from it and measures what stays in memory with tracemalloc. The
+old layout (full record dicts with text and features) is measured alongside.
+Exits 1 if the store, skill index included, keeps more than --budget bytes
+per resume.
+
+    python benchmarks/bench_store_memory.py [--resumes N] [--budget 2000]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import tracemalloc
+import uuid
+from datetime import datetime
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+WORK_DIR = tempfile.mkdtemp(prefix='bench_store_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORK_DIR, 'bench.db')}"
+
+from app.features import extract_features  # noqa: E402
+from app.skills import SKILL_TAXONOMY  # noqa: E402
+from app.store import DocumentStore  # noqa: E402
+
+WORDS = ['developed', 'scalable', 'services', 'team', 'led', 'design', 'reviews', 'built', 'pipelines',
+         'years', 'experience', 'in', 'with', 'and', 'bangalore', 'university'] + list(SKILL_TAXONOMY)
+
+
+def synthetic_record(rng, index):
+    text = ' '.join(rng.choice(WORDS) for _ in range(700))
+    return {
+        'id': str(uuid.uuid4()),
+        'filename': f'resume_{index}.pdf',
+        'file_path': f'uploads/resumes/resume_{index}.pdf',
+        'upload_type': 'resume',
+        'uploaded_at': datetime.now().isoformat(),
+        'size': len(text) * 2,
+        'content_hash': uuid.uuid4().hex * 2,
+        'status': 'ready',
+        'text_content': text,
+        'features': extract_features(text)
+    }
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return size, kept
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--resumes', type=int, default=2000)
+    parser.add_argument('--budget', type=int, default=2000, help='bytes per resume the store may keep')
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    records = [synthetic_record(rng, i) for i in range(args.resumes)]
+    writer = DocumentStore(cache_size=0)
+    writer.load()
+    for start in range(0, len(records), 200):
+        writer.save_documents(records[start:start + 200])
+
+    def warm_start():
+        store = DocumentStore(cache_size=0)
+        store.load()
+        return store
+
+    def old_layout():
+        return {record['id']: dict(record) for record in records}
+
+    store_bytes, store = measure(warm_start)
+    old_bytes, _ = measure(old_layout)
+    # Records already exist in this process, so copying them understates the
+    # old layout; count the text and features they pointed at as well.
+    old_bytes += sum(
+        sys.getsizeof(record['text_content']) + sys.getsizeof(record['features']['normalized_text'])
+        for record in records
+    )
+
+    print(f"{len(store.resumes)} resumes")
+    print(f"DocumentStore metadata: {store_bytes / args.resumes:>9.0f} bytes/resume")
+    print(f"full in-memory records: {old_bytes / args.resumes:>9.0f} bytes/resume")
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    if store_bytes / args.resumes > args.budget:
+        print(f"FAIL: over the budget of {args.budget} bytes/resume")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Top-K query latency against library size.
+
+Builds a SkillIndex over synthetic resumes whose skills follow a skewed
+(Zipf-like) popularity, then times SkillIndex.top_k against scoring every
+resume with score_features and sorting, as /api/analyze does today. Every
+other JD has must-have and nice-to-have skills, so weighted scoring is timed
+and checked too.
+
+    python benchmarks/bench_topk.py [--k 10]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.features import score_features, skill_weights  # noqa: E402
+from app.skill_index import SkillIndex  # noqa: E402
+from app.skills import SKILL_TAXONOMY  # noqa: E402
+
+LIBRARY_SIZES = [1000, 10000, 100000]
+QUERIES = 20
+
+
+def skill_sampler(rng):
+    skills = list(dict.fromkeys(SKILL_TAXONOMY.values()))
+    weights = [1 / (rank + 1) for rank in range(len(skills))]
+    return lambda count: set(rng.choices(skills, weights=weights, k=count))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    sample_skills = skill_sampler(rng)
+    jds = []
+    for i in range(QUERIES):
+        skills = sorted(sample_skills(8))
+        jd = {'skills': skills, 'experience_years': rng.randint(0, 8), 'normalized_text': 'jd'}
+        if i % 2:
+            jd['must_have_skills'] = skills[:len(skills) // 2]
+            jd['nice_to_have_skills'] = skills[-2:]
+        jds.append(jd)
+
+    print(f"{'resumes':>8} {'full scan ms':>13} {'top_k ms':>9} {'speedup':>8}")
+    for size in LIBRARY_SIZES:
+        index = SkillIndex()
+        features = {}
+        for i in range(size):
+            record = {
+                'skills': sorted(sample_skills(rng.randint(3, 15))),
+                'experience_years': rng.randint(0, 15),
+                'normalized_text': 'resume'
+            }
+            features[f'r{i}'] = record
+            index.add(f'r{i}', record['skills'], record['experience_years'])
+
+        expected = []
+        start = time.perf_counter()
+        for jd in jds:
+            jd_weights = skill_weights(jd)
+            scored = [(resume_id, score_features(record, jd, jd_weights)[0]) for resume_id, record in features.items()]
+            expected.append(sorted(scored, key=lambda item: -item[1])[:args.k])
+        full_ms = (time.perf_counter() - start) * 1000 / QUERIES
+
+        ranked = []
+        start = time.perf_counter()
+        for jd in jds:
+            ranked.append(index.top_k(skill_weights(jd), jd['experience_years'], args.k))
+        index_ms = (time.perf_counter() - start) * 1000 / QUERIES
+
+        assert ranked == expected, 'top_k disagrees with the full scan'
+        print(f"{size:>8} {full_ms:>13.2f} {index_ms:>9.2f} {full_ms / index_ms:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+"""Correctness of upload, analyze and file listing under concurrent multi-process load.
+
+Starts gunicorn with several workers on a throwaway database and upload folder,
+then drives it over HTTP from many client threads:
+
+- resumes are uploaded (sync and async=true) and immediately analyzed and
+  listed; the follow-up requests usually land on another worker, which must
+  already see every upload
+- the same filename is uploaded by several clients at once; exactly one of
+  them may win
+- large resumes go through chunked uploads whose chunks land on different
+  workers, each chunk sent by two clients at once; exactly one copy of each
+  may be written, and the finished file must hash to what was sent
+- resumes are deleted while other clients analyze; afterwards every worker
+  must report the same files, counts and store version
+
+Exits 1 if any check fails.
+
+    python benchmarks/concurrency_check.py [--workers 4] [--clients 16] [--resumes 160] [--races 20] [--chunked 8]
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, BACKEND_DIR)
+
+from harness import report, summarize  # noqa: E402
+from synthetic import jd_lines, resume_lines  # noqa: E402
+
+
+class Client:
+    """Minimal JSON/multipart HTTP client; records latency per operation"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.latencies = {}
+        self._lock = threading.Lock()
+
+    def request(self, operation, method, path, body=None, headers=None):
+        request = urllib.request.Request(self.base_url + path, data=body, method=method, headers=headers or {})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                status, payload = response.status, response.read()
+        except urllib.error.HTTPError as error:
+            status, payload = error.code, error.read()
+        with self._lock:
+            self.latencies.setdefault(operation, []).append(time.perf_counter() - start)
+        return status, json.loads(payload) if payload else None
+
+    def get(self, path, operation='get'):
+        return self.request(operation, 'GET', path)
+
+    def post_json(self, path, payload, operation):
+        return self.request(operation, 'POST', path, json.dumps(payload).encode(),
+                            {'Content-Type': 'application/json'})
+
+    def upload(self, files, upload_type='resume', async_mode=False):
+        """files is [(filename, text)]"""
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in (('type', upload_type), ('async', 'true' if async_mode else 'false')):
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+        for filename, text in files:
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="files"; filename="{filename}"\r\n'
+                         f'Content-Type: text/plain\r\n\r\n'.encode() + text.encode() + b'\r\n')
+        parts.append(f'--{boundary}--\r\n'.encode())
+        return self.request('upload.async' if async_mode else 'upload', 'POST', '/api/upload', b''.join(parts),
+                            {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+
+
+class Checks:
+    def __init__(self):
+        self.failures = []
+        self._lock = threading.Lock()
+
+    def expect(self, condition, message):
+        if not condition:
+            with self._lock:
+                self.failures.append(message)
+        return condition
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(work_dir, workers, port):
+    env = dict(os.environ)
+    env['DATABASE_URL'] = f"sqlite:///{os.path.join(work_dir, 'concurrency.db')}"
+    env['EMBEDDING_CACHE_DIR'] = os.path.join(work_dir, 'embedding_cache')
+    env['WARMUP_DELAY'] = '0'
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{port}',
+         '--pythonpath', BACKEND_DIR, '-c', os.path.join(BACKEND_DIR, 'gunicorn.conf.py'),
+         '--timeout', '120', 'app.main:app'],
+        cwd=work_dir, env=env, stdout=open(os.path.join(work_dir, 'server.log'), 'w'), stderr=subprocess.STDOUT
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {server.returncode}")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/health', timeout=2):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError('gunicorn did not start')
+
+
+def wait_ready(client, checks, file_ids):
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        status, body = client.get(f"/api/upload/status?ids={','.join(file_ids)}", 'upload.status')
+        if not checks.expect(status == 200, f'upload status returned {status}'):
+            return
+        if not checks.expect(not any(entry['status'] == 'not_found' for entry in body['files']),
+                             f"upload status lost an accepted file: {body['files']}"):
+            return
+        if body['done']:
+            return
+        time.sleep(0.05)
+    checks.expect(False, f'uploads still pending after 60s: {file_ids}')
+
+
+def upload_and_analyze(client, checks, jd_ids, batch, async_mode):
+    """One client's session: upload, then read it back through whichever worker answers"""
+    status, body = client.upload(batch, async_mode=async_mode)
+    if not checks.expect(status in (200, 202), f'upload returned {status}: {body}'):
+        return []
+    file_ids = body['data']['fileIds']
+    checks.expect(len(file_ids) == len(batch), f'upload accepted {len(file_ids)} of {len(batch)}: {body}')
+    if async_mode:
+        wait_ready(client, checks, file_ids)
+
+    status, body = client.get('/api/files?type=resume', 'files')
+    listed = {entry['id'] for entry in body['files']}
+    checks.expect(set(file_ids) <= listed, 'a worker listed files without a just-finished upload')
+
+    status, body = client.post_json('/api/analyze', {'jobDescriptionId': random.choice(jd_ids),
+                                                     'resumeIds': file_ids}, 'analyze')
+    if checks.expect(status == 200, f'analyze of fresh uploads returned {status}: {body}'):
+        checks.expect(sorted(r['resumeId'] for r in body['results']) == sorted(file_ids),
+                      'analyze did not score every fresh upload')
+        analysis_id = body['data']['analysisId']
+        status, _ = client.get(f'/api/export/{analysis_id}?format=json', 'export')
+        checks.expect(status == 200, f'export of a fresh analysis returned {status}')
+    return file_ids
+
+
+def filename_race(client, checks, race, contenders):
+    """Several clients upload the same new filename at once; one must win"""
+    filename = f'race_{race}.txt'
+    texts = [f'Python engineer {race}-{i} with 3 years of experience' for i in range(contenders)]
+    with ThreadPoolExecutor(contenders) as pool:
+        responses = list(pool.map(lambda text: client.upload([(filename, text)]), texts))
+    winners = [body['data']['fileIds'][0] for status, body in responses if status == 200]
+    return checks.expect(len(winners) == 1, f'{filename}: {len(winners)} uploads won the race') and winners[0]
+
+
+def chunked_upload(client, checks, filename, data, chunk_size):
+    """Upload data in chunks, sending every chunk twice at once; returns the file id"""
+    status, body = client.post_json('/api/uploads', {'filename': filename, 'size': len(data),
+                                                     'sha256': hashlib.sha256(data).hexdigest()}, 'chunked.init')
+    if not checks.expect(status == 201, f'chunked init returned {status}: {body}'):
+        return None
+    upload_id = body['data']['uploadId']
+    offset = 0
+    with ThreadPoolExecutor(2) as pool:
+        while offset < len(data):
+            chunk = data[offset:offset + chunk_size]
+            responses = list(pool.map(
+                lambda _: client.request('chunked.append', 'POST', f'/api/uploads/{upload_id}/append?offset={offset}',
+                                         chunk, {'Content-Type': 'application/octet-stream'}),
+                range(2)
+            ))
+            accepted = [body for status, body in responses if status == 200]
+            if not checks.expect(len(accepted) <= 1 and all(status in (200, 409) for status, _ in responses),
+                                 f'{filename}: duplicate chunks at {offset} returned {[s for s, _ in responses]}'):
+                return None
+            # Resume from wherever the server says the upload ends
+            status, body = client.get(f'/api/uploads/{upload_id}', 'chunked.status')
+            offset = body['data']['offset']
+    status, body = client.request('chunked.finalize', 'POST', f'/api/uploads/{upload_id}/finalize')
+    if checks.expect(status == 200, f'{filename}: finalize returned {status}: {body}'):
+        return body['data']['fileId']
+    return None
+
+
+def worker_views(client, samples):
+    """(pid, storeVersion, counts, sorted file ids) from repeated health and listing calls"""
+    views = {}
+    for _ in range(samples):
+        _, health = client.get('/api/health', 'health')
+        _, files = client.get('/api/files', 'files')
+        counts = (health['job_descriptions_count'], health['resumes_count'], health['analyses_count'])
+        views.setdefault(health['worker'], set()).add(
+            (health['storeVersion'], counts, tuple(sorted(entry['id'] for entry in files['files'])))
+        )
+    return views
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--resumes', type=int, default=160)
+    parser.add_argument('--races', type=int, default=20)
+    parser.add_argument('--chunked', type=int, default=8, help='resumes sent through chunked uploads')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    work_dir = tempfile.mkdtemp(prefix='concurrency_check_')
+    port = free_port()
+    server = start_server(work_dir, args.workers, port)
+    client = Client(f'http://127.0.0.1:{port}')
+    checks = Checks()
+    try:
+        jd_ids = []
+        for i in range(args.workers):
+            status, body = client.upload([(f'jd_{i}.txt', '\n'.join(jd_lines(rng)))], 'jd')
+            checks.expect(status == 200, f'JD upload returned {status}: {body}')
+            jd_ids.append(body['data']['fileId'])
+
+        documents = [(f'resume_{i}.txt', '\n'.join(resume_lines(rng, rng.randint(20, 60))))
+                     for i in range(args.resumes)]
+        batches = [documents[i:i + 4] for i in range(0, len(documents), 4)]
+        with ThreadPoolExecutor(args.clients) as pool:
+            uploaded = list(pool.map(
+                lambda indexed: upload_and_analyze(client, checks, jd_ids, indexed[1], indexed[0] % 2 == 1),
+                enumerate(batches)
+            ))
+        resume_ids = [file_id for file_ids in uploaded for file_id in file_ids]
+
+        race_winners = [filename_race(client, checks, race, 4) for race in range(args.races)]
+        resume_ids += [winner for winner in race_winners if winner]
+
+        large = [(f'large_{i}.txt', '\n'.join(resume_lines(rng, 2000)).encode()) for i in range(args.chunked)]
+        with ThreadPoolExecutor(args.clients) as pool:
+            chunked_ids = list(pool.map(lambda document: chunked_upload(client, checks, *document, 16 * 1024), large))
+        checks.expect(all(chunked_ids), 'a chunked upload failed')
+        resume_ids += [file_id for file_id in chunked_ids if file_id]
+
+        # Every worker scores the full library, concurrently
+        with ThreadPoolExecutor(args.clients) as pool:
+            for status, body in pool.map(
+                lambda jd_id: client.post_json('/api/analyze', {'jobDescriptionId': jd_id, 'resumeIds': resume_ids},
+                                               'analyze.all'),
+                jd_ids * 4
+            ):
+                if checks.expect(status == 200, f'full analyze returned {status}: {body}'):
+                    checks.expect(len(body['results']) == len(resume_ids), 'full analyze missed resumes')
+
+        # Delete half the resumes while other clients keep analyzing the rest
+        doomed = resume_ids[::2]
+        kept = resume_ids[1::2]
+        with ThreadPoolExecutor(args.clients) as pool:
+            deletes = [pool.submit(client.request, 'delete', 'DELETE', f'/api/files/{file_id}') for file_id in doomed]
+            analyses = [pool.submit(client.post_json, '/api/analyze',
+                                    {'jobDescriptionId': jd_id, 'resumeIds': kept}, 'analyze.during_delete')
+                        for jd_id in jd_ids * 2]
+            for future in deletes:
+                status, body = future.result()
+                checks.expect(status == 200, f'delete returned {status}: {body}')
+            for future in analyses:
+                status, body = future.result()
+                if checks.expect(status == 200, f'analyze during deletes returned {status}: {body}'):
+                    checks.expect(len(body['results']) == len(kept), 'analyze during deletes missed kept resumes')
+
+        # All workers converge on the same view
+        views = worker_views(client, args.workers * 8)
+        expected_ids = tuple(sorted([*jd_ids, *kept]))
+        distinct = {view for worker in views.values() for view in worker}
+        checks.expect(len(views) == args.workers, f'requests reached {len(views)} of {args.workers} workers')
+        checks.expect(len(distinct) == 1, f'workers disagree: {len(distinct)} distinct views')
+        checks.expect(all(view[2] == expected_ids for view in distinct), 'listed files differ from what was kept')
+        stored = sorted(os.listdir(os.path.join(work_dir, 'uploads', 'resumes')))
+        checks.expect(len(stored) == len(kept), f'{len(stored)} resume files on disk for {len(kept)} resumes')
+        status, body = client.post_json('/api/analyze', {'jobDescriptionId': jd_ids[0], 'resumeIds': doomed},
+                                        'analyze.deleted')
+        checks.expect(status == 200 and not body['results'], 'a worker still scored deleted resumes')
+
+        print(f"{args.workers} workers, {args.clients} clients, {len(resume_ids)} resumes, {args.races} filename races\n")
+        report({operation: summarize(latencies) for operation, latencies in sorted(client.latencies.items())})
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        if checks.failures:
+            with open(os.path.join(work_dir, 'server.log')) as log:
+                print(log.read()[-4000:])
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if checks.failures:
+        print(f"\nFAIL: {len(checks.failures)} check(s) failed")
+        for failure in checks.failures[:20]:
+            print(f"  {failure}")
+        sys.exit(1)
+    print('\nOK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Shared helpers for the benchmark scripts: timing stats, RSS sampling and JSON baselines."""
+import json
+import math
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from datetime import datetime
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(latencies, items=None):
+    """p50/p95/max in ms plus throughput (items per second of wall time spent in the calls)"""
+    total = sum(latencies)
+    items = len(latencies) if items is None else items
+    return {
+        'count': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'max_ms': round(max(latencies) * 1000, 3),
+        'throughput_per_s': round(items / total, 2) if total else None
+    }
+
+
+def current_rss_mib():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError):
+        # No procfs (macOS): fall back to the lifetime peak
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+class RSSSampler:
+    """Peak resident memory of this process while the block runs, sampled every interval seconds"""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak_mib = 0.0
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_mib = max(self.peak_mib, current_rss_mib())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak_mib = current_rss_mib()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mib = round(max(self.peak_mib, current_rss_mib()), 1)
+
+
+def time_calls(func, args_list, repeat=1):
+    """Per-call latencies (seconds) of func over args_list, repeated"""
+    latencies = []
+    for _ in range(repeat):
+        for args in args_list:
+            start = time.perf_counter()
+            func(*args)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'recorded_at': datetime.now().isoformat(timespec='seconds')
+    }
+
+
+def save_baseline(name, results, config):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = os.path.join(BASELINE_DIR, f'{name}.json')
+    with open(path, 'w') as out:
+        json.dump({'config': config, 'environment': environment(), 'results': results}, out, indent=2)
+        out.write('\n')
+    return path
+
+
+def compare_baseline(name, results, tolerance):
+    """Print p95 and throughput against the stored baseline; return the regressions found.
+
+    A metric regresses when p95 grows, or throughput falls, by more than
+    tolerance (a fraction). Baselines are machine-specific: compare runs
+    made on the same hardware with the same config.
+    """
+    path = os.path.join(BASELINE_DIR, f'{name}.json')
+    if not os.path.exists(path):
+        print(f"No baseline at {path}; run with --save-baseline first")
+        return []
+    with open(path) as baseline_file:
+        baseline = json.load(baseline_file)['results']
+
+    regressions = []
+    print(f"\n{'vs baseline':<36} {'p95 ms':>18} {'throughput/s':>22}")
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous or 'p95_ms' not in current:
+            continue
+        p95_change = current['p95_ms'] / previous['p95_ms'] - 1 if previous['p95_ms'] else 0
+        throughput_change = 0
+        if previous.get('throughput_per_s') and current.get('throughput_per_s'):
+            throughput_change = current['throughput_per_s'] / previous['throughput_per_s'] - 1
+        flag = ''
+        if p95_change > tolerance or throughput_change < -tolerance:
+            flag = '  REGRESSION'
+            regressions.append(key)
+        print(f"{key:<36} {previous['p95_ms']:>8.2f} -> {current['p95_ms']:<8.2f}"
+              f" {previous.get('throughput_per_s') or 0:>10.1f} -> {current.get('throughput_per_s') or 0:<10.1f}{flag}")
+    return regressions
+
+
+def report(results):
+    print(f"{'stage':<36} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'per s':>9} {'peak RSS MiB':>13}")
+    for key, stats in results.items():
+        print(f"{key:<36} {stats['count']:>6} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['max_ms']:>9.2f}"
+              f" {stats.get('throughput_per_s') or 0:>9.1f} {stats.get('peak_rss_mib', ''):>13}")
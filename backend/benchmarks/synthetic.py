@@ -0,0 +1,134 @@
+"""Synthetic resumes and job descriptions for the benchmarks.
+
+Text is generated from a seeded random.Random, so a given seed and size always
+produce the same documents. PDFs are written by hand (one Helvetica text
+stream per page) so no PDF authoring library is needed. HashingEncoder stands
+in for the sentence-transformers model.
+"""
+import hashlib
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.skills import SKILL_TAXONOMY  # noqa: E402
+
+SKILLS = sorted(set(SKILL_TAXONOMY.values()))
+CITIES = ['Bangalore', 'Hyderabad', 'Pune', 'Mumbai', 'Delhi', 'Chennai', 'Kolkata', 'Noida']
+FILLER = ['developed', 'scalable', 'services', 'for', 'the', 'team', 'led', 'design', 'reviews',
+          'built', 'data', 'pipelines', 'with', 'and', 'improved', 'latency', 'across', 'projects']
+LINES_PER_PAGE = 45
+
+
+def sentence(rng, words=12):
+    parts = [rng.choice(SKILLS) if rng.random() < 0.15 else rng.choice(FILLER) for _ in range(words)]
+    return ' '.join(parts).capitalize() + '.'
+
+
+def resume_lines(rng, lines=60):
+    """Lines of a resume: contact, skills, a dated experience history, then filler"""
+    years = rng.randint(1, 15)
+    start = 2025 - years
+    header = [
+        f"Candidate {rng.randint(1000, 9999)}",
+        f"Location: {rng.choice(CITIES)}",
+        f"Skills: {', '.join(rng.sample(SKILLS, rng.randint(4, 14)))}",
+        f"Experience: {years} years of experience in software development",
+        f"Software Engineer {start} - present",
+    ]
+    return header + [sentence(rng) for _ in range(max(0, lines - len(header)))]
+
+
+def jd_lines(rng, lines=30):
+    header = [
+        "Job Title: Software Engineer",
+        f"Location: {rng.choice(CITIES)}",
+        f"Requirements: {rng.randint(1, 8)}+ years of experience with {', '.join(rng.sample(SKILLS, 6))}",
+        f"Nice to have: {', '.join(rng.sample(SKILLS, 3))}",
+    ]
+    return header + [sentence(rng) for _ in range(max(0, lines - len(header)))]
+
+
+def _pdf_escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_pdf(path, lines, lines_per_page=LINES_PER_PAGE):
+    """Write lines as a plain-text PDF, lines_per_page to a page"""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    page_count = len(pages)
+    # Objects: 1 catalog, 2 page tree, 3 font, then a (page, contents) pair per page
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            ' '.join(f"{4 + 2 * i} 0 R" for i in range(page_count)), page_count)).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, page_lines in enumerate(pages):
+        stream = "BT /F1 10 Tf 14 TL 50 770 Td " + ' '.join(f"({_pdf_escape(line)}) Tj T*" for line in page_lines) + " ET"
+        stream = stream.encode('latin-1', 'replace')
+        objects.append((
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+        ).encode())
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    with open(path, 'wb') as out:
+        out.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(out.tell())
+            out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref = out.tell()
+        out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            out.write(b"%010d 00000 n \n" % offset)
+        out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def write_docx(path, lines, table=None):
+    """table, if given, is a list of rows of cell text added after the paragraphs"""
+    import docx
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    if table:
+        grid = document.add_table(rows=len(table), cols=max(len(row) for row in table))
+        for cells, row in zip(grid.rows, table):
+            for cell, text in zip(cells.cells, row):
+                cell.text = text
+    document.save(path)
+
+
+def write_txt(path, lines):
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write('\n'.join(lines))
+
+
+class HashingEncoder:
+    """Deterministic, offline stand-in for a SentenceTransformer.
+
+    Hashes word tokens into a fixed number of signed buckets. It needs no
+    weights or network, so benchmarks and tests can exercise the embedding
+    engine; its similarities are lexical, not semantic.
+    """
+
+    def __init__(self, dimensions=384):
+        self.dimensions = dimensions
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        import numpy as np
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r'\w+', text.lower()):
+                value = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+                matrix[row, value % self.dimensions] += 1.0 if (value >> 32) & 1 else -1.0
+        return matrix
+
+
+WRITERS = {'pdf': write_pdf, 'docx': write_docx, 'txt': write_txt}
+
+
+def write_document(path, lines):
+    WRITERS[path.rsplit('.', 1)[1]](path, lines)
@@ -0,0 +1,10 @@
+# Picked up automatically when gunicorn is started from backend/, e.g.
+#   gunicorn app.main:app
+import sys
+
+
+def post_worker_init(worker):
+    """Preload heavy libraries and start the upload sweeper once the worker has loaded the app"""
+    app_module = sys.modules[worker.wsgi.import_name]
+    app_module.warm_up()
+    app_module.start_sweeper()
@@ -0,0 +1,51 @@
+"""Tests run the app against a throwaway database and upload folder.
+
+Both are set up before app.main is first imported, since importing it opens
+the database named by DATABASE_URL and creates uploads/ in the working
+directory. The benchmarks' synthetic document writers are importable too.
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'benchmarks'))
+
+WORK_DIR = tempfile.mkdtemp(prefix='resume_tests_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORK_DIR, 'test.db')}"
+
+
+def pytest_sessionfinish(session, exitstatus):
+    os.chdir(BACKEND_DIR)
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def main():
+    os.chdir(WORK_DIR)
+    from app import main
+    return main
+
+
+@pytest.fixture
+def client(main):
+    return main.app.test_client()
+
+
+@pytest.fixture
+def upload(client):
+    """upload(upload_type, text) stores a TXT upload under a fresh name and returns its id"""
+    def upload(upload_type, text):
+        response = client.post('/api/upload', data={
+            'type': upload_type,
+            'files': [(io.BytesIO(text.encode()), f'{uuid.uuid4().hex}.txt')]
+        }, content_type='multipart/form-data')
+        assert response.status_code == 200, response.json
+        return response.json['data']['fileId']
+    return upload
@@ -0,0 +1,92 @@
+import json
+import uuid
+
+
+def analyze(client, jd_id, resume_ids):
+    response = client.post('/api/analyze', json={'jobDescriptionId': jd_id, 'resumeIds': resume_ids})
+    assert response.status_code == 200, response.json
+    return {result['resumeId']: result for result in response.json['results']}
+
+
+def latest_results(client, resume_ids):
+    results = client.get('/api/analyses').json['results']
+    return {result['resumeId']: result for result in results if result['resumeId'] in resume_ids}
+
+
+def library(upload, resumes=3):
+    tag = uuid.uuid4().hex
+    jd_id = upload('jd', f'{tag} Requirements: 4+ years of experience with Python, Docker and SQL')
+    resume_ids = [upload('resume', f'{tag} Candidate {i}, Pune. {i + 1} years of experience with Python and SQL')
+                  for i in range(resumes)]
+    return jd_id, resume_ids
+
+
+def small_batches(monkeypatch, store):
+    """Make analysis writers commit every row on its own, as a long run would"""
+    make_writer = store.analysis_writer
+
+    def analysis_writer(*args, **kwargs):
+        writer = make_writer(*args, **kwargs)
+        writer.batch_size = 1
+        return writer
+    monkeypatch.setattr(store, 'analysis_writer', analysis_writer)
+
+
+def test_latest_analyses_change_only_when_the_writer_closes(main, client, upload):
+    jd_id, resume_ids = library(upload)
+    before = analyze(client, jd_id, resume_ids)
+
+    writer = main.store.analysis_writer(str(uuid.uuid4()), jd_id, '2030-01-01T00:00:00', update_resumes=True)
+    writer.batch_size = 2
+    rescored = {resume_id: {**result, 'score': 0} for resume_id, result in before.items()}
+    for result in rescored.values():
+        writer.add(result)
+    assert writer.count == 2
+    assert latest_results(client, resume_ids) == before
+
+    writer.close()
+    assert latest_results(client, resume_ids) == rescored
+
+
+def test_aborted_writer_leaves_latest_analyses_alone(main, client, upload):
+    jd_id, resume_ids = library(upload)
+    before = analyze(client, jd_id, resume_ids)
+
+    analysis_id = str(uuid.uuid4())
+    writer = main.store.analysis_writer(analysis_id, jd_id, '2030-01-01T00:00:00')
+    writer.batch_size = 1
+    for result in before.values():
+        writer.add({**result, 'score': 0})
+    writer.abort()
+
+    assert latest_results(client, resume_ids) == before
+    assert client.get(f'/api/export/{analysis_id}').status_code == 404
+
+
+def test_cancelled_stream_leaves_latest_analyses_alone(main, client, upload, monkeypatch):
+    jd_id, resume_ids = library(upload)
+    before = analyze(client, jd_id, resume_ids)
+    small_batches(monkeypatch, main.store)
+
+    response = client.post('/api/analyze/stream', json={'jobDescriptionId': jd_id, 'resumeIds': resume_ids},
+                           buffered=False)
+    stream = response.response
+    first = json.loads(next(iter(stream)))
+    second = json.loads(next(iter(stream)))
+    assert first['type'] == second['type'] == 'result'
+    # The client goes away with rows already committed
+    response.close()
+
+    assert latest_results(client, resume_ids) == before
+
+
+def test_completed_stream_updates_latest_analyses(main, client, upload, monkeypatch):
+    jd_id, resume_ids = library(upload)
+    small_batches(monkeypatch, main.store)
+
+    response = client.post('/api/analyze/stream', json={'jobDescriptionId': jd_id, 'resumeIds': resume_ids})
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert records[-1]['type'] == 'summary' and records[-1]['count'] == len(resume_ids)
+
+    streamed = {record['result']['resumeId']: record['result'] for record in records[:-1]}
+    assert latest_results(client, resume_ids) == streamed
@@ -0,0 +1,126 @@
+import io
+import os
+import time
+import uuid
+
+from app.store import DocumentStore
+
+GOOD = '{} Kavya Menon, Pune. 5 years of experience with Python, Django and AWS'
+BETTER = '{} Kavya Menon, Pune. 7 years of experience with Python, Kubernetes and Go'
+
+
+def post_async(client, text, filename, upload_type='resume', **form):
+    response = client.post('/api/upload', query_string={'async': '1'}, data={
+        'type': upload_type, 'files': [(io.BytesIO(text.encode()), filename)], **form
+    }, content_type='multipart/form-data')
+    assert response.status_code == 202, response.json
+    return response.json['data']['fileId']
+
+
+def post(client, text, filename, **form):
+    response = client.post('/api/upload', data={
+        'type': 'resume', 'files': [(io.BytesIO(text.encode()), filename)], **form
+    }, content_type='multipart/form-data')
+    assert response.status_code == 200, response.json
+    return response.json['data']['fileId']
+
+
+def wait_until(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def wait_for(client, file_id):
+    """The /api/upload/status entry of file_id once it is no longer pending"""
+    def status():
+        return client.get('/api/upload/status', query_string={'ids': file_id}).json
+    wait_until(lambda: status()['done'])
+    return status()['files'][0]
+
+
+def test_an_async_upload_is_parsed_in_the_background(main, client):
+    tag = uuid.uuid4().hex
+    file_id = post_async(client, GOOD.format(tag), f'{tag}.txt')
+
+    entry = wait_for(client, file_id)
+    assert entry['status'] == 'ready' and 'error' not in entry
+    assert 'Python' in main.store.get_features(file_id)['skills']
+    assert tag in main.store.get_text(file_id)
+
+
+def test_a_failed_parse_is_reported(main, client):
+    tag = uuid.uuid4().hex
+    file_id = post_async(client, 'too short', f'{tag}.txt')
+
+    entry = wait_for(client, file_id)
+    assert entry['status'] == 'failed'
+    assert entry['error'] == 'File appears to be empty'
+
+
+def test_a_failed_replacement_keeps_the_previous_version(main, client):
+    tag = uuid.uuid4().hex
+    filename = f'{tag}.txt'
+    file_id = post(client, GOOD.format(tag), filename)
+    before = main.store.get_content(file_id)
+    old_path = main.store.get_document(file_id).file_path
+
+    assert post_async(client, 'too short', filename, replace='true') == file_id
+    entry = wait_for(client, file_id)
+    assert entry['status'] == 'ready'
+    assert entry['error'].startswith('Replacement failed: File appears to be empty')
+
+    assert main.store.get_content(file_id) == before
+    assert main.store.get_document(file_id).file_path == old_path and os.path.exists(old_path)
+    assert main.store.find_by_filename(filename).id == file_id
+    assert main.store.replacing(file_id) is None
+
+
+def test_a_replacement_takes_over_once_parsed(main, client):
+    tag = uuid.uuid4().hex
+    filename = f'{tag}.txt'
+    file_id = post(client, GOOD.format(tag), filename)
+    old_path = main.store.get_document(file_id).file_path
+
+    assert post_async(client, BETTER.format(tag), filename, replace='true') == file_id
+    entry = wait_for(client, file_id)
+    assert entry['status'] == 'ready' and 'error' not in entry
+
+    features = main.store.get_features(file_id)
+    assert features['version'] == 2 and 'Kubernetes' in features['skills']
+    assert main.store.get_document(file_id).file_path != old_path
+    # The replaced file goes right after the swap
+    wait_until(lambda: not os.path.exists(old_path))
+    listed = [entry['id'] for entry in client.get('/api/files').json['files']]
+    assert listed.count(file_id) == 1
+
+
+def test_a_staged_replacement_is_parsed_again_after_a_restart(main, client):
+    tag = uuid.uuid4().hex
+    filename = f'{tag}.txt'
+    file_id = post(client, GOOD.format(tag), filename)
+    meta = main.store.get_document(file_id)
+    new_path = os.path.join(main.UPLOAD_FOLDER, 'resumes', f'{file_id}_v2_{filename}')
+    with open(new_path, 'w') as out:
+        out.write(BETTER.format(tag))
+    # Staged, then the process stopped before parsing it
+    main.store.stage_replacements([{**meta.to_record(), 'status': 'pending', 'file_path': new_path}])
+
+    restarted = DocumentStore()
+    restarted.load()
+    assert restarted.get_document(file_id).status == 'ready'
+    assert restarted.find_by_filename(filename).id == file_id
+    pending = [record for record in restarted.pending_documents() if record['id'] == file_id]
+    assert len(pending) == 1 and pending[0]['revision'] == 2
+
+    main.ingest_uploads(pending)
+    assert main.store.replacing(file_id) is None
+    assert tag in main.store.get_text(file_id) and 'Kubernetes' in main.store.get_features(file_id)['skills']
+
+
+def test_status_needs_ids(client):
+    assert client.get('/api/upload/status').status_code == 400
+    missing = str(uuid.uuid4())
+    body = client.get('/api/upload/status', query_string={'ids': missing}).json
+    assert body['files'] == [{'id': missing, 'status': 'not_found'}]
@@ -0,0 +1,58 @@
+import uuid
+
+import pytest
+
+from app.store import DocumentStore
+
+
+@pytest.fixture
+def store(main):
+    main.store.refresh()
+    return main.store
+
+
+def test_refresh_replays_another_process_writes(store, client, upload):
+    other = DocumentStore()
+    other.load()
+    resume_id = upload('resume', f'{uuid.uuid4().hex} Lena Das, Pune. 3 years of experience with Python')
+    other.refresh()
+    store.refresh()
+    assert resume_id in other.resumes and resume_id in other.skill_index
+    assert other.version == store.version
+
+
+def test_a_process_behind_the_trimmed_log_resyncs(store, client, upload):
+    tag = uuid.uuid4().hex
+    deleted = upload('resume', f'{tag} Omar Sheikh, Delhi. 2 years of experience with Java')
+    other = DocumentStore()
+    other.load()
+    assert deleted in other.resumes
+
+    assert client.delete(f'/api/files/{deleted}').status_code == 200
+    added = upload('resume', f'{tag} Tara Bose, Pune. 6 years of experience with Python and AWS')
+    assert store.compact_changes(1) > 0
+    assert other.changed_since(other.version) is None
+
+    other.refresh()
+    store.refresh()
+    assert deleted not in other.resumes and deleted not in other.skill_index
+    assert added in other.resumes and added in other.skill_index
+    assert other.version == store.version
+    assert set(other.resumes) == set(store.resumes)
+
+
+@pytest.mark.parametrize('path, key', [('/api/files', 'files'), ('/api/analyses', 'results')])
+def test_a_client_behind_the_trimmed_log_gets_everything(store, client, upload, path, key):
+    old_version = store.version
+    for name in ('Ivy Chen', 'Arjun Mehta'):
+        upload('resume', f'{uuid.uuid4().hex} {name}, Noida. 4 years of experience with SQL')
+    # The log still reaches back to the second upload only
+    store.compact_changes(1)
+
+    full = client.get(path).json
+    behind = client.get(path, query_string={'since': old_version}).json
+    assert behind['resync'] is True and behind[key] == full[key]
+
+    store.refresh()
+    current = client.get(path, query_string={'since': store.version}).json
+    assert 'resync' not in current and current[key] == []
@@ -0,0 +1,104 @@
+import hashlib
+import os
+import uuid
+
+
+def start(client, data, **fields):
+    body = {'filename': f'{uuid.uuid4().hex}.txt', 'type': 'resume', 'size': len(data), **fields}
+    response = client.post('/api/uploads', json=body)
+    assert response.status_code == 201, response.json
+    return response.json['data']
+
+
+def append(client, upload_id, offset, chunk):
+    return client.post(f'/api/uploads/{upload_id}/append', query_string={'offset': offset}, data=chunk,
+                       content_type='application/octet-stream')
+
+
+def resume_bytes():
+    return f'{uuid.uuid4().hex} Ishaan Gupta, Pune. 6 years of experience with Python, AWS and Docker'.encode()
+
+
+def test_chunks_resume_and_finalize(main, client):
+    data = resume_bytes()
+    upload = start(client, data, sha256=hashlib.sha256(data).hexdigest())
+    upload_id = upload['uploadId']
+    assert upload['offset'] == 0 and upload['status'] == 'open'
+
+    assert append(client, upload_id, 0, data[:40]).json['data']['offset'] == 40
+    # The client lost track and sends the first chunk again
+    mismatch = append(client, upload_id, 0, data[:40])
+    assert mismatch.status_code == 409 and mismatch.json['offset'] == 40
+
+    resumed = client.get(f'/api/uploads/{upload_id}').json['data']
+    assert resumed['offset'] == 40
+    assert client.post(f'/api/uploads/{upload_id}/finalize').status_code == 409
+
+    assert append(client, upload_id, 40, data[40:]).json['data']['offset'] == len(data)
+    response = client.post(f'/api/uploads/{upload_id}/finalize')
+    assert response.status_code == 200, response.json
+    file_id = response.json['data']['fileId']
+    assert file_id == upload['fileId']
+    assert main.store.get_text(file_id) == data.decode()
+    assert 'Python' in main.store.get_features(file_id)['skills']
+    assert client.get(f'/api/uploads/{upload_id}').status_code == 404
+
+
+def test_offsets_are_checked(client):
+    data = resume_bytes()
+    upload_id = start(client, data)['uploadId']
+    assert client.post(f'/api/uploads/{upload_id}/append', data=data).status_code == 400
+    assert append(client, str(uuid.uuid4()), 0, data).status_code == 404
+
+    overflow = append(client, upload_id, 0, data + b'more')
+    assert overflow.status_code == 400 and overflow.json['offset'] == len(data)
+
+
+def test_a_wrong_digest_is_rejected_at_finalize(main, client):
+    data = resume_bytes()
+    upload_id = start(client, data, sha256='0' * 64)['uploadId']
+    file_path = main.store.get_upload_session(upload_id)['file_path']
+    append(client, upload_id, 0, data)
+
+    assert client.post(f'/api/uploads/{upload_id}/finalize').status_code == 409
+    assert not os.path.exists(file_path)
+    assert client.get(f'/api/uploads/{upload_id}').status_code == 404
+
+
+def test_a_chunk_over_the_request_cap_is_refused(main, client, monkeypatch):
+    data = resume_bytes()
+    upload_id = start(client, data)['uploadId']
+    monkeypatch.setitem(main.app.config, 'MAX_CONTENT_LENGTH', 32)
+
+    response = append(client, upload_id, 0, data[:64])
+    assert response.status_code == 413 and response.json['offset'] == 0
+    # Nothing is left holding the upload, so the next chunk goes through
+    assert client.get(f'/api/uploads/{upload_id}').json['data']['status'] == 'open'
+    assert append(client, upload_id, 0, data[:32]).json['data']['offset'] == 32
+
+
+def test_abort_removes_the_partial_file(main, client):
+    data = resume_bytes()
+    upload_id = start(client, data)['uploadId']
+    file_path = main.store.get_upload_session(upload_id)['file_path']
+    append(client, upload_id, 0, data[:10])
+
+    assert client.delete(f'/api/uploads/{upload_id}').status_code == 200
+    assert not os.path.exists(file_path)
+    assert client.get(f'/api/uploads/{upload_id}').status_code == 404
+    assert client.delete(f'/api/uploads/{upload_id}').status_code == 404
+
+
+def test_abandoned_uploads_expire(main, client, monkeypatch):
+    data = resume_bytes()
+    upload_id = start(client, data)['uploadId']
+    file_path = main.store.get_upload_session(upload_id)['file_path']
+    append(client, upload_id, 0, data[:10])
+
+    main.sweep_uploads()
+    assert client.get(f'/api/uploads/{upload_id}').status_code == 200
+
+    monkeypatch.setattr(main, 'UPLOAD_SESSION_TTL_HOURS', 0)
+    main.sweep_uploads()
+    assert client.get(f'/api/uploads/{upload_id}').status_code == 404
+    assert not os.path.exists(file_path)
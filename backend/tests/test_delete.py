@@ -0,0 +1,67 @@
+import os
+import time
+import uuid
+
+
+def analyze(client, jd_id, resume_ids):
+    response = client.post('/api/analyze', json={'jobDescriptionId': jd_id, 'resumeIds': resume_ids})
+    assert response.status_code == 200, response.json
+    return {result['resumeId']: result for result in response.json['results']}
+
+
+def latest_results(client, **params):
+    response = client.get('/api/analyses', query_string=params)
+    assert response.status_code == 200
+    return {result['resumeId']: result for result in response.json['results']}
+
+
+def test_deleting_a_jd_drops_it_from_latest_analyses(client, upload):
+    tag = uuid.uuid4().hex
+    older_jd = upload('jd', f'{tag} Requirements: 3+ years of experience with Java and Spring')
+    newer_jd = upload('jd', f'{tag} Requirements: 5+ years of experience with Python, Django and AWS')
+    kept = upload('resume', f'{tag} Jane Doe, Pune. 6 years of experience with Python, Django, AWS and Java')
+    dropped = upload('resume', f'{tag} John Roe, Delhi. 2 years of experience with Python and Django')
+
+    older = analyze(client, older_jd, [kept])
+    newer = analyze(client, newer_jd, [kept, dropped])
+    assert latest_results(client)[kept] == newer[kept]
+    version = client.get('/api/analyses').json['version']
+
+    response = client.delete(f'/api/files/{newer_jd}')
+    assert response.status_code == 200
+
+    latest = latest_results(client)
+    # Back to the result against the JD that is still there, or to none
+    assert latest[kept] == older[kept]
+    assert dropped not in latest
+    assert newer[kept] not in latest.values()
+    # Clients polling for changes get the new result, and drop the one with none left
+    changes = client.get('/api/analyses', query_string={'since': version}).json
+    assert {result['resumeId']: result for result in changes['results']} == {kept: older[kept]}
+    assert dropped in changes['deletedIds']
+
+
+def test_the_sweeper_keeps_files_without_a_document_unless_asked(main, monkeypatch):
+    path = os.path.join(main.UPLOAD_FOLDER, 'resumes', f'{uuid.uuid4().hex}_sample.pdf')
+    with open(path, 'wb') as out:
+        out.write(b'%PDF-1.4')
+    # Older than the grace period
+    stale = time.time() - main.ORPHAN_GRACE - 60
+    os.utime(path, (stale, stale))
+
+    main.sweep_uploads()
+    assert os.path.exists(path)
+
+    monkeypatch.setattr(main, 'ORPHAN_SWEEP', True)
+    main.sweep_uploads()
+    assert not os.path.exists(path)
+
+
+def test_a_new_resume_without_an_analysis_is_not_reported_deleted(client, upload):
+    version = client.get('/api/analyses').json['version']
+    fresh = upload('resume', f'{uuid.uuid4().hex} Asha Rao, Pune. 2 years of experience with Python')
+
+    changes = client.get('/api/analyses', query_string={'since': version}).json
+    assert 'resync' not in changes
+    assert fresh not in changes['deletedIds']
+    assert fresh not in {result['resumeId'] for result in changes['results']}
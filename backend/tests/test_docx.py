@@ -0,0 +1,53 @@
+import io
+import uuid
+
+import pytest
+
+from app.extraction import extract_document, iter_docx_paragraphs, iter_docx_xml, iter_python_docx
+from bench_docx_extraction import EDGE_CASES, EDGE_CASES_EXPECTED, with_document_xml
+from synthetic import write_docx
+
+TABLE = [['Languages', 'Python', 'Java'], ['Cloud', 'AWS', 'Kubernetes']]
+
+
+@pytest.fixture
+def docx_bytes(tmp_path):
+    def docx_bytes(lines, table=None):
+        path = tmp_path / f'{uuid.uuid4().hex}.docx'
+        write_docx(str(path), lines, table)
+        return path.read_bytes()
+    return docx_bytes
+
+
+def test_paragraphs_and_table_rows_come_out_in_order(docx_bytes):
+    data = docx_bytes(['Jane Doe', 'Pune, India'], TABLE)
+    assert list(iter_docx_xml(data)) == ['Jane Doe', 'Pune, India', 'Languages\tPython\tJava',
+                                         'Cloud\tAWS\tKubernetes']
+    assert list(iter_docx_xml(data)) == list(iter_python_docx(data))
+
+
+def test_runs_text_boxes_and_nested_tables(docx_bytes):
+    data = with_document_xml(docx_bytes(['x']), EDGE_CASES)
+    assert list(iter_docx_paragraphs(data)) == EDGE_CASES_EXPECTED
+
+
+def test_unusual_main_part_falls_back_to_python_docx(docx_bytes):
+    data = with_document_xml(docx_bytes(['Jane Doe']), rename='word/main.xml')
+    assert list(iter_docx_paragraphs(data)) == ['Jane Doe']
+
+
+def test_max_chars_stops_early(docx_bytes):
+    data = docx_bytes([f'paragraph {i}' for i in range(1000)])
+    text, _, truncated = extract_document(data, 'docx', max_chars=50)
+    assert truncated
+    assert text == '\n'.join(f'paragraph {i}' for i in range(5))[:50]
+
+
+def test_skills_in_a_table_are_found_on_upload(main, client, docx_bytes):
+    data = docx_bytes(['Jane Doe', 'Pune, India', '4 years of experience building data platforms'], TABLE)
+    response = client.post('/api/upload', data={
+        'type': 'resume', 'files': [(io.BytesIO(data), f'{uuid.uuid4().hex}.docx')]
+    }, content_type='multipart/form-data')
+    assert response.status_code == 200, response.json
+    skills = main.store.get_features(response.json['data']['fileId'])['skills']
+    assert {'python', 'java', 'aws', 'kubernetes'} <= {skill.lower() for skill in skills}
@@ -0,0 +1,31 @@
+import uuid
+
+
+def etag(response):
+    return response.headers['ETag']
+
+
+def test_a_listing_revalidates_with_its_own_tag(client, upload):
+    upload('resume', f'{uuid.uuid4().hex} Nina Paul, Pune. 3 years of experience with Python')
+    first = client.get('/api/files', query_string={'type': 'resume'})
+    again = client.get('/api/files', query_string={'type': 'resume'}, headers={'If-None-Match': etag(first)})
+    assert again.status_code == 304
+    assert etag(again) == etag(first)
+    assert 'Accept-Encoding' in again.headers['Vary']
+
+
+def test_tags_differ_by_route_and_query(client, upload):
+    upload('jd', f'{uuid.uuid4().hex} Requirements: Python and Docker')
+    responses = [client.get('/api/files'), client.get('/api/files', query_string={'type': 'jd'}),
+                 client.get('/api/files', query_string={'since': 0}), client.get('/api/analyses')]
+    tags = [etag(response) for response in responses]
+    assert len(set(tags)) == len(tags)
+
+    for response, tag in zip(responses[1:], tags):
+        # A tag from one listing must not turn another into a 304
+        assert client.get(response.request.full_path, headers={'If-None-Match': tag}).status_code == 200
+
+
+def test_query_order_does_not_matter(client):
+    tags = {etag(client.get(path)) for path in ('/api/files?type=jd&since=0', '/api/files?since=0&type=jd')}
+    assert len(tags) == 1
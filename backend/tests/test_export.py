@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+import uuid
+
+import pandas as pd
+import pytest
+from werkzeug.http import parse_options_header
+
+from app.export import EXPORT_COLUMNS, EXPORT_FORMATS, iter_csv
+
+
+def analyzed(client, upload):
+    """Analyze three fresh resumes; return the analysis id and its result rows"""
+    tag = uuid.uuid4().hex
+    jd_id = upload('jd', f'{tag} Requirements: 4+ years of experience with Python, Docker and SQL')
+    resume_ids = [upload('resume', f'{tag} Candidate {i}, Pune. {i + 1} years of experience with Python and SQL')
+                  for i in range(3)]
+    response = client.post('/api/analyze', json={'jobDescriptionId': jd_id, 'resumeIds': resume_ids})
+    assert response.status_code == 200, response.json
+    return response.json['data']['analysisId'], response.json['results']
+
+
+def export(client, analysis_id, export_format, **query):
+    response = client.get(f'/api/export/{analysis_id}', query_string={'format': export_format, **query})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    assert response.mimetype == mimetype
+    disposition, options = parse_options_header(response.headers['Content-Disposition'])
+    assert disposition == 'attachment'
+    assert options['filename'] == f'resume-analysis-{analysis_id}.{extension}'
+    return response
+
+
+def flat(result):
+    row = {column: str(result[column]) for column in EXPORT_COLUMNS}
+    row['matchedSkills'] = '; '.join(result['matchedSkills'])
+    row['missingSkills'] = '; '.join(result['missingSkills'])
+    return row
+
+
+def test_csv(client, upload):
+    analysis_id, results = analyzed(client, upload)
+    response = export(client, analysis_id, 'csv')
+    assert response.is_streamed
+
+    reader = csv.DictReader(io.StringIO(response.get_data(as_text=True)))
+    assert reader.fieldnames == EXPORT_COLUMNS
+    assert list(reader) == [flat(result) for result in results]
+
+
+def test_json(client, upload):
+    analysis_id, results = analyzed(client, upload)
+    response = export(client, analysis_id, 'json')
+    assert response.is_streamed
+
+    body = json.loads(response.get_data(as_text=True))
+    assert body['id'] == analysis_id and body['version'] == 1
+    assert body['resultCount'] == len(results)
+    assert body['results'] == results
+    assert set(body['results'][0]) == set(EXPORT_COLUMNS)
+
+
+def test_jsonl(client, upload):
+    analysis_id, results = analyzed(client, upload)
+    response = export(client, analysis_id, 'jsonl')
+    assert response.is_streamed
+
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == results
+
+
+def test_xlsx(client, upload):
+    analysis_id, results = analyzed(client, upload)
+    response = export(client, analysis_id, 'xlsx')
+
+    frame = pd.read_excel(io.BytesIO(response.get_data()), sheet_name='Results', dtype=str)
+    assert list(frame.columns) == EXPORT_COLUMNS
+    assert frame.to_dict('records') == [flat(result) for result in results]
+
+
+def test_an_earlier_version_can_be_exported(main, client, upload):
+    analysis_id, results = analyzed(client, upload)
+    replaced = {**results[0], 'score': -1}
+    assert main.store.add_analysis_version(analysis_id, {0: replaced}) == 2
+
+    latest = json.loads(export(client, analysis_id, 'json').get_data(as_text=True))
+    assert latest['version'] == 2 and latest['results'][0]['score'] == -1
+    first = json.loads(export(client, analysis_id, 'json', version=1).get_data(as_text=True))
+    assert first['version'] == 1 and first['results'] == results
+
+
+@pytest.mark.parametrize('query, status', [
+    ({'format': 'pdf'}, 400),
+    ({'format': 'csv', 'version': 9}, 404),
+])
+def test_bad_requests(client, upload, query, status):
+    analysis_id, _ = analyzed(client, upload)
+    response = client.get(f'/api/export/{analysis_id}', query_string=query)
+    assert response.status_code == status and response.json['success'] is False
+
+
+def test_an_unknown_analysis_is_not_found(client):
+    assert client.get(f'/api/export/{uuid.uuid4()}', query_string={'format': 'csv'}).status_code == 404
+
+
+def test_csv_comes_out_a_chunk_of_rows_at_a_time():
+    results = [{'resumeId': str(i), 'matchedSkills': ['Python'], 'missingSkills': []} for i in range(250)]
+    chunks = list(iter_csv(results, rows_per_chunk=100))
+    assert len(chunks) == 3
+    assert chunks[0].startswith(','.join(EXPORT_COLUMNS))
+    assert len(''.join(chunks).splitlines()) == 251
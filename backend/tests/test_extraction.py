@@ -0,0 +1,108 @@
+import io
+import os
+import time
+import uuid
+
+import pytest
+
+from app import extraction
+from synthetic import write_pdf
+
+
+def slow_extract(source, file_extension, max_pages=None, max_chars=None):
+    if source == b'slow':
+        time.sleep(30)
+    if source == b'nap':
+        time.sleep(0.6)
+    if source == b'crash':
+        os._exit(1)
+    return source.decode(), 0, False
+
+
+def texts(jobs, **options):
+    return [result and result[0] for result in extraction.extract_texts(jobs, **options)]
+
+
+def discard_pool():
+    if extraction._pool is not None:
+        extraction._discard_pool(extraction._pool)
+
+
+@pytest.fixture
+def fake_extract(monkeypatch):
+    # Jobs name the function they run, so workers import slow_extract from this module
+    discard_pool()
+    monkeypatch.setattr(extraction, 'extract_document', slow_extract)
+    yield
+    discard_pool()
+
+
+def test_the_pool_is_kept_between_calls(fake_extract):
+    assert texts([(b'one', 'txt'), (b'two', 'txt')], workers=2, timeout=5) == ['one', 'two']
+    pool = extraction._pool
+    assert texts([(b'three', 'txt'), (b'four', 'txt')], workers=2, timeout=5) == ['three', 'four']
+    assert extraction._pool is pool
+    # Workers do not inherit the server's threads and locks
+    assert pool._mp_context.get_start_method() != 'fork'
+
+
+def test_a_single_file_stays_in_process(fake_extract):
+    assert texts([(b'local', 'txt')], workers=2, timeout=5) == ['local']
+    assert texts([(b'local', 'txt')], workers=2, timeout=0) == ['local']
+    assert extraction._pool is None
+
+
+def test_an_isolated_single_file_is_timed_out_in_a_worker(fake_extract, monkeypatch):
+    monkeypatch.setattr(extraction, 'EXTRACT_ISOLATE', True)
+    started = time.monotonic()
+    assert texts([(b'slow', 'txt')], workers=2, timeout=0.5) == [None]
+    assert time.monotonic() - started < 10
+    # The killed pool is replaced by the next call
+    assert texts([(b'after', 'txt')], workers=2, timeout=5) == ['after']
+
+
+def test_a_crash_fails_only_its_own_file(fake_extract):
+    results = texts([(b'ok', 'txt'), (b'crash', 'txt'), (b'fine', 'txt')], workers=2, timeout=5)
+    assert results == ['ok', None, 'fine']
+
+
+def test_a_queued_file_is_timed_from_when_a_worker_starts_it(fake_extract):
+    # With one worker the second file waits out the first, longer than the
+    # timeout in all, but neither runs past it on its own
+    results = texts([(b'nap', 'txt'), (b'nap', 'txt')], workers=1, timeout=1)
+    assert results == ['nap', 'nap']
+
+
+def upload_pdf(client, tmp_path, pages):
+    lines = []
+    for page in range(1, pages + 1):
+        lines += [f'Page {page} marker', 'Ravi Kumar, Pune. 5 years of experience with Python, Docker and AWS']
+    path = tmp_path / 'resume.pdf'
+    write_pdf(str(path), lines, lines_per_page=2)
+    response = client.post('/api/upload', data={
+        'type': 'resume', 'files': [(io.BytesIO(path.read_bytes()), f'{uuid.uuid4().hex}.pdf')]
+    }, content_type='multipart/form-data')
+    assert response.status_code == 200, response.json
+    return response.json['data']
+
+
+def test_a_pdf_past_the_page_cap_is_stored_truncated(main, client, tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction, 'EXTRACT_MAX_PAGES', 2)
+    data = upload_pdf(client, tmp_path, pages=5)
+    assert data['files'][0]['truncated'] is True
+
+    text, features = main.store.get_content(data['fileId'])
+    assert 'Page 2 marker' in text and 'Page 3 marker' not in text
+    assert features['truncated'] is True
+
+
+def test_a_pdf_within_the_caps_is_not_flagged(main, client, tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction, 'EXTRACT_MAX_PAGES', 2)
+    data = upload_pdf(client, tmp_path, pages=1)
+    assert 'truncated' not in data['files'][0]
+    assert 'truncated' not in main.store.get_content(data['fileId'])[1]
+
+
+def test_a_txt_past_the_char_cap_is_truncated():
+    assert extraction.extract_document(b'x' * 10, 'txt', max_chars=10) == ('x' * 10, 0, False)
+    assert extraction.extract_document(b'x' * 11, 'txt', max_chars=10) == ('x' * 10, 0, True)
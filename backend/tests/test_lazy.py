@@ -0,0 +1,44 @@
+import pytest
+
+from app.lazy import LazyProxy, LazyResource
+
+
+class Flaky:
+    def __init__(self, failures):
+        self.calls = 0
+        self.failures = failures
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise OSError('database is locked')
+        return {'calls': self.calls}
+
+
+def test_failures_are_remembered_by_default():
+    factory = Flaky(failures=1)
+    resource = LazyResource('model', factory)
+    assert resource.get() is None and resource.get() is None
+    assert factory.calls == 1
+
+
+def test_failures_are_raised_and_retried_without_caching():
+    factory = Flaky(failures=1)
+    resource = LazyResource('store', factory, cache_failures=False)
+    with pytest.raises(OSError):
+        resource.get()
+    assert not resource.loaded
+    assert resource.get() == {'calls': 2}
+    assert resource.get() == {'calls': 2}
+
+
+def test_proxy_builds_on_first_attribute_access():
+    class Store:
+        version = 3
+
+    resource = LazyResource('store', Store)
+    store = LazyProxy(resource)
+    assert not resource.loaded
+    assert store.version == 3 and resource.loaded
+    store.version = 4
+    assert resource.get().version == 4
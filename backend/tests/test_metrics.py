@@ -0,0 +1,71 @@
+import re
+import uuid
+
+from app.metrics import DEFAULT_BUCKETS, MetricsRegistry
+
+SAMPLE = re.compile(r'^(\w+)(\{.*\})? (\S+)$')
+
+
+def scrape(client):
+    """Sample name with labels -> value, and metric name -> type, from /api/metrics"""
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    samples = {}
+    types = {}
+    for line in response.get_data(as_text=True).splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split()
+            types[name] = kind
+        elif line:
+            name, labels, value = SAMPLE.match(line).groups()
+            samples[name + (labels or '')] = float(value)
+    return samples, types
+
+
+def test_an_upload_and_an_analysis_show_up_in_the_metrics(client, upload):
+    before, _ = scrape(client)
+    tag = uuid.uuid4().hex
+    jd_id = upload('jd', f'{tag} Requirements: 3+ years of experience with Python and SQL')
+    resume_ids = [upload('resume', f'{tag} Candidate {i}, Pune. 4 years of experience with Python and SQL')
+                  for i in range(2)]
+    response = client.post('/api/analyze', json={'jobDescriptionId': jd_id, 'resumeIds': resume_ids})
+    assert response.status_code == 200
+    after, types = scrape(client)
+
+    def grew(sample):
+        return after[sample] - before.get(sample, 0)
+
+    assert grew('resume_api_documents_processed_total{status="ready"}') == 3
+    assert grew('resume_api_resumes_scored_total') == 2
+    assert grew('resume_api_requests_total{endpoint="upload_files",status="200"}') == 3
+    assert grew('resume_api_requests_total{endpoint="analyze_data",status="200"}') == 1
+    assert grew('resume_api_upload_bytes_total') > 0
+    assert types['resume_api_resumes_scored_total'] == 'counter'
+
+    assert types['resume_api_stage_seconds'] == 'histogram'
+    for stage in ('upload.extract', 'upload.features', 'analyze.load_features', 'analyze.score'):
+        labels = f'stage="{stage}"'
+        assert grew(f'resume_api_stage_seconds_count{{{labels}}}') >= 1
+        assert after[f'resume_api_stage_seconds_bucket{{{labels},le="+Inf"}}'] == \
+            after[f'resume_api_stage_seconds_count{{{labels}}}']
+        assert f'resume_api_stage_seconds_sum{{{labels}}}' in after
+    assert grew('resume_api_request_seconds_count{endpoint="analyze_data"}') == 1
+
+
+def test_histograms_render_cumulative_buckets():
+    registry = MetricsRegistry(prefix='test')
+    registry.inc('files_total', 2, kind='pdf')
+    registry.observe('stage_seconds', 0.003, stage='parse')
+    registry.observe('stage_seconds', 40, stage='parse')
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ['# TYPE test_files_total counter', 'test_files_total{kind="pdf"} 2']
+    assert lines[2] == '# TYPE test_stage_seconds histogram'
+    buckets = lines[3:3 + len(DEFAULT_BUCKETS) + 1]
+    assert buckets[0] == 'test_stage_seconds_bucket{stage="parse",le="0.0005"} 0'
+    assert 'le="0.005"} 1' in buckets[2]
+    assert buckets[-2] == 'test_stage_seconds_bucket{stage="parse",le="30"} 1'
+    assert buckets[-1] == 'test_stage_seconds_bucket{stage="parse",le="+Inf"} 2'
+    assert lines[-2] == 'test_stage_seconds_sum{stage="parse"} 40.003'
+    assert lines[-1] == 'test_stage_seconds_count{stage="parse"} 2'
@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import JobDescription, Resume
+from app.pagination import decode_cursor, encode_cursor, job_description_page, ranked_resume_page, resume_page
+
+CREATED = datetime(2024, 1, 1)
+# Ties on purpose: several resumes share a score, and all share created_at
+SCORES = [0.9, 0.5, None, 0.5, 0.7, None, 0.5, 0.9, None, 0.1, 0.5]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    for job_id in (1, 2):
+        session.add(JobDescription(id=job_id, role_title=f'Role {job_id}', created_at=CREATED))
+    for i, score in enumerate(SCORES, 1):
+        session.add(Resume(id=i, student_name=f'Student {i}', raw_text='x' * 1000, relevance_score=score,
+                           job_id=1, created_at=CREATED))
+    session.add(Resume(id=100, student_name='Other job', relevance_score=1.0, job_id=2, created_at=CREATED))
+    session.commit()
+    yield session
+    session.close()
+
+
+def walk(page, limit):
+    """Every row from following next cursors, and the size of each page"""
+    rows, sizes, cursor = [], [], None
+    while True:
+        page_rows, cursor = page(cursor=cursor, limit=limit)
+        rows += page_rows
+        sizes.append(len(page_rows))
+        if cursor is None:
+            return rows, sizes
+
+
+def test_cursors_round_trip():
+    for values in [(7,), (0.5, 12), (None, 3)]:
+        assert decode_cursor(encode_cursor(*values), len(values)) == list(values)
+
+
+@pytest.mark.parametrize('cursor, size', [
+    ('not a cursor!', 1), ('', 1), (encode_cursor(1, 2), 1), (encode_cursor(1), 2),
+    ('eyJhIjogMX0', 1),  # {"a": 1}
+])
+def test_invalid_cursors_are_rejected(cursor, size):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, size)
+
+
+def test_a_bad_cursor_is_rejected_by_the_pages(db):
+    with pytest.raises(ValueError):
+        ranked_resume_page(db, 1, cursor=encode_cursor(3))
+    with pytest.raises(ValueError):
+        resume_page(db, cursor='%%%')
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 4, 100])
+def test_ranked_pages_cover_every_resume_once_in_a_stable_order(db, limit):
+    rows, sizes = walk(lambda **page: ranked_resume_page(db, 1, **page), limit)
+    ids = [row.id for row in rows]
+    assert len(ids) == len(set(ids)) == len(SCORES)
+    assert all(size == limit for size in sizes[:-1])
+
+    # Score descending, ties broken by id descending, unscored last
+    scored = sorted((i for i, score in enumerate(SCORES, 1) if score is not None),
+                    key=lambda i: (-SCORES[i - 1], -i))
+    unscored = sorted((i for i, score in enumerate(SCORES, 1) if score is None), reverse=True)
+    assert ids == scored + unscored
+    # The same walk again gives the same order
+    assert [row.id for row in walk(lambda **page: ranked_resume_page(db, 1, **page), limit)[0]] == ids
+
+
+@pytest.mark.parametrize('limit', [1, 4, 100])
+def test_id_pages_cover_every_row_once(db, limit):
+    assert [row.id for row in walk(lambda **page: resume_page(db, **page), limit)[0]] == [*range(1, 12), 100]
+    assert [row.id for row in walk(lambda **page: resume_page(db, job_id=2, **page), limit)[0]] == [100]
+    assert [jd.id for jd in walk(lambda **page: job_description_page(db, **page), limit)[0]] == [1, 2]
+
+
+def test_listings_leave_raw_text_unread(db):
+    statements = []
+    event.listen(db.get_bind(), 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    rows, _ = ranked_resume_page(db, 1, limit=3)
+    rows += resume_page(db, limit=3)[0]
+    assert all('raw_text' not in row._fields for row in rows)
+    assert {'id', 'student_name', 'relevance_score', 'verdict', 'missing_skills'} <= set(rows[0]._fields)
+    assert statements and all('raw_text' not in statement for statement in statements)
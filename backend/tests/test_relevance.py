@@ -0,0 +1,52 @@
+import pytest
+
+from app import utils
+from app.embeddings import EmbeddingEngine
+from app.lazy import LazyResource
+from synthetic import HashingEncoder
+
+JD = 'Backend engineer: Python, Django, PostgreSQL and AWS. Docker is a plus.'
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = EmbeddingEngine(HashingEncoder(), 'hashing', cache_dir=str(tmp_path))
+    monkeypatch.setattr(utils, 'embedding_engine', LazyResource('embedding engine', lambda: engine))
+    return engine
+
+
+def test_many_matches_one_at_a_time(engine):
+    resumes = ['Python and Django developer, 4 years on AWS with PostgreSQL',
+               'Java developer who built Spring services',
+               'Backend engineer: Python, Django, PostgreSQL and AWS. Docker is a plus.']
+    many = utils.compute_relevance_many(resumes, JD)
+    assert many == [utils.compute_relevance(resume, JD) for resume in resumes]
+
+    scores = [score for score, _, _ in many]
+    assert scores[2] == pytest.approx(100, abs=0.01) and scores[0] > scores[1]
+    assert [verdict for _, verdict, _ in many] == [utils.relevance_verdict(score) for score in scores]
+
+
+def test_missing_skills_are_those_of_the_jd_the_resume_lacks(engine):
+    _, _, missing = utils.compute_relevance('Python developer with Django', JD)
+    assert missing == 'sql, postgresql, aws, docker'
+
+
+def test_texts_are_encoded_once(engine):
+    resumes = ['Go developer', 'Rust developer', 'Go developer']
+    utils.compute_relevance_many(resumes, JD)
+    utils.compute_relevance_many(resumes, JD)
+    assert engine.encoded_count == 3
+
+
+def test_empty_texts_score_zero(engine):
+    assert utils.compute_relevance_many(['  ', 'Python developer'], '') == \
+        [(0.0, 'Low', 'Insufficient text data')] * 2
+    results = utils.compute_relevance_many(['', 'Python developer'], JD)
+    assert results[0] == (0.0, 'Low', 'Insufficient text data') and results[1][0] > 0
+    assert utils.compute_relevance_many([], JD) == []
+
+
+def test_without_a_model_every_resume_scores_zero(monkeypatch):
+    monkeypatch.setattr(utils, 'embedding_engine', LazyResource('embedding engine', lambda: None))
+    assert utils.compute_relevance_many(['a', 'b'], JD) == [(0.0, 'Low', 'Model not available')] * 2
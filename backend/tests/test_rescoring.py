@@ -0,0 +1,123 @@
+import io
+import json
+import uuid
+
+import pytest
+
+PYTHON_JD = '{} Requirements: 3+ years of experience with Python, Docker and SQL'
+JAVA_JD = '{} Requirements: 3+ years of experience with Java and Spring'
+
+
+class Inline:
+    """Runs background jobs on submit, so re-scoring is done when the upload returns"""
+
+    def submit(self, function, *args, **kwargs):
+        function(*args, **kwargs)
+
+
+@pytest.fixture
+def inline_rescoring(main, monkeypatch):
+    monkeypatch.setattr(main, 'ingest_executor', Inline())
+
+
+def post(client, upload_type, text, filename, **form):
+    response = client.post('/api/upload', data={
+        'type': upload_type, 'files': [(io.BytesIO(text.encode()), filename)], **form
+    }, content_type='multipart/form-data')
+    assert response.status_code == 200, response.json
+    return response.json['data']['fileId']
+
+
+def analyze(client, jd_id, resume_ids):
+    response = client.post('/api/analyze', json={'jobDescriptionId': jd_id, 'resumeIds': resume_ids})
+    assert response.status_code == 200, response.json
+    return response.json['data']['analysisId']
+
+
+def versions(client, analysis_id):
+    return client.get(f'/api/analyses/{analysis_id}/versions').json['versions']
+
+
+def rows(client, analysis_id, version=None):
+    query = {'format': 'json', **({'version': version} if version else {})}
+    body = json.loads(client.get(f'/api/export/{analysis_id}', query_string=query).get_data(as_text=True))
+    return {row['resumeId']: row for row in body['results']}
+
+
+def library(client, first_resume):
+    """Two JDs and two resumes in three analyses; only python and both_on_first have the first resume"""
+    tag = uuid.uuid4().hex
+    names = {key: f'{tag}-{key}.txt' for key in ('python_jd', 'java_jd', 'first', 'second')}
+    ids = {
+        'python_jd': post(client, 'jd', PYTHON_JD.format(tag), names['python_jd']),
+        'java_jd': post(client, 'jd', JAVA_JD.format(tag), names['java_jd']),
+        'first': post(client, 'resume', first_resume.format(tag), names['first']),
+        'second': post(client, 'resume', f'{tag} Dev Shah, Pune. 5 years of experience with Python', names['second']),
+    }
+    analyses = {
+        'python': analyze(client, ids['python_jd'], [ids['first'], ids['second']]),
+        'both_on_first': analyze(client, ids['java_jd'], [ids['first'], ids['second']]),
+        'second_only': analyze(client, ids['java_jd'], [ids['second']]),
+    }
+    return names, ids, analyses
+
+
+def test_a_replaced_resume_rescores_only_the_analyses_it_is_in(client, inline_rescoring):
+    names, ids, analyses = library(client, '{} Asha Rao, Pune. 4 years of experience with Python and SQL')
+    before = rows(client, analyses['python'])
+
+    replaced = post(client, 'resume', '{} Asha Rao, Pune. 4 years of experience with Python, SQL and Docker'.format(
+        uuid.uuid4().hex), names['first'], replace='true')
+    assert replaced == ids['first']
+
+    assert [v['version'] for v in versions(client, analyses['python'])] == [1, 2]
+    assert [v['version'] for v in versions(client, analyses['both_on_first'])] == [1, 2]
+    assert [v['version'] for v in versions(client, analyses['second_only'])] == [1]
+
+    after = rows(client, analyses['python'])
+    assert after[ids['first']]['score'] > before[ids['first']]['score']
+    assert 'Docker' in after[ids['first']]['matchedSkills']
+    # Rows of resumes that did not change are carried over as they were
+    assert after[ids['second']] == before[ids['second']]
+    # The old version stays addressable
+    assert rows(client, analyses['python'], version=1) == before
+
+
+def test_a_replaced_jd_rescores_every_row_of_its_analyses_only(client, inline_rescoring):
+    names, ids, analyses = library(client, '{} Asha Rao, Pune. 4 years of experience with Python and SQL')
+    before = rows(client, analyses['second_only'])
+
+    post(client, 'jd', '{} Requirements: 3+ years of experience with Java, Spring and Python'.format(uuid.uuid4().hex),
+         names['java_jd'], replace='true')
+
+    for key in ('both_on_first', 'second_only'):
+        latest = versions(client, analyses[key])[-1]
+        assert latest['version'] == 2 and latest['jdVersion'] == 2
+    assert [v['version'] for v in versions(client, analyses['python'])] == [1]
+
+    after = rows(client, analyses['second_only'])
+    assert after[ids['second']]['score'] > before[ids['second']]['score']
+    assert rows(client, analyses['second_only'], version=1) == before
+
+
+def test_a_taxonomy_refresh_rescores_only_rows_whose_skills_moved(main, client, inline_rescoring):
+    names, ids, analyses = library(client, '{} Asha Rao, Pune. 4 years of experience with Python, SQL and Docker')
+    # Stored and scored as if extracted by a taxonomy that did not know Docker
+    _, features = main.store.get_content(ids['first'])
+    main.store.update_features({ids['first']: {**features, 'skills': [s for s in features['skills'] if s != 'Docker']}})
+    main.rescore_analyses({ids['first']: None})
+    before = {key: rows(client, analysis_id) for key, analysis_id in analyses.items()}
+    versions_before = {key: len(versions(client, analysis_id)) for key, analysis_id in analyses.items()}
+
+    main.refresh_taxonomy({'docker'})
+    assert 'Docker' in main.store.get_features(ids['first'])['skills']
+
+    # Docker is only in the Python JD, so only that analysis moves
+    assert len(versions(client, analyses['python'])) == versions_before['python'] + 1
+    for key in ('both_on_first', 'second_only'):
+        assert len(versions(client, analyses[key])) == versions_before[key]
+
+    after = rows(client, analyses['python'])
+    assert 'Docker' in after[ids['first']]['matchedSkills']
+    assert 'Docker' not in before['python'][ids['first']]['matchedSkills']
+    assert after[ids['second']] == before['python'][ids['second']]
@@ -0,0 +1,89 @@
+import random
+import uuid
+
+from app.batch_scoring import score_matrix
+from app.features import (
+    MUST_HAVE_WEIGHT, NICE_TO_HAVE_WEIGHT, extract_features, score_features, skill_weights
+)
+from app.sections import segment_jd
+from app.skill_index import SkillIndex
+from synthetic import SKILLS
+
+JD = '''Senior Backend Engineer
+Must have: Python and AWS
+Nice to have:
+- Docker
+Qualifications: B.Tech in computer science'''
+
+
+def test_sections_split_at_headers():
+    sections = segment_jd(JD.lower())
+    assert sections['must_have'] == ['python and aws']
+    assert sections['good_to_have'] == ['- docker']
+    assert sections['qualifications'] == ['b.tech in computer science']
+
+
+def test_headers_run_together_on_one_line():
+    sections = segment_jd('required: java, spring. good to have: kafka. education: any degree')
+    assert sections['must_have'] == ['java, spring.']
+    assert sections['good_to_have'] == ['kafka.']
+
+
+def test_text_without_headers_has_no_sections():
+    sections = segment_jd('we build payment systems with python and go')
+    assert sections['must_have'] == [] and sections['good_to_have'] == []
+
+
+def test_skills_are_weighed_by_section():
+    features = extract_features(JD, sections=True)
+    weights = skill_weights(features)
+    assert weights['Python'] == weights['AWS'] == MUST_HAVE_WEIGHT
+    assert weights['Docker'] == NICE_TO_HAVE_WEIGHT
+    assert weights.total == 2 * MUST_HAVE_WEIGHT + NICE_TO_HAVE_WEIGHT
+
+
+def test_records_without_section_skills_weigh_every_skill_one():
+    features = extract_features(JD)
+    assert 'must_have_skills' not in features
+    assert set(skill_weights(features).values()) == {1.0}
+
+
+def test_weighted_scorers_agree():
+    rng = random.Random(3)
+    resumes = [{'skills': rng.sample(SKILLS, rng.randint(0, 10)), 'experience_years': rng.randint(0, 10),
+                'normalized_text': 'resume'} for _ in range(100)]
+    index = SkillIndex()
+    for i, features in enumerate(resumes):
+        index.add(i, features['skills'], features['experience_years'])
+    for _ in range(10):
+        skills = rng.sample(SKILLS, rng.randint(1, 8))
+        jd = {'skills': skills, 'experience_years': rng.randint(0, 6), 'normalized_text': 'jd',
+              'must_have_skills': rng.sample(skills, rng.randint(0, len(skills))),
+              'nice_to_have_skills': rng.sample(skills, rng.randint(0, len(skills)))}
+        weights = skill_weights(jd)
+        scores = [score_features(features, jd, weights)[0] for features in resumes]
+        assert list(score_matrix(resumes, [jd])[:, 0]) == scores
+        assert index.top_k(weights, jd['experience_years'], 5) == sorted(enumerate(scores), key=lambda item: -item[1])[:5]
+
+
+def test_job_descriptions_stored_before_section_weighting_are_upgraded(main, client, upload):
+    store = main.store
+    tag = uuid.uuid4().hex
+    jd_id = upload('jd', f'{tag}\n{JD}')
+    resume_id = upload('resume', f'{tag} Meera Iyer, Pune. 5 years of experience with Python and Docker')
+    features = store.get_content(jd_id)[1]
+    legacy = {key: value for key, value in features.items() if key not in ('must_have_skills', 'nice_to_have_skills')}
+    store.update_features({jd_id: legacy})
+    assert jd_id in store.job_descriptions_without('must_have_skills')
+
+    response = client.post('/api/analyze', json={'jobDescriptionId': jd_id, 'resumeIds': [resume_id]})
+    unweighted = response.json['results'][0]['score']
+
+    main.add_section_skills([jd_id])
+    assert jd_id not in store.job_descriptions_without('must_have_skills')
+    assert store.get_content(jd_id)[1] == features
+    rescored = client.get('/api/analyses').json['results']
+    weighted = next(result['score'] for result in rescored if result['resumeId'] == resume_id)
+    assert weighted == score_features(extract_features(f'{tag} Meera Iyer, Pune. 5 years of experience with '
+                                                       'Python and Docker'), features)[0]
+    assert weighted != unweighted
@@ -0,0 +1,42 @@
+import io
+import uuid
+
+from app.features import extract_features, score_features, scoring_features
+
+
+def test_scoring_features_leave_the_text_in_the_database(main, upload):
+    tag = uuid.uuid4().hex
+    text = f'{tag} Priya Nair, Chennai. 5 years of experience with Python, Docker and Kubernetes'
+    file_id = upload('resume', text)
+    store = main.store
+
+    store.feature_cache.discard(file_id)
+    features = store.get_features(file_id)
+    assert 'normalized_text' not in features and features['has_text'] is True
+    assert store.feature_cache.get(file_id) == features
+    assert features == scoring_features(extract_features(text))
+    assert tag in store.get_text(file_id)
+
+
+def test_scoring_features_score_like_full_records():
+    resume = extract_features('4 years of experience with Python, SQL and AWS')
+    jd = extract_features('Requirements: Python, AWS and Kubernetes. 3+ years of experience', sections=True)
+    empty = extract_features('')
+    for resume_features, jd_features in [(resume, jd), (empty, jd), (resume, empty)]:
+        assert (score_features(scoring_features(resume_features), scoring_features(jd_features)) ==
+                score_features(resume_features, jd_features))
+
+
+def test_duplicate_upload_copies_the_full_record(main, client):
+    text = f'{uuid.uuid4().hex} Ravi Kumar, Pune. 3 years of experience with Java and Spring'
+    ids = []
+    for _ in range(2):
+        response = client.post('/api/upload', data={
+            'type': 'resume', 'files': [(io.BytesIO(text.encode()), f'{uuid.uuid4().hex}.txt')]
+        }, content_type='multipart/form-data')
+        assert response.status_code == 200
+        ids.append(response.json['data']['fileId'])
+
+    original, duplicate = (main.store.get_content(file_id) for file_id in ids)
+    assert duplicate == original
+    assert duplicate[1]['normalized_text']
@@ -0,0 +1,80 @@
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def jd_id(upload):
+    tag = uuid.uuid4().hex
+    upload('resume', f'{tag} Asha Rao, Pune. 4 years of experience with Python and Docker')
+    return upload('jd', f'{tag} Requirements: 3+ years of experience with Python and Docker')
+
+
+@pytest.mark.parametrize('top_k', ['ten', '', -1, 0, 2.5, True, [3], {'k': 3}])
+def test_top_rejects_a_top_k_that_is_not_a_positive_integer(client, jd_id, top_k):
+    response = client.post('/api/analyze/top', json={'jobDescriptionId': jd_id, 'topK': top_k})
+    assert response.status_code == 400
+    assert response.json['success'] is False
+
+
+@pytest.mark.parametrize('body', [b'{not json', b'[1, 2]', b'"jd"', b'null'])
+def test_top_rejects_a_body_that_is_not_a_json_object(client, body):
+    response = client.post('/api/analyze/top', data=body, content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_top_caps_top_k(client, jd_id, main, monkeypatch):
+    monkeypatch.setattr(main, 'MAX_TOP_K', 1)
+    response = client.post('/api/analyze/top', json={'jobDescriptionId': jd_id, 'topK': '50'})
+    assert response.status_code == 200
+    assert len(response.json['data']['results']) == 1
+
+
+@pytest.mark.parametrize('body', [
+    b'{not json', b'[1, 2]', b'null',
+    b'{"jobDescriptionIds": "jd", "resumeIds": ["r"]}',
+    b'{"jobDescriptionIds": [["jd"]], "resumeIds": ["r"]}',
+    b'{"jobDescriptionIds": ["jd"], "resumeIds": ["r"], "topK": "ten"}',
+    b'{"jobDescriptionIds": ["jd"], "resumeIds": ["r"], "topK": 0}',
+])
+def test_batch_rejects_malformed_bodies(client, body):
+    response = client.post('/api/analyze/batch', data=body, content_type='application/json')
+    assert response.status_code == 400
+    assert response.json['success'] is False
+
+
+def test_batch_keeps_top_k_results_per_jd(client, upload, jd_id):
+    tag = uuid.uuid4().hex
+    resume_ids = [upload('resume', f'{tag} Candidate {i}. {i} years of experience with Python') for i in range(3)]
+    response = client.post('/api/analyze/batch', json={'jobDescriptionIds': [jd_id], 'resumeIds': resume_ids,
+                                                       'topK': '2'})
+    assert response.status_code == 200
+    assert len(response.json['data']['analyses'][0]['results']) == 2
+
+
+def deleted_meanwhile(monkeypatch, store, gone):
+    """Make the feature read miss gone, as when another process deletes it mid-request"""
+    get_features_many = store.get_features_many
+
+    def without_gone(file_ids):
+        return {file_id: features for file_id, features in get_features_many(file_ids).items() if file_id not in gone}
+    monkeypatch.setattr(store, 'get_features_many', without_gone)
+
+
+def test_batch_skips_resumes_deleted_while_it_runs(main, client, upload, jd_id, monkeypatch):
+    tag = uuid.uuid4().hex
+    resume_ids = [upload('resume', f'{tag} Candidate {i}. {i} years of experience with Python') for i in range(3)]
+    deleted_meanwhile(monkeypatch, main.store, {resume_ids[1]})
+
+    response = client.post('/api/analyze/batch', json={'jobDescriptionIds': [jd_id], 'resumeIds': resume_ids})
+    assert response.status_code == 200, response.json
+    scored = {result['resumeId'] for result in response.json['data']['analyses'][0]['results']}
+    assert scored == {resume_ids[0], resume_ids[2]}
+
+
+def test_batch_is_not_found_when_its_jds_were_deleted_while_it_runs(main, client, upload, jd_id, monkeypatch):
+    resume_id = upload('resume', f'{uuid.uuid4().hex} Candidate. 2 years of experience with Python')
+    deleted_meanwhile(monkeypatch, main.store, {jd_id})
+
+    response = client.post('/api/analyze/batch', json={'jobDescriptionIds': [jd_id], 'resumeIds': [resume_id]})
+    assert response.status_code == 404
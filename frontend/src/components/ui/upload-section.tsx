@@ -186,7 +186,11 @@ export function UploadSection() {
     }
 
     try {
-      const result = await api.analyzeResumes(selectedJobId, resumeIds);
+      // Rows are rendered as they arrive instead of after the whole batch
+      setAnalysisResults([]);
+      const result = await api.analyzeResumesStream(selectedJobId, resumeIds, (row: AnalysisResult) => {
+        setAnalysisResults(prev => [...prev, row]);
+      });
       
       if (result.success) {
         setCurrentAnalysisId(result.data.analysisId);
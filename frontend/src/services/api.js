@@ -268,6 +268,64 @@ export const analyzeResumes = async (jobDescriptionId, resumeIds) => {
   }
 };
 
+// Analyze resumes, receiving each result as soon as the backend scores it.
+// onResult is called per row; resolves with the full list and the analysisId.
+export const analyzeResumesStream = async (jobDescriptionId, resumeIds, onResult) => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/api/analyze/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'Accept': 'application/x-ndjson',
+      },
+      body: JSON.stringify({
+        jobDescriptionId,
+        resumeIds,
+      }),
+    });
+
+    if (!response.ok || !response.body) {
+      const errorText = await response.text();
+      throw new Error(errorText || `HTTP ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    const results = [];
+    let analysisId = null;
+    let buffer = '';
+
+    const handleLine = (line) => {
+      if (!line.trim()) return;
+      const record = JSON.parse(line);
+      if (record.type === 'result') {
+        results.push(record.result);
+        if (onResult) onResult(record.result);
+      } else if (record.type === 'summary') {
+        analysisId = record.analysisId;
+      } else if (record.type === 'error') {
+        throw new Error(record.error);
+      }
+    };
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop();
+      lines.forEach(handleLine);
+    }
+    handleLine(buffer);
+
+    console.log('✅ Streamed analysis complete:', analysisId, results.length);
+    return { success: true, data: { analysisId, results } };
+  } catch (error) {
+    console.error('❌ Analyze stream error:', error);
+    return { success: false, error: error.message };
+  }
+};
+
 // Export results
 export const exportResults = async (analysisId, format = 'json') => {
   try {
@@ -322,6 +380,7 @@ export default {
   getUploadedFiles,
   deleteFile,
   analyzeResumes,
+  analyzeResumesStream,
   exportResults,
   checkHealth,
 };
\ No newline at end of file